@@ -1,6 +1,21 @@
+import api.config as api_config
+from api.base.helpers import is_flag_set, run_registered_handler
+from api.base.run_queue import RunQueue
+from functools import partial
 from flask import Flask, request
+from process_handlers.registry import HANDLERS, get_handler_kwargs
 
 app = Flask(__name__)
+run_queue = RunQueue(max_workers=api_config.run_queue_workers)
+
+
+def import_view(kind, name):
+    try:
+        return __import__(f'api.views.{kind}.{name}', globals(), locals(), ['run'], 0)
+    except ModuleNotFoundError as e:
+        if e.name != f'api.views.{kind}.{name}':
+            raise
+        return None
 
 
 # /jobs/<jobname>?target_date=<target_date>&dry_run=<dry_run>'
@@ -8,29 +23,47 @@ app = Flask(__name__)
 def run_job(jobname):
     target_date = request.args.get('target_date')
     dry_run = request.args.get('dry_run')
-    j = __import__(f'api.views.jobs.{jobname}', globals(), locals(), ['run'], 0)
+    j = import_view('jobs', jobname)
+    if j is None:
+        return {"error": f"Unknown job: {jobname}"}, 404
     content = {
         "target_date": target_date,
         "dry_run": dry_run
     }
-    j.run(content)
-    return {"status": 200}
+    return run_queue.submit('jobs', jobname, j.run, content), 202
 
 
-# /process_handlers/<process_handler>?local_mode=<local_mode>&target_date=<target_date>&dry_run=<dry_run>'
+# /process_handlers/<process_handler | server>?local_mode=<local_mode>&target_date=<target_date>&dry_run=<dry_run>'
 @app.route('/process_handlers/<process_handler>', methods=['GET', 'POST'])
 def run_process_handler(process_handler):
     local_mode = request.args.get('local_mode')
     target_date = request.args.get('target_date')
     dry_run = request.args.get('dry_run')
-    j = __import__(f'api.views.process_handlers.{process_handler}', globals(), locals(), ['run'], 0)
     content = {
         "local_mode": local_mode,
         "target_date": target_date,
         "dry_run": dry_run
     }
-    j.run(content)
-    return {"status": 200}
+    if process_handler in HANDLERS:
+        # Server names, as passed to main.py --server, run through the shared registry
+        try:
+            get_handler_kwargs(process_handler, target_date=target_date, dry_run=is_flag_set(dry_run))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return run_queue.submit('process_handlers', process_handler, partial(run_registered_handler, process_handler), content), 202
+    j = import_view('process_handlers', process_handler)
+    if j is None:
+        return {"error": f"Unknown process handler: {process_handler}"}, 404
+    return run_queue.submit('process_handlers', process_handler, j.run, content), 202
+
+
+# /runs/<run_id>
+@app.route('/runs/<run_id>', methods=['GET'])
+def get_run(run_id):
+    run = run_queue.get_run(run_id)
+    if run is None:
+        return {"error": f"Unknown run: {run_id}"}, 404
+    return run
 
 
 
@@ -1,4 +1,10 @@
 import config
+from process_handlers.registry import run_handler
+
+
+def is_flag_set(flag):
+    """True for a query string flag such as dry_run=true, False when it is missing or 0, false or no"""
+    return flag is not None and str(flag).lower() not in ('', '0', 'false', 'no')
 
 
 def params_to_json(args):
@@ -18,3 +24,8 @@ def params_to_json(args):
         "dry_run": dry_run,
         "db_file_location": db_file_location
     }
+
+
+def run_registered_handler(name, content):
+    """Runs a process handler of the shared registry with a request's content"""
+    return run_handler(name, content['local_mode'], target_date=content['target_date'], dry_run=is_flag_set(content['dry_run']))
@@ -0,0 +1,124 @@
+import multiprocessing
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+def run_in_process(run, content, connection):
+    """Entry point of a run's worker process. Sends back the phase timings of the job run returns, or its error"""
+    result = {'status': 'succeeded'}
+    try:
+        job = run(content)
+        phase_timings = getattr(job, 'phase_timings', None)
+        if phase_timings is not None:
+            result['phase_timings'] = phase_timings
+            result['rows_in'] = sum([timing['rows_in'] for timing in phase_timings.values()])
+            result['rows_out'] = sum([timing['rows_out'] for timing in phase_timings.values()])
+    except Exception as e:
+        result = {'status': 'failed', 'error': f'{type(e).__name__}: {e}', 'traceback': traceback.format_exc()}
+    connection.send(result)
+    connection.close()
+
+
+class RunQueue:
+
+    def __init__(self, max_workers=2, max_finished_runs=1000):
+        """
+        Runs api views in the background, so a request returns as soon as its run is queued.
+
+        Each run gets a fresh worker process, started with spawn, because jobs and handlers set process-wide state
+        (config, sys.excepthook, logger handlers) that concurrent runs would otherwise overwrite. A pool of threads
+        starts the workers and waits on them.
+
+        A submission whose (kind, name, target_date, dry_run, local_mode) is already queued or running is not run again;
+        it gets the run id of the one in flight.
+
+        :param max_workers: Runs at once
+        :param max_finished_runs: Finished runs kept for status requests, oldest dropped first
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='api-run')
+        self.max_finished_runs = max_finished_runs
+        self.lock = threading.Lock()
+        self.runs = {}
+        self.in_flight = {}
+        self.mp_context = multiprocessing.get_context('spawn')
+
+
+    def submit(self, kind, name, run, content):
+        """
+        Queues run(content) and returns the run's status.
+
+        :param kind: jobs | process_handlers
+        :param name: Name of the job or process handler
+        :param run: A view's run function, or another picklable callable taking content. It may return the job it
+            executed, whose phase timings are kept
+        :param content: Parameters for run, see api.base.helpers.params_to_json
+        """
+        key = (kind, name, content.get('target_date'), content.get('dry_run'), content.get('local_mode'))
+        with self.lock:
+            if key in self.in_flight:
+                return dict(self.runs[self.in_flight[key]], coalesced=True)
+            run_id = uuid.uuid4().hex
+            self.runs[run_id] = {
+                'run_id': run_id,
+                'kind': kind,
+                'name': name,
+                'target_date': content.get('target_date'),
+                'dry_run': content.get('dry_run'),
+                'local_mode': content.get('local_mode'),
+                'status': 'queued',
+                'submitted_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'error': None,
+                'phase_timings': None,
+                'rows_in': None,
+                'rows_out': None
+            }
+            self.in_flight[key] = run_id
+            self.prune()
+            status = dict(self.runs[run_id], coalesced=False)
+        self.executor.submit(self.execute, key, run_id, run, content)
+        return status
+
+
+    def execute(self, key, run_id, run, content):
+        self.update(run_id, status='running', started_at=datetime.now().isoformat())
+        try:
+            receiver, sender = self.mp_context.Pipe(duplex=False)
+            worker = self.mp_context.Process(target=run_in_process, args=(run, content, sender), name=f'api-run-{run_id}')
+            worker.start()
+            sender.close()
+            try:
+                # Received before joining, so a long traceback cannot fill the pipe and block the worker
+                fields = receiver.recv()
+            except EOFError:
+                fields = None
+            receiver.close()
+            worker.join()
+            if fields is None:
+                fields = {'status': 'failed', 'error': f'worker exited with code {worker.exitcode}'}
+        except Exception as e:
+            fields = {'status': 'failed', 'error': f'{type(e).__name__}: {e}', 'traceback': traceback.format_exc()}
+        with self.lock:
+            self.runs[run_id].update(fields, finished_at=datetime.now().isoformat())
+            self.in_flight.pop(key, None)
+
+
+    def update(self, run_id, **fields):
+        with self.lock:
+            self.runs[run_id].update(fields)
+
+
+    def get_run(self, run_id):
+        with self.lock:
+            run = self.runs.get(run_id)
+            return dict(run) if run is not None else None
+
+
+    def prune(self):
+        finished = [run_id for run_id, run in self.runs.items() if run['status'] in ('succeeded', 'failed')]
+        for run_id in finished[:max(0, len(finished) - self.max_finished_runs)]:
+            del self.runs[run_id]
@@ -4,4 +4,7 @@ Stores global level variables for propagation across process handlers and jobs
 file_location = ''
 local_mode = None
 process_handler = None
-dry_run = True
\ No newline at end of file
+dry_run = True
+
+# Submitted jobs and process handlers running at once, each in its own process (see api/base/run_queue.py)
+run_queue_workers = 2
@@ -8,3 +8,4 @@ def run(*args):
     connector = DatabaseConnector(args_dict['db_file_location'], dry_run=args_dict['dry_run'])
     cddcj = CoreDagDataCheckJob(db_connector=connector)
     cddcj.execute()
+    return cddcj
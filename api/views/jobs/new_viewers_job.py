@@ -8,3 +8,4 @@ def run(*args):
     connector = DatabaseConnector(args_dict['db_file_location'], dry_run=args_dict['dry_run'])
     nvj = NewViewersJob(target_date = args_dict['target_date'], db_connector = connector)
     nvj.execute()
+    return nvj
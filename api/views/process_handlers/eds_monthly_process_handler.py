@@ -10,3 +10,4 @@ def run(*args):
         dry_run=args_dict['dry_run']
     )
     emph.run_jobs()
+    return emph
@@ -0,0 +1,56 @@
+import config
+from base.job_runner import JobSpec, ProcessJobRunner
+from concurrent.futures import ThreadPoolExecutor
+from utils.components.backfill_by_dt import backfill_by_date, backfill_by_week, backfill_by_month
+from utils.components.checkpoint_store import CheckpointStore
+
+
+def backfill(job_cls, start, end, granularity='day', workers=4, max_redshift_concurrency=None, job_kwargs=None, checkpoint_store=None, loggerv3=None, buffer_writes=False):
+	"""
+	Runs a job once per target date between start and end, fanning the dates out across worker processes.
+
+	Each date runs in its own process through a ProcessJobRunner. Every date's outcome is checkpointed, so rerunning
+	the same backfill only runs the dates that have not succeeded yet (unless config.resume_from_checkpoints is off).
+
+	:param job_cls: Job class, or its dotted path, constructed as job_cls(target_date=date, **job_kwargs)
+	:param start: Earliest date, as YYYY-MM-DD
+	:param end: Latest date, as YYYY-MM-DD
+	:param granularity: day | week | month. Week and month dates are the first day of each period
+	:param workers: Dates running at once
+	:param max_redshift_concurrency: Redshift statements running at once across all workers. None leaves it uncapped
+	:param job_kwargs: Extra keyword arguments for the job
+	:param checkpoint_store: CheckpointStore to resume from. Defaults to checkpoints/backfill_checkpoints.db under config.file_location
+	:param loggerv3: Logger for progress
+	:param buffer_writes: Collect each date's write_to_sql appends and bulk load them together (see DatabaseConnector.buffer_writes)
+	:return: Dict of date to the ProcessJobRunner status of that date's run. Dates skipped by checkpoint are left out
+	"""
+	if granularity not in ('day', 'week', 'month'):
+		raise ValueError(f'Unsupported backfill granularity: {granularity}')
+	job_path = job_cls if isinstance(job_cls, str) else '.'.join([job_cls.__module__, job_cls.__qualname__])
+	if checkpoint_store is None:
+		checkpoint_store = CheckpointStore(''.join([config.file_location, 'checkpoints/backfill_checkpoints.db']))
+
+	if granularity == 'month':
+		dates = backfill_by_month(latest_month=end, earliest_month=start, sort='asc')
+	elif granularity == 'week':
+		dates = backfill_by_week(latest_date=end, earliest_date=start, sort='asc')
+	else:
+		dates = backfill_by_date(latest_date=end, earliest_date=start, sort='asc')
+	if config.resume_from_checkpoints is True:
+		dates = [date for date in dates if not checkpoint_store.has_succeeded('backfill', job_path, date)]
+	if loggerv3 is not None:
+		loggerv3.info(f'Backfilling {job_path} for {len(dates)} {granularity}(s) from {start} to {end}')
+
+	runner = ProcessJobRunner(loggerv3=loggerv3, max_processes=workers, redshift_concurrency=max_redshift_concurrency)
+
+	def run_date(date):
+		kwargs = dict(job_kwargs) if job_kwargs else {}
+		kwargs['target_date'] = date
+		result = runner.run(JobSpec(job_path, kwargs, buffer_writes=buffer_writes))
+		checkpoint_store.record('backfill', job_path, date, result['status'], result.get('rows_written'))
+		if loggerv3 is not None:
+			loggerv3.info(f"{job_path} {date} {result['status']} in {result['elapsed_seconds']}s")
+		return date, result
+
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		return dict(executor.map(run_date, dates))
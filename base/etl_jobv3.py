@@ -1,7 +1,108 @@
 import config
+import cProfile
+import functools
+import inspect
+import os
+import resource
 import sys
 from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from time import perf_counter, sleep, thread_time, time
 from utils.components.loggerv3 import Loggerv3
+from utils.components.metrics import MetricsRegistry, RUN_METRICS_DDL
+from utils.components.retry import is_transient_error, get_backoff_seconds
+from utils.components.run_log_writer import get_run_log_writer
+
+
+def get_max_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def idempotent_phase(func):
+    """
+    Marks a job method as safe to run again, e.g. a download or a read into a DataFrame. A transient error (see
+    utils.components.retry) in a marked method reruns just that method after a backoff, up to job_retry_attempts times.
+    Unmarked methods, writes especially, are never rerun.
+    """
+    func.idempotent = True
+    return func
+
+
+def run_phase(self, func, args, kwargs):
+    """Calls a job method, retrying it after transient errors when it is marked with idempotent_phase"""
+    attempt = 1
+    while True:
+        try:
+            return func(self, *args, **kwargs)
+        except Exception as e:
+            retry_attempts = getattr(self, 'retry_attempts', config.job_retry_attempts)
+            if getattr(func, 'idempotent', False) is not True or attempt > retry_attempts or not is_transient_error(e):
+                raise
+            backoff_seconds = get_backoff_seconds(attempt, config.job_retry_backoff_seconds, config.job_retry_max_backoff_seconds)
+            self.loggerv3.warning(f'Transient {type(e).__name__} in {func.__name__}, retrying in {backoff_seconds:.0f}s ({attempt} of {retry_attempts}): {e}')
+            sleep(backoff_seconds)
+            attempt += 1
+
+
+def timed_phase(func):
+    """Records the wall time, CPU time, peak RSS growth and connector rows of each top level call of a job method"""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        # Methods called from within another phase are counted in that phase
+        if getattr(self, 'phase_depth', 0) > 0 or not hasattr(self, 'phase_timings'):
+            return run_phase(self, func, args, kwargs)
+        db_connector = getattr(self, 'db_connector', None)
+        db_connector = db_connector if hasattr(db_connector, 'rows_read') else None
+        rows_read = db_connector.rows_read if db_connector else 0
+        rows_written = db_connector.rows_written if db_connector else 0
+        max_rss_mb = get_max_rss_mb()
+        started = perf_counter()
+        cpu_started = thread_time()
+        self.phase_depth = 1
+        try:
+            return run_phase(self, func, args, kwargs)
+        finally:
+            self.phase_depth = 0
+            timing = self.phase_timings.setdefault(func.__name__, {
+                'calls': 0, 'wall_seconds': 0, 'cpu_seconds': 0, 'peak_rss_delta_mb': 0, 'rows_in': 0, 'rows_out': 0
+            })
+            timing['calls'] += 1
+            timing['wall_seconds'] += perf_counter() - started
+            timing['cpu_seconds'] += thread_time() - cpu_started
+            timing['peak_rss_delta_mb'] += get_max_rss_mb() - max_rss_mb
+            if db_connector:
+                timing['rows_in'] += db_connector.rows_read - rows_read
+                timing['rows_out'] += db_connector.rows_written - rows_written
+    wrapper.timed_phase = True
+    return wrapper
+
+
+def timed_execute(func):
+    """
+    Resets the phase timings and metrics for the run, optionally profiles it, and logs the timings and exports the
+    metrics when it ends.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        self.phase_timings = {}
+        self.phase_depth = 0
+        if getattr(self, 'metrics', None) is not None:
+            self.metrics.reset()
+        execute_started = perf_counter()
+        profiler = cProfile.Profile() if config.profile_jobs is True else None
+        if profiler:
+            profiler.enable()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            if profiler:
+                profiler.disable()
+                self.write_profile(profiler)
+            self.log_phase_timings()
+            self.write_metrics(perf_counter() - execute_started)
+    wrapper.timed_phase = True
+    return wrapper
 
 
 class EtlJobV3(ABC):
@@ -15,10 +116,70 @@ class EtlJobV3(ABC):
         self.file_location = config.file_location
         self.local_mode = local_mode if local_mode else config.local_mode
         self.loggerv3 = Loggerv3(name=self.jobname, file_location=self.file_location, local_mode=self.local_mode)
+        self.retry_attempts = config.job_retry_attempts
+        self.metrics = MetricsRegistry(self.jobname)
         sys.excepthook = self.loggerv3.handle_uncaught_exception
+        if self.db_connector is not None:
+            # Tags the connector's query events with the job running them
+            self.db_connector.job_name = self.jobname
         super().__init__()
 
 
+    def __init_subclass__(cls, **kwargs):
+        """Wraps execute and every public method a job defines, so each phase of execute is timed without changes to the job"""
+        super().__init_subclass__(**kwargs)
+        for name, attr in list(vars(cls).items()):
+            # Generators return before doing their work, so there is nothing to time
+            if name.startswith('_') or not inspect.isfunction(attr) or inspect.isgeneratorfunction(attr) or getattr(attr, 'timed_phase', False) is True:
+                continue
+            setattr(cls, name, timed_execute(attr) if name == 'execute' else timed_phase(attr))
+
+
+    def log_phase_timings(self):
+        if getattr(self, 'loggerv3', None) is None:
+            return
+        # Loggerv3.success closes the logger's handlers, and logging reopens them
+        closed = len(self.loggerv3.logger.handlers) == 0
+        for phase, timing in self.phase_timings.items():
+            timing = {key: round(value, 3) if isinstance(value, float) else value for key, value in timing.items()}
+            self.loggerv3.timing(f"{phase}: {timing['wall_seconds']}s wall, {timing['cpu_seconds']}s cpu, "
+                                 f"+{timing['peak_rss_delta_mb']}MB peak rss, {timing['rows_in']} rows in, {timing['rows_out']} rows out",
+                                 phase=phase, **timing)
+        if closed:
+            self.loggerv3.close()
+
+
+    def write_metrics(self, run_seconds):
+        """Adds the run's standard metrics and exports them to the textfile collector directory and run_metrics"""
+        if getattr(self, 'metrics', None) is None:
+            return
+        try:
+            self.metrics.gauge('run_seconds').set(run_seconds)
+            # Peak of the whole process, which jobs in a JobDag share
+            self.metrics.gauge('peak_rss_mb').set_max(get_max_rss_mb())
+            # Named apart from any rows_read or rows_written counter the job records itself, which they would add to
+            self.metrics.counter('connector_rows_read').inc(sum([timing['rows_in'] for timing in self.phase_timings.values()]))
+            self.metrics.counter('connector_rows_written').inc(sum([timing['rows_out'] for timing in self.phase_timings.values()]))
+            self.metrics.gauge('last_run_timestamp_seconds').set(time())
+            if config.metrics_textfile_directory is not None:
+                self.metrics.write_textfile(config.metrics_textfile_directory)
+            if self.loggerv3.write_logs_to_table is True:
+                job_start = self.loggerv3.run_start_time or datetime.now() - timedelta(seconds=run_seconds)
+                writer = get_run_log_writer(self.file_location, table_name='run_metrics', ddl=RUN_METRICS_DDL)
+                for row in self.metrics.to_rows(job_start, self.loggerv3.write_process_handler_helper()):
+                    writer.put(row)
+        except Exception as e:
+            self.loggerv3.warning(f'Could not export metrics: {e}')
+
+
+    def write_profile(self, profiler):
+        directory = ''.join([self.file_location, 'profiles/', datetime.now().strftime('%Y-%m-%d')])
+        os.makedirs(directory, exist_ok=True)
+        path = '/'.join([directory, f'{self.jobname}.prof'])
+        profiler.dump_stats(path)
+        self.loggerv3.info(f'Wrote profile to {path}')
+
+
     @abstractmethod
     def execute(self):
         pass
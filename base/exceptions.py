@@ -82,3 +82,41 @@ class DuplicateSupportingCastEpisodeException(Exception):
 
     def __str__(self):
         return self.message
+
+
+class JobDagException(Exception):
+
+    def __init__(self, failed_jobs, skipped_jobs):
+        super(JobDagException, self).__init__(failed_jobs, skipped_jobs)
+        self.failed_jobs = failed_jobs
+        self.skipped_jobs = skipped_jobs
+        self.message = f"Jobs failed: {', '.join(failed_jobs)}. Skipped downstream: {', '.join(skipped_jobs) if skipped_jobs else 'none'}"
+
+
+    def __str__(self):
+        return self.message
+
+
+class JobRunnerException(Exception):
+
+    def __init__(self, result):
+        super(JobRunnerException, self).__init__(result)
+        self.result = result
+        self.message = f"{result['job']} {result['status']}: {result['error']}"
+
+
+    def __str__(self):
+        return self.message
+
+
+class MissingFixtureException(Exception):
+
+    def __init__(self, method, fixture_key):
+        super(MissingFixtureException, self).__init__(method, fixture_key)
+        self.method = method
+        self.fixture_key = fixture_key
+        self.message = f'No recorded fixture for {method} ({fixture_key}). Record it against the live connector first'
+
+
+    def __str__(self):
+        return self.message
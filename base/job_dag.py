@@ -0,0 +1,210 @@
+import config
+import sys
+from datetime import datetime
+from base.exceptions import JobDagException, JobRunnerException
+from base.job_runner import JobSpec, ProcessJobRunner
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from time import perf_counter
+
+
+class JobNode:
+
+	def __init__(self, name, factory, upstream=None, reads=None, writes=None, target_date=None, on_success=None):
+		"""
+		A job in a JobDag.
+
+		:param name: Unique name of the node within its DAG
+		:param factory: Callable taking no arguments that builds the job, called on the worker thread that runs it,
+			or a JobSpec to run the job in its own process through a ProcessJobRunner
+		:param upstream: Names of nodes that must succeed before this one runs
+		:param reads: Tables the job reads, as schema.table
+		:param writes: Tables the job writes, as schema.table
+		:param target_date: Date the job's checkpoint is kept under. Defaults to a JobSpec's target_date kwarg, then the run date
+		:param on_success: Callable taking no arguments, called in the handler's process once the job has run and succeeded.
+			Not called when the node is resumed from a checkpoint
+		"""
+		self.name = name
+		self.factory = factory
+		self.upstream = list(upstream) if upstream else []
+		self.reads = list(reads) if reads else []
+		self.writes = list(writes) if writes else []
+		if target_date is None and isinstance(factory, JobSpec):
+			target_date = factory.kwargs.get('target_date')
+		self.target_date = str(target_date) if target_date else datetime.now().strftime('%Y-%m-%d')
+		self.on_success = on_success
+
+
+class JobDag:
+
+	def __init__(self, loggerv3, max_workers=None, runner=None, checkpoint_store=None):
+		"""
+		Runs a process handler's jobs concurrently, in dependency order, on a bounded pool of worker threads.
+
+		Besides each node's explicit upstream, edges are inferred from the declared tables in declaration order:
+		a node runs after every earlier node that writes a table it reads or writes, and after every earlier node
+		that reads a table it writes. Declaring jobs in their old sequential order therefore keeps every ordering
+		the data relied on. When a node fails, everything downstream of it is skipped and the rest still runs.
+
+		With a checkpoint store, each node's outcome is recorded under (handler, job, target_date), and nodes that
+		already succeeded for their target date are not run again, unless config.resume_from_checkpoints is off or one
+		of their upstream nodes ran again in this run, which leaves their output stale.
+
+		:param loggerv3: The process handler's logger
+		:param max_workers: Jobs run at once. Defaults to config.dag_max_workers
+		:param runner: ProcessJobRunner for JobSpec nodes. Created on first use if not given
+		:param checkpoint_store: CheckpointStore to resume from and record to
+		"""
+		self.loggerv3 = loggerv3
+		self.max_workers = max_workers if max_workers else config.dag_max_workers
+		self.runner = runner
+		self.checkpoint_store = checkpoint_store
+		self.handler = config.process_handler if config.process_handler else 'local'
+		self.results = {}
+		self.nodes = {}
+		self.statuses = {}
+		self.timings = {}
+		self.executed = set()
+
+
+	def add(self, name, factory, upstream=None, reads=None, writes=None, target_date=None, on_success=None):
+		if name in self.nodes:
+			raise ValueError(f'Duplicate job name in DAG: {name}')
+		self.nodes[name] = JobNode(name, factory, upstream=upstream, reads=reads, writes=writes, target_date=target_date, on_success=on_success)
+		return self.nodes[name]
+
+
+	def resolve_upstream(self):
+		upstream = {}
+		declared = []
+		for node in self.nodes.values():
+			dependencies = set(node.upstream)
+			for earlier in declared:
+				if set(earlier.writes) & (set(node.reads) | set(node.writes)) or set(earlier.reads) & set(node.writes):
+					dependencies.add(earlier.name)
+			unknown = dependencies - set(self.nodes)
+			if len(unknown) > 0:
+				raise ValueError(f"{node.name} depends on unknown jobs: {', '.join(sorted(unknown))}")
+			upstream[node.name] = dependencies
+			declared.append(node)
+		self.check_for_cycles(upstream)
+		return upstream
+
+
+	def check_for_cycles(self, upstream):
+		visited = set()
+		for name in self.nodes:
+			path = [name]
+			stack = [iter(upstream[name])]
+			while stack:
+				dependency = next(stack[-1], None)
+				if dependency is None:
+					visited.add(path.pop())
+					stack.pop()
+				elif dependency in path:
+					raise ValueError(f"Cycle in job DAG: {' -> '.join(path + [dependency])}")
+				elif dependency not in visited:
+					path.append(dependency)
+					stack.append(iter(upstream[dependency]))
+
+
+	def run_node(self, node):
+		self.executed.add(node.name)
+		try:
+			output_rows = self.execute_node(node)
+			if node.on_success is not None:
+				node.on_success()
+		except Exception:
+			self.record_checkpoint(node, 'failed')
+			raise
+		self.record_checkpoint(node, 'succeeded', output_rows)
+
+
+	def execute_node(self, node):
+		"""Runs the node's job and returns the number of rows it wrote"""
+		if isinstance(node.factory, JobSpec):
+			if self.runner is None:
+				self.runner = ProcessJobRunner(loggerv3=self.loggerv3)
+			result = self.runner.run(node.factory)
+			self.results[node.name] = result
+			self.timings[node.name] = result['elapsed_seconds']
+			if result['status'] != 'succeeded':
+				raise JobRunnerException(result)
+			return result['rows_written']
+
+		started = perf_counter()
+		job = node.factory()
+		try:
+			job.execute()
+		except Exception:
+			# sys.excepthook never fires for worker threads, so the job's own logger reports the failure
+			job.loggerv3.handle_uncaught_exception(*sys.exc_info())
+			raise
+		finally:
+			self.timings[node.name] = perf_counter() - started
+		if getattr(job, 'db_connector', None) is None:
+			return None
+		events = job.db_connector.query_recorder.get_events(job_name=job.jobname)
+		return sum([event['rows'] or 0 for event in events if event['kind'] == 'write'])
+
+
+	def record_checkpoint(self, node, status, output_rows=None):
+		if self.checkpoint_store is not None:
+			self.checkpoint_store.record(self.handler, node.name, node.target_date, status, output_rows)
+
+
+	def has_checkpoint(self, node):
+		if self.checkpoint_store is None or config.resume_from_checkpoints is not True:
+			return False
+		return self.checkpoint_store.has_succeeded(self.handler, node.name, node.target_date)
+
+
+	def schedule(self, upstream, executor, running):
+		"""Skips nodes behind a failure and submits nodes whose upstream all succeeded"""
+		changed = True
+		while changed:
+			changed = False
+			for name, node in self.nodes.items():
+				if self.statuses[name] != 'pending':
+					continue
+				upstream_statuses = [self.statuses[dependency] for dependency in upstream[name]]
+				if 'failed' in upstream_statuses or 'skipped' in upstream_statuses:
+					self.statuses[name] = 'skipped'
+					self.loggerv3.warning(f'Skipping {name}, an upstream job did not succeed')
+					changed = True
+				elif all([status == 'succeeded' for status in upstream_statuses]):
+					if self.has_checkpoint(node) and len(upstream[name] & self.executed) == 0:
+						self.statuses[name] = 'succeeded'
+						self.loggerv3.info(f'Skipping {name}, it already succeeded for {node.target_date}')
+						changed = True
+					else:
+						self.statuses[name] = 'running'
+						running[executor.submit(self.run_node, node)] = name
+
+
+	def run(self):
+		upstream = self.resolve_upstream()
+		self.statuses = {name: 'pending' for name in self.nodes}
+		self.executed = set()
+		excepthook = sys.excepthook
+		running = {}
+		with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+			self.schedule(upstream, executor, running)
+			while running:
+				done, _ = wait(running, return_when=FIRST_COMPLETED)
+				for future in done:
+					name = running.pop(future)
+					if future.exception() is None:
+						self.statuses[name] = 'succeeded'
+						self.loggerv3.info(f'{name} succeeded in {self.timings[name]:.1f}s')
+					else:
+						self.statuses[name] = 'failed'
+						self.loggerv3.warning(f'{name} failed: {future.exception()}')
+				self.schedule(upstream, executor, running)
+		# Every job constructor repoints sys.excepthook at its own logger
+		sys.excepthook = excepthook
+
+		failed = [name for name, status in self.statuses.items() if status == 'failed']
+		if len(failed) > 0:
+			skipped = [name for name, status in self.statuses.items() if status == 'skipped']
+			raise JobDagException(failed, skipped)
+		return self.statuses
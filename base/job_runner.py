@@ -0,0 +1,174 @@
+import config
+import importlib
+import inspect
+import multiprocessing
+import os
+import psutil
+import resource
+import threading
+import traceback
+from time import perf_counter
+
+
+class JobSpec:
+
+	def __init__(self, job_path, kwargs=None, memory_limit_mb=None, cpu_seconds=None, buffer_writes=False):
+		"""
+		A picklable description of a job for ProcessJobRunner.
+
+		:param job_path: Dotted path of the EtlJobV3 subclass, e.g. jobs.vod_viewership_job.VodViewershipJob
+		:param kwargs: Keyword arguments for the job's constructor, other than db_connector
+		:param memory_limit_mb: Overrides the runner's resident memory cap for this job
+		:param cpu_seconds: Overrides the runner's CPU time cap for this job
+		:param buffer_writes: Collect the job's write_to_sql appends and bulk load them once it finishes
+		"""
+		self.job_path = job_path
+		self.kwargs = kwargs if kwargs else {}
+		self.memory_limit_mb = memory_limit_mb
+		self.cpu_seconds = cpu_seconds
+		self.buffer_writes = buffer_writes
+
+
+def get_context():
+	"""The config values a job depends on, passed to its worker process explicitly"""
+	return {
+		'file_location': config.file_location,
+		'local_mode': config.local_mode,
+		'process_handler': config.process_handler,
+		'dry_run': config.dry_run,
+		'query_log_path': config.query_log_path,
+		'query_cache_enabled': config.query_cache_enabled,
+		'profile_jobs': config.profile_jobs,
+		'viewership_snapshot': config.viewership_snapshot
+	}
+
+
+def run_job_in_process(spec, context, cpu_seconds, redshift_slots, connection):
+	"""Entry point of a worker process. Builds and executes one job, then sends its status back through connection"""
+	for key, value in context.items():
+		setattr(config, key, value)
+	if cpu_seconds:
+		# The kernel sends SIGXCPU at the soft limit and SIGKILL at the hard one
+		resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 5))
+
+	from utils.connectors.database_connector import DatabaseConnector
+	DatabaseConnector.redshift_slots = redshift_slots
+	result = {'status': 'failed', 'error': None}
+	job = None
+	db_connector = None
+	try:
+		module_path, class_name = spec.job_path.rsplit('.', 1)
+		job_class = getattr(importlib.import_module(module_path), class_name)
+		if 'db_connector' in inspect.signature(job_class).parameters:
+			job = job_class(db_connector=DatabaseConnector(config.file_location, config.dry_run), **spec.kwargs)
+		else:
+			# Tools outside EtlJobV3 build their own connector
+			job = job_class(**spec.kwargs)
+		db_connector = getattr(job, 'db_connector', None)
+		if db_connector is not None:
+			if db_connector.job_name is None:
+				db_connector.job_name = spec.job_path
+			if spec.buffer_writes is True:
+				db_connector.buffer_writes()
+		job.execute()
+		if db_connector is not None:
+			db_connector.flush_write_buffer()
+		result['status'] = 'succeeded'
+	except Exception as e:
+		result['error'] = f'{type(e).__name__}: {e}'
+		result['traceback'] = traceback.format_exc()
+		if getattr(job, 'loggerv3', None) is not None:
+			job.loggerv3.handle_uncaught_exception(type(e), e, e.__traceback__)
+
+	usage = resource.getrusage(resource.RUSAGE_SELF)
+	result['cpu_seconds'] = round(usage.ru_utime + usage.ru_stime, 2)
+	# Loggerv3's run_logs writes are untagged, so only the job's own writes are counted
+	events = DatabaseConnector.query_recorder.get_events(job_name=db_connector.job_name) if db_connector is not None else []
+	result['rows_written'] = sum([event['rows'] or 0 for event in events if event['kind'] == 'write'])
+	# The job's run_logs row lands before the parent hears the job finished
+	from utils.components.run_log_writer import flush_run_logs
+	flush_run_logs()
+	connection.send(result)
+	connection.close()
+
+
+class ProcessJobRunner:
+
+	def __init__(self, loggerv3=None, max_processes=None, memory_limit_mb=None, cpu_seconds=None, redshift_concurrency=None, poll_seconds=1):
+		"""
+		Runs each job in a fresh worker process, so jobs can use every core and a job that exhausts memory or
+		CPU time fails on its own instead of taking down the handler.
+
+		Workers are started with spawn and receive their context explicitly (see get_context), so they inherit
+		no sockets, locks or config state from the parent. Resident memory, including the worker's children, is
+		polled with psutil and the worker is terminated past memory_limit_mb. CPU time is capped with RLIMIT_CPU.
+
+		:param loggerv3: Logger that reports workers killed before they could report back
+		:param max_processes: Workers alive at once. Defaults to config.job_runner_max_processes, then the CPU count
+		:param memory_limit_mb: Default resident memory cap per job. Defaults to config.job_memory_limit_mb
+		:param cpu_seconds: Default CPU time cap per job. Defaults to config.job_cpu_seconds
+		:param redshift_concurrency: Redshift statements running at once across all workers. None leaves it uncapped
+		:param poll_seconds: Interval between memory checks
+		"""
+		self.loggerv3 = loggerv3
+		self.max_processes = max_processes if max_processes else (config.job_runner_max_processes or os.cpu_count())
+		self.memory_limit_mb = memory_limit_mb if memory_limit_mb else config.job_memory_limit_mb
+		self.cpu_seconds = cpu_seconds if cpu_seconds else config.job_cpu_seconds
+		self.poll_seconds = poll_seconds
+		self.slots = threading.BoundedSemaphore(self.max_processes)
+		self.mp_context = multiprocessing.get_context('spawn')
+		self.redshift_slots = self.mp_context.BoundedSemaphore(redshift_concurrency) if redshift_concurrency else None
+
+
+	def get_rss_mb(self, process):
+		try:
+			processes = [process] + process.children(recursive=True)
+			return sum([p.memory_info().rss for p in processes]) / 1024 ** 2
+		except psutil.Error:
+			return 0
+
+
+	def receive(self, receiver, result):
+		"""Reads the worker's status as soon as it is sent, so a long traceback cannot fill the pipe and block the worker"""
+		if result is None and receiver.poll():
+			try:
+				return receiver.recv()
+			except EOFError:
+				return None
+		return result
+
+
+	def run(self, spec):
+		"""Runs one job and blocks until its worker exits. Returns a status dict; never raises for a failed job"""
+		memory_limit_mb = spec.memory_limit_mb if spec.memory_limit_mb else self.memory_limit_mb
+		cpu_seconds = spec.cpu_seconds if spec.cpu_seconds else self.cpu_seconds
+		with self.slots:
+			started = perf_counter()
+			receiver, sender = self.mp_context.Pipe(duplex=False)
+			worker = self.mp_context.Process(target=run_job_in_process, args=(spec, get_context(), cpu_seconds, self.redshift_slots, sender), name=spec.job_path)
+			worker.start()
+			sender.close()
+			result = None
+			peak_rss_mb = 0
+			killed = None
+			monitored = psutil.Process(worker.pid)
+			while worker.is_alive():
+				worker.join(timeout=self.poll_seconds)
+				result = self.receive(receiver, result)
+				peak_rss_mb = max(peak_rss_mb, self.get_rss_mb(monitored))
+				if memory_limit_mb and peak_rss_mb > memory_limit_mb and worker.is_alive():
+					killed = f'exceeded {memory_limit_mb}MB resident memory'
+					worker.terminate()
+					worker.join()
+			result = self.receive(receiver, result)
+			receiver.close()
+
+		if result is None:
+			result = {'status': 'killed', 'error': killed if killed else f'worker exited with code {worker.exitcode}'}
+			if self.loggerv3 is not None:
+				self.loggerv3.error(f"{spec.job_path} was killed: {result['error']}")
+		result['job'] = spec.job_path
+		result['exitcode'] = worker.exitcode
+		result['elapsed_seconds'] = round(perf_counter() - started, 2)
+		result['peak_rss_mb'] = round(peak_rss_mb, 1)
+		return result
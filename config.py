@@ -5,3 +5,70 @@ file_location = ''
 local_mode = None
 process_handler = None
 dry_run = False
+
+# Connection pooling (see utils/connectors/connection_registry.py)
+db_pool_size = 5
+db_max_overflow = 10
+db_pool_recycle = 3600
+db_pool_pre_ping = True
+mysql_pool_size = 3
+
+# S3 staging area for DatabaseConnector.bulk_load COPYs and extract_bulk UNLOADs
+bulk_load_bucket = 'rt-datapipeline'
+bulk_load_prefix = 'staging/hestia-bulk-load'
+bulk_extract_prefix = 'staging/hestia-bulk-extract'
+
+# Opt-in local cache of read_redshift results (see utils/components/query_cache.py)
+query_cache_enabled = False
+query_cache_max_bytes = 2 * 1024 ** 3
+
+# Per-query events recorded by DatabaseConnector (see utils/components/query_recorder.py)
+query_log_capacity = 10000
+query_log_path = None
+
+# Concurrent jobs in a process handler's JobDag (see base/job_dag.py)
+dag_max_workers = 4
+
+# Worker processes of ProcessJobRunner (see base/job_runner.py). None uses every core
+job_runner_max_processes = None
+job_memory_limit_mb = 8192
+job_cpu_seconds = 3 * 60 * 60
+
+# Skip JobDag jobs already checkpointed as succeeded for their target date (see utils/components/checkpoint_store.py)
+resume_from_checkpoints = True
+
+# Write a cProfile of every job's execute to <file_location>profiles/<date>/ (see base/etl_jobv3.py)
+profile_jobs = False
+
+# Window of warehouse.vod_viewership materialized for the current EDS run (see utils/components/viewership_snapshot.py)
+viewership_snapshot = None
+
+# Times a job method marked with idempotent_phase is retried after a transient error. Off by default (see base/etl_jobv3.py)
+job_retry_attempts = 0
+job_retry_backoff_seconds = 30
+job_retry_max_backoff_seconds = 600
+
+# Seconds between batched run_logs writes from Loggerv3 (see utils/components/run_log_writer.py)
+run_logs_flush_seconds = 60
+
+# Seconds Loggerv3 collects alerts for after the first of a burst, sent as one OpsGenie alert (0 sends each at once)
+alert_coalesce_seconds = 30
+
+# Size at which a job's log file for the day is rotated, and rotated files kept per job and day
+log_max_bytes = 50 * 1024 ** 2
+log_backup_count = 10
+
+# Days LogFileHandlerJob keeps compressed logs on disk, and where it archives each closed day as Parquet
+log_retention_days = 14
+log_archive_bucket = 'rt-datapipeline'
+log_archive_prefix = 'logs/hestia'
+
+# Directory of the Prometheus node exporter's textfile collector, where EtlJobV3 jobs write <job>.prom when they end
+# (see utils/components/metrics.py). None disables the files. run_metrics rows are written wherever run_logs rows are
+metrics_textfile_directory = None
+
+# RuntimeRegressionJob flags a job whose run took runtime_regression_factor times its median over the last
+# runtime_regression_baseline_days, and at least runtime_regression_min_seconds longer
+runtime_regression_factor = 2.0
+runtime_regression_baseline_days = 28
+runtime_regression_min_seconds = 120
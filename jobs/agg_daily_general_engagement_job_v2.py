@@ -1,6 +1,7 @@
 import pandas as pd
 from base.etl_jobv3 import EtlJobV3
 from utils.components.dater import Dater as DateHandler
+from utils.components.viewership_snapshot import viewership_relation
 
 
 class AggDailyGeneralEngagementJobV2(EtlJobV3):
@@ -12,6 +13,7 @@ class AggDailyGeneralEngagementJobV2(EtlJobV3):
 		self.target_day = self.target_date.replace('-','')
 		self.next_day = self.Dater.find_next_day(self.target_day)
 		self.formatted_dates = self.get_formatted_dates()
+		self.viewership = viewership_relation(self.formatted_dates['target'], self.formatted_dates['next'])
 		self.vod_viewers = {}
 		self.live_viewers = {}
 
@@ -44,7 +46,7 @@ class AggDailyGeneralEngagementJobV2(EtlJobV3):
 													du.user_id, 
 													vv.user_tier, 
 													sum(vv.active_seconds) as active_seconds
-												FROM warehouse.vod_viewership vv
+												FROM {self.viewership} vv
 												LEFT JOIN warehouse.dim_user du
 												ON du.user_key = vv.user_key
 												WHERE
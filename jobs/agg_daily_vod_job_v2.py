@@ -1,6 +1,7 @@
 import pandas as pd
 from base.etl_jobv3 import EtlJobV3
 from utils.components.dater import Dater as DateHandler
+from utils.components.viewership_snapshot import viewership_relation
 
 
 class AggDailyVodJobV2(EtlJobV3):
@@ -12,6 +13,7 @@ class AggDailyVodJobV2(EtlJobV3):
 		self.target_day = self.target_date.replace('-','')
 		self.next_day = self.Dater.find_next_day(self.target_day)
 		self.formatted_dates = self.get_formatted_dates()
+		self.viewership = viewership_relation(self.formatted_dates['target'], self.formatted_dates['next'])
 
 
 	def get_formatted_dates(self):
@@ -31,7 +33,7 @@ class AggDailyVodJobV2(EtlJobV3):
 		results = self.db_connector.read_redshift(f""" SELECT
     											count(distinct {key})
 											FROM
-											    warehouse.vod_viewership
+											    {self.viewership}
 											WHERE
 											    start_timestamp >= '{target_day}' AND
 											    start_timestamp < '{next_day}' AND
@@ -48,7 +50,7 @@ class AggDailyVodJobV2(EtlJobV3):
 		results = self.db_connector.read_redshift(f""" SELECT
     											count(*)
 											FROM
-											    warehouse.vod_viewership
+											    {self.viewership}
 											WHERE
 											    start_timestamp >= '{target_day}' AND
 											    start_timestamp < '{next_day}' AND
@@ -65,7 +67,7 @@ class AggDailyVodJobV2(EtlJobV3):
 		results = self.db_connector.read_redshift(f""" SELECT
     											sum(active_seconds) / 60 / 60 as hours
 											FROM
-											    warehouse.vod_viewership
+											    {self.viewership}
 											WHERE
 											    start_timestamp >= '{target_day}' AND
 											    start_timestamp < '{next_day}' AND
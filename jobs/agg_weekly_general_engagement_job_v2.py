@@ -1,6 +1,7 @@
 import pandas as pd
 from base.etl_jobv3 import EtlJobV3
 from utils.components.dater import Dater as DateHandler
+from utils.components.viewership_snapshot import viewership_relation
 
 
 class AggWeeklyGeneralEngagementJobV2(EtlJobV3):
@@ -13,6 +14,7 @@ class AggWeeklyGeneralEngagementJobV2(EtlJobV3):
 		self.next_day = self.Dater.find_next_day(self.end_day)
 		self.start_day = self.Dater.find_x_days_ago(self.next_day, 7)
 		self.formatted_dates = self.get_formatted_dates()
+		self.viewership = viewership_relation(self.formatted_dates['start'], self.formatted_dates['next'])
 		self.vod_viewers = {}
 		self.live_viewers = {}
 
@@ -46,7 +48,7 @@ class AggWeeklyGeneralEngagementJobV2(EtlJobV3):
 													du.user_id, 
 													vv.user_tier, 
 													sum(vv.active_seconds) as active_seconds
-												FROM warehouse.vod_viewership vv
+												FROM {self.viewership} vv
 												LEFT JOIN warehouse.dim_user du
 												ON du.user_key = vv.user_key
 												WHERE
@@ -1,6 +1,7 @@
 import pandas as pd
 from base.etl_jobv3 import EtlJobV3
 from utils.components.dater import Dater as DateHandler
+from utils.components.viewership_snapshot import viewership_relation
 
 
 class AggWeeklyVodJobV2(EtlJobV3):
@@ -13,6 +14,7 @@ class AggWeeklyVodJobV2(EtlJobV3):
 		self.next_day = self.Dater.find_next_day(self.end_day)
 		self.start_day = self.Dater.find_x_days_ago(self.next_day, 7)
 		self.formatted_dates = self.get_formatted_dates()
+		self.viewership = viewership_relation(self.formatted_dates['start'], self.formatted_dates['next'])
 
 
 	def get_formatted_dates(self):
@@ -33,7 +35,7 @@ class AggWeeklyVodJobV2(EtlJobV3):
 		results = self.db_connector.read_redshift(f""" SELECT
     											count(distinct {key})
 											FROM
-											    warehouse.vod_viewership
+											    {self.viewership}
 											WHERE
 											    start_timestamp >= '{target_day}' AND
 											    start_timestamp < '{next_day}' AND
@@ -50,7 +52,7 @@ class AggWeeklyVodJobV2(EtlJobV3):
 		results = self.db_connector.read_redshift(f""" SELECT
     											count(*)
 											FROM
-											    warehouse.vod_viewership
+											    {self.viewership}
 											WHERE
 											    start_timestamp >= '{target_day}' AND
 											    start_timestamp < '{next_day}' AND
@@ -67,7 +69,7 @@ class AggWeeklyVodJobV2(EtlJobV3):
 		results = self.db_connector.read_redshift(f""" SELECT
     											sum(active_seconds) / 60 / 60 as hours
 											FROM
-											    warehouse.vod_viewership
+											    {self.viewership}
 											WHERE
 											    start_timestamp >= '{target_day}' AND
 											    start_timestamp < '{next_day}' AND
@@ -6,14 +6,12 @@ from utils.components.dater import Dater
 from utils.components.extract_from_zip import ExtractFromZip
 from utils.connectors.s3_api_connector import S3ApiConnector
 from utils.connectors.braze_api_connector import BrazeApiConnector
-from utils.components.sql_helper import SqlHelper
 
 
 class BrazeAnonymousUserBackfillJob(EtlJobV3):
 
 	def __init__(self, target_date = None, db_connector = None, file_location=''):
 		super().__init__(jobname = __name__, db_connector = db_connector, local_mode=True)
-		self.sql_helper = SqlHelper()
 		self.dater = Dater()
 		self.file_location = file_location
 		self.braze_api_connector = BrazeApiConnector(file_location=self.file_location)
@@ -94,17 +92,16 @@ class BrazeAnonymousUserBackfillJob(EtlJobV3):
 		self.loggerv3.info('Finding RT profile matches')
 		filtered_emails = []
 		for record in self.filtered_records:
-			filtered_emails.append(record['email'].replace("'", "\\'"))
+			filtered_emails.append(record['email'])
 
-		where_in = self.sql_helper.array_to_sql_list(filtered_emails)
-		if not where_in:
+		if len(filtered_emails) == 0:
 			self.loggerv3.info('No emails in filtered records')
 			return
 
-		results = self.db_connector.query_v2_db(f"""SELECT u.uuid, u.email
+		results = self.db_connector.query_by_keys("""SELECT u.uuid, u.email
 												FROM production.users u
-												WHERE u.email IN ({where_in});
-											""")
+												WHERE u.email IN {keys};
+											""", filtered_emails, target='v2_db')
 
 		for result in results:
 			self.profile_matches.append({
@@ -52,8 +52,7 @@ class CommentsJob(EtlJobV3):
 
 	def load_episode_data(self):
 		self.loggerv3.info("Loading Episode Data...")
-		episode_ids_string = ','.join("'{0}'".format(w) for w in self.episode_ids)
-		query = f""" SELECT
+		query = """ SELECT
 						episode_key,
 						episode_title,
 						series_title,
@@ -61,11 +60,9 @@ class CommentsJob(EtlJobV3):
 					FROM
 						warehouse.dim_segment_episode
 					WHERE
-						episode_key in (
-							{episode_ids_string}
-						)
+						episode_key in {keys}
 		"""
-		results = self.db_connector.read_redshift(query)
+		results = self.db_connector.query_by_keys(query, self.episode_ids)
 		for result in results:
 			self.episodes[result[0]] = {
 				"episode_title": result[1],
@@ -19,15 +19,17 @@ class DecileReportingJob(EtlJobV3):
     def load_decile_records(self):
         self.loggerv3.info(f"Loading Decile Records for {self.target_date} ")
         records = []
-        results = self.db_connector.read_redshift(f"""
+        query = f"""
             SELECT
                     *
             FROM warehouse.vod_deciles
             WHERE start_timestamp >= '{self.target_date}' AND
                   start_timestamp < '{self.next_date}'
-        """)
+        """
 
-        for result in results:
+        # Arrow keeps nullable integers such as decile as ints; pandas would turn them into floats
+        results = self.db_connector.extract_bulk(query, as_arrow=True)
+        for result in zip(*[column.to_pylist() for column in results.columns]):
             records.append({
                 'session_id': result[0],
                 'user_key': result[1],
@@ -35,14 +35,9 @@ class DimUserJob(EtlJobV3):
         self.users_df = pd.DataFrame(users)
 
 
-    def clear_dim_table(self):
-        self.loggerv3.info('Truncating table')
-        self.db_connector.write_redshift(f"TRUNCATE TABLE {self.schema}.{self.table_name}")
-
-
     def write_all_results_to_redshift(self):
         self.loggerv3.info("Writing results to Red Shift")
-        self.db_connector.write_to_sql(self.users_df, self.table_name, self.db_connector.sv2_engine(), schema=self.schema, method='multi', chunksize=5000, index=False, if_exists='append')
+        self.db_connector.bulk_load(self.users_df, self.table_name, schema=self.schema, mode='replace')
         self.db_connector.update_redshift_table_permissions(self.table_name, schema=self.schema)
 
 
@@ -58,7 +53,6 @@ class DimUserJob(EtlJobV3):
     def execute(self):
         self.loggerv3.start(f"Running Dim User Job")
         self.get_v2_users()
-        self.clear_dim_table()
         self.write_all_results_to_redshift()
         self.write_all_results_to_s3()
         self.loggerv3.success("All Processing Complete!")
@@ -1,6 +1,5 @@
 import pandas as pd
 from base.etl_jobv3 import EtlJobV3
-from utils.components.batcher import Batcher
 from datetime import datetime, timedelta
 
 
@@ -12,8 +11,6 @@ class LivestreamScheduleJobV2(EtlJobV3):
         self.target_date_dt = datetime.strptime(self.target_date, '%Y-%m-%d')
         self.next_date_dt = self.target_date_dt + timedelta(1)
         self.next_date = datetime.strftime(self.next_date_dt, '%Y-%m-%d')
-        self.batcher = Batcher()
-        self.batches = None
         self.livestreams = []
         self.episodes = []
         self.final_dataframe = None
@@ -53,20 +50,17 @@ class LivestreamScheduleJobV2(EtlJobV3):
     def get_channels(self):
         self.loggerv3.info('Getting Channels')
         uuids = [episode['container_uuid'] for episode in self.livestreams]
-        self.batches = self.batcher.list_to_list_batch(batch_limit=500, iterator=uuids)
-        for batch in self.batches:
-            episodes = ','.join([f"'{x}'" for x in batch])
-            query = f"""
-                SELECT channel_title, episode_key
-                FROM warehouse.dim_segment_episode
-                WHERE episode_key in ({episodes});
-            """
-            results = self.db_connector.read_redshift(query)
-            for result in results:
-                self.episodes.append({
-                    'channel': result[0],
-                    'episode_key': result[1]
-                })
+        query = """
+            SELECT channel_title, episode_key
+            FROM warehouse.dim_segment_episode
+            WHERE episode_key in {keys};
+        """
+        results = self.db_connector.query_by_keys(query, uuids)
+        for result in results:
+            self.episodes.append({
+                'channel': result[0],
+                'episode_key': result[1]
+            })
 
 
     def build_final_dataframe(self):
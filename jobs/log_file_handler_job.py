@@ -1,7 +1,14 @@
+import config
+import gzip
+import json
 import os
+import pandas as pd
 import shutil
+import socket
+import tempfile
 from datetime import datetime
 from base.etl_jobv3 import EtlJobV3
+from utils.connectors.s3_api_connector import S3ApiConnector
 
 
 class LogFileHandlerJob(EtlJobV3):
@@ -9,36 +16,118 @@ class LogFileHandlerJob(EtlJobV3):
     def __init__(self, target_date = None, db_connector = None, api_connector = None, jobname=None):
         super().__init__(jobname=__name__)
 
-        self.LIFECYCLE_DAYS = 14
+        self.LIFECYCLE_DAYS = config.log_retention_days
+        self.ARCHIVED_MARKER = '.archived'
+        self.RECORD_COLUMNS = ['time', 'level', 'message', 'process_handler']
         self.log_file_dir = ''.join([self.file_location, 'logs'])
         self.log_files = None
+        self.closed_days = None
         self.today = datetime.today()
+        self.s3_api_connector = None
+        self.host = socket.gethostname()
 
 
     def get_log_files(self):
-        self.log_files = os.listdir(self.log_file_dir)
-        if '.DS_Store' in self.log_files:
-            self.log_files.remove('.DS_Store')
+        # Spools of batched run_logs and run_metrics writes live next to the day directories
+        self.log_files = [file for file in os.listdir(self.log_file_dir) if file != '.DS_Store' and not file.endswith('_spool')]
 
 
-    def delete_old_log_files(self):
+    def get_closed_days(self):
+        self.closed_days = []
         for file in self.log_files:
             try:
                 log_date = datetime.strptime(file, '%Y-%m-%d')
-                day_diff = (self.today - log_date).days
-                if day_diff > self.LIFECYCLE_DAYS:
-                    log_dir = '/'.join([self.log_file_dir, file])
-                    self.loggerv3.info(f'Removing dir {log_dir}')
-                    shutil.rmtree(log_dir)
+                if log_date.date() < self.today.date():
+                    self.closed_days.append(file)
             except ValueError:
                 self.loggerv3.exception(f'Incorrect log file format: {file}')
+        self.closed_days.sort()
+
+
+    def compress_closed_days(self):
+        """Gzips every log file of a closed day, including rotated ones"""
+        for day in self.closed_days:
+            day_dir = '/'.join([self.log_file_dir, day])
+            compressed = 0
+            for file in os.listdir(day_dir):
+                if file.endswith('.gz') or file.endswith('.tmp') or file == self.ARCHIVED_MARKER:
+                    continue
+                path = '/'.join([day_dir, file])
+                # Written to a temp name first, so a concurrent or interrupted run never sees a partial .gz
+                with open(path, 'rb') as f_in, gzip.open(f'{path}.gz.tmp', 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                os.replace(f'{path}.gz.tmp', f'{path}.gz')
+                os.remove(path)
+                compressed += 1
+            if compressed > 0:
+                self.loggerv3.info(f'Compressed {compressed} log file(s) of {day}')
+
+
+    def get_rotation(self, file):
+        """Rotation number of a log file, <job>.json.2.gz -> 2. The current file is 0 and higher numbers are older"""
+        suffix = file.split('.json')[-1].replace('.gz', '').lstrip('.')
+        return int(suffix) if suffix.isdigit() else 0
+
+
+    def read_day_records(self, day):
+        """Records of every job's compressed logs for the day, with the fields outside RECORD_COLUMNS kept as json"""
+        day_dir = '/'.join([self.log_file_dir, day])
+        records = []
+        files = [file for file in os.listdir(day_dir) if file.endswith('.gz')]
+        # Each job's records in the order they were logged
+        for file in sorted(files, key=lambda file: (file.split('.json')[0], -self.get_rotation(file))):
+            job = file.split('.json')[0]
+            with gzip.open('/'.join([day_dir, file]), 'rt') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    details = {key: value for key, value in record.items() if key not in self.RECORD_COLUMNS}
+                    records.append({
+                        'log_date': day,
+                        'host': self.host,
+                        'job': job,
+                        **{column: record.get(column) for column in self.RECORD_COLUMNS},
+                        'details': json.dumps(details, default=str) if details else None
+                    })
+        return pd.DataFrame(records, columns=['log_date', 'host', 'job'] + self.RECORD_COLUMNS + ['details'])
+
+
+    def archive_closed_days(self):
+        """Ships each closed day's logs to S3 as one Parquet file, once"""
+        for day in self.closed_days:
+            marker = '/'.join([self.log_file_dir, day, self.ARCHIVED_MARKER])
+            if os.path.isfile(marker):
+                continue
+            if self.s3_api_connector is None:
+                self.s3_api_connector = S3ApiConnector(file_location=self.file_location, bucket=config.log_archive_bucket, profile_name='roosterteeth', dry_run=config.dry_run)
+            dataframe = self.read_day_records(day)
+            key = '/'.join([config.log_archive_prefix, f'log_date={day}', f'{self.host}.parquet'])
+            with tempfile.TemporaryDirectory() as directory:
+                path = '/'.join([directory, f'{day}.parquet'])
+                dataframe.to_parquet(path, index=False)
+                self.s3_api_connector.upload_file(path, key)
+            open(marker, 'w').close()
+            self.loggerv3.info(f'Archived {len(dataframe.index)} log records of {day} to s3://{config.log_archive_bucket}/{key}')
+
+
+    def delete_old_log_files(self):
+        for day in self.closed_days:
+            log_date = datetime.strptime(day, '%Y-%m-%d')
+            day_diff = (self.today - log_date).days
+            log_dir = '/'.join([self.log_file_dir, day])
+            # Days whose archive failed stay on disk until it succeeds
+            if day_diff > self.LIFECYCLE_DAYS and os.path.isfile('/'.join([log_dir, self.ARCHIVED_MARKER])):
+                self.loggerv3.info(f'Removing dir {log_dir}')
+                shutil.rmtree(log_dir)
 
 
     def execute(self):
         self.loggerv3.start('Starting Log File Handler Job')
         self.get_log_files()
+        self.get_closed_days()
+        self.compress_closed_days()
+        self.archive_closed_days()
         self.delete_old_log_files()
         self.loggerv3.success("All Processing Complete!")
-
-
-
@@ -1,5 +1,5 @@
 import os
-from base.etl_jobv3 import EtlJobV3
+from base.etl_jobv3 import EtlJobV3, idempotent_phase
 from datetime import datetime
 from pandas import pandas as pd
 from utils.connectors.s3_api_connector import S3ApiConnector
@@ -27,6 +27,7 @@ class MegaphoneMetricsJob(EtlJobV3):
             os.system(f'rm {self.downloads_directory}/*.*')
 
 
+    @idempotent_phase
     def download_files_from_s3(self):
         self.loggerv3.info('Downloading file from s3')
         filename = '/'.join([self.downloads_directory, self.base_file])
@@ -68,7 +69,7 @@ class MegaphoneMetricsJob(EtlJobV3):
 
     def write_results_to_redshift(self):
         self.loggerv3.info("Writing results to Red Shift")
-        self.db_connector.write_to_sql(self.metrics_df, self.table_name, self.db_connector.sv2_engine(), schema=self.schema, method='multi', chunksize=5000, index=False, if_exists='append')
+        self.db_connector.bulk_load(self.metrics_df, self.table_name, schema=self.schema)
         self.db_connector.update_redshift_table_permissions(self.table_name, schema=self.schema)
 
 
@@ -1,6 +1,7 @@
 import pandas as pd
 from base.etl_jobv3 import EtlJobV3
 from datetime import datetime, timedelta
+from utils.components.viewership_snapshot import viewership_relation
 
 
 class NewViewersJob(EtlJobV3):
@@ -9,6 +10,7 @@ class NewViewersJob(EtlJobV3):
 		super().__init__(jobname = __name__, target_date = target_date, db_connector = db_connector, table_name = 'new_viewers')
 
 		self.target_dt = datetime.strptime(self.target_date, '%Y-%m-%d')
+		self.viewership = viewership_relation((self.target_dt - timedelta(days=6)).strftime('%Y-%m-%d'), (self.target_dt + timedelta(days=1)).strftime('%Y-%m-%d'))
 		self.final_df = None
 
 
@@ -17,7 +19,7 @@ class NewViewersJob(EtlJobV3):
 		query = f""" 
 					with last_7_days as (
 					    select distinct user_key
-					    from warehouse.vod_viewership
+					    from {self.viewership}
 					    where user_key is not null
 					      AND user_tier in ('premium', 'trial', 'free')
 					      AND start_timestamp >= dateadd('days', -6, '{self.target_date}')
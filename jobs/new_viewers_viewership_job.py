@@ -1,6 +1,7 @@
 import pandas as pd
 from base.etl_jobv3 import EtlJobV3
-from datetime import datetime
+from datetime import datetime, timedelta
+from utils.components.viewership_snapshot import viewership_relation
 
 
 class NewViewersViewershipJob(EtlJobV3):
@@ -9,6 +10,7 @@ class NewViewersViewershipJob(EtlJobV3):
 		super().__init__(jobname = __name__, target_date = target_date, db_connector = db_connector, table_name = 'new_viewers_viewership')
 
 		self.target_dt = datetime.strptime(self.target_date, '%Y-%m-%d')
+		self.viewership = viewership_relation((self.target_dt - timedelta(days=13)).strftime('%Y-%m-%d'), (self.target_dt + timedelta(days=1)).strftime('%Y-%m-%d'))
 		self.final_df = None
 
 
@@ -19,7 +21,7 @@ class NewViewersViewershipJob(EtlJobV3):
 					    SELECT 
 					    	user_key,
 					    	user_tier
-					    FROM warehouse.vod_viewership
+					    FROM {self.viewership}
 					    WHERE user_key is not null
 					      AND user_tier in ('premium', 'trial', 'free')
 					      AND start_timestamp >= dateadd('days', -13, '{self.target_date}')
@@ -45,7 +47,7 @@ class NewViewersViewershipJob(EtlJobV3):
 						dse.series_id,
 						dse.season_id,
 						vv.episode_key
-					  FROM warehouse.vod_viewership vv
+					  FROM {self.viewership} vv
 					  INNER JOIN users u on vv.user_key = u.user_key and vv.user_tier = u.user_tier
 					  INNER JOIN warehouse.dim_segment_episode dse on vv.episode_key = dse.episode_key
 					  WHERE 
@@ -8,7 +8,6 @@ class QuarterlySalesEstimatesJob(EtlJobV3):
     def __init__(self, quarter_start, quarter_end, data_from_quarter, for_quarter, target_date=None, db_connector=None, api_connector=None, file_location=''):
         super().__init__(jobname=__name__, target_date=target_date, db_connector=db_connector, table_name='quarterly_sales_estimates', local_mode=True)
         """This job also writes to quarterly_sales_forecasts"""
-        self.staging_schema = 'staging'
         self.prod_schema = 'warehouse'
         self.forecasts_table_name = 'quarterly_sales_forecasts'
         self.data_from_quarter = data_from_quarter
@@ -233,46 +232,16 @@ class QuarterlySalesEstimatesJob(EtlJobV3):
         self.final_dataframe.loc[self.final_dataframe['series_title'] == 'just kidding news off the record', 'estimate'] *= 2
 
 
-    def write_to_redshift_staging(self):
-        self.loggerv3.info('Writing to redshift staging')
-        self.db_connector.write_to_sql(self.final_dataframe, f'stage_{self.table_name}', self.db_connector.sv2_engine(), schema=self.staging_schema, chunksize=5000, method='multi', index=False, if_exists='append')
-        self.db_connector.update_redshift_table_permissions(f'stage_{self.table_name}', self.staging_schema)
-
-
-    def merge_stage_to_prod(self):
-        self.loggerv3.info('Merging staging to prod')
-        query = f"""
-                  BEGIN TRANSACTION;
-
-                      UPDATE {self.prod_schema}.{self.table_name}
-                      SET 
-                          estimate = staging.estimate
-                      FROM {self.staging_schema}.stage_{self.table_name} staging
-                      JOIN {self.prod_schema}.{self.table_name} prod
-                          ON staging.series_title = prod.series_title
-                          AND staging.platform = prod.platform
-                          AND staging.data_from_quarter = prod.data_from_quarter
-                          AND staging.for_quarter = prod.for_quarter
-                          AND staging.estimate != prod.estimate;
-
-                      DELETE FROM {self.staging_schema}.stage_{self.table_name}
-                      USING {self.prod_schema}.{self.table_name} prod
-                      WHERE 
-                          prod.series_title = stage_{self.table_name}.series_title
-                          AND prod.platform = stage_{self.table_name}.platform
-                          AND prod.data_from_quarter = stage_{self.table_name}.data_from_quarter
-                          AND prod.for_quarter = stage_{self.table_name}.for_quarter;
-
-                      INSERT INTO {self.prod_schema}.{self.table_name}
-                      SELECT * FROM {self.staging_schema}.stage_{self.table_name};
-
-                      TRUNCATE {self.staging_schema}.stage_{self.table_name};
-
-                      COMMIT;
-
-                  END TRANSACTION;
-              """
-        self.db_connector.write_redshift(query)
+    def upsert_to_redshift(self):
+        self.loggerv3.info('Upserting to redshift')
+        self.db_connector.upsert(
+            self.final_dataframe,
+            self.table_name,
+            keys=['series_title', 'platform', 'data_from_quarter', 'for_quarter'],
+            update_columns=['estimate'],
+            schema=self.prod_schema
+        )
+        self.db_connector.update_redshift_table_permissions(self.table_name, self.prod_schema)
 
 
     def execute(self):
@@ -285,6 +254,5 @@ class QuarterlySalesEstimatesJob(EtlJobV3):
         self.concat_dataframes()
         self.calculate_averages()
         self.build_final_dataframe()
-        self.write_to_redshift_staging()
-        self.merge_stage_to_prod()
+        self.upsert_to_redshift()
         self.loggerv3.success("All Processing Complete!")
@@ -2,6 +2,7 @@ import pandas as pd
 from base.etl_jobv3 import EtlJobV3
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+from utils.components.viewership_snapshot import viewership_relation
 
 
 class ReactivatedViewersJob(EtlJobV3):
@@ -12,6 +13,7 @@ class ReactivatedViewersJob(EtlJobV3):
 		self.target_date_dt = datetime.strptime(target_date, '%Y-%m-%d')
 		self.next_date_dt = self.target_date_dt + relativedelta(days=1)
 		self.next_date = self.next_date_dt.strftime('%Y-%m-%d')
+		self.viewership = viewership_relation(self.target_date, self.next_date)
 		self.final_df = None
 
 
@@ -22,7 +24,7 @@ class ReactivatedViewersJob(EtlJobV3):
 			WITH current_vod_viewers AS (
 				SELECT user_key,
 					   max(user_tier) as user_tier
-				FROM warehouse.vod_viewership
+				FROM {self.viewership}
 				WHERE user_key is not NULL
 				  AND user_tier in ('premium', 'trial', 'free')
 				  AND start_timestamp >= '{self.target_date}'
@@ -0,0 +1,145 @@
+import config
+from base.etl_jobv3 import EtlJobV3
+from utils.connectors.sns_api_connector import SNSApiConnector
+
+
+class RuntimeRegressionJob(EtlJobV3):
+
+    def __init__(self, target_date=None, db_connector=None, api_connector=None, file_location=''):
+        super().__init__(jobname=__name__, target_date=target_date, db_connector=db_connector)
+        self.target_date = target_date
+        self.sns_connector = SNSApiConnector(profile_name='roosterteeth', region_name='us-west-2', file_location=config.file_location, dry_run=self.db_connector.dry_run)
+        self.topic_arn = 'arn:aws:sns:us-west-2:928401392503:rt-data-anomalies'
+        self.schema = 'data_monitoring_tools'
+        self.RECENT_HOURS = 24
+        self.BASELINE_DAYS = config.runtime_regression_baseline_days
+        self.MIN_BASELINE_RUNS = 5
+        self.REGRESSION_FACTOR = config.runtime_regression_factor
+        self.MIN_REGRESSION_SECONDS = config.runtime_regression_min_seconds
+        self.runs = []
+        self.regressions = []
+
+
+    def has_run_metrics(self):
+        """run_metrics is only created once a job exports its metrics"""
+        results = self.db_connector.read_redshift(f"""
+            SELECT count(*)
+            FROM information_schema.tables
+            WHERE table_schema = '{self.schema}' AND table_name = 'run_metrics';
+        """)
+        return results[0][0] > 0
+
+
+    def query_runs(self):
+        """
+        Slowest successful run of each (process_handler, filename) in the last RECENT_HOURS, against the median of its
+        successful runs over the BASELINE_DAYS before that. Rows read and written come from run_metrics where recorded.
+        """
+        if self.has_run_metrics():
+            run_rows = f"""
+            SELECT job_start, filename, sum(value) AS rows
+            FROM {self.schema}.run_metrics
+            WHERE metric IN ('connector_rows_read', 'connector_rows_written')
+                AND job_start >= getdate() - interval '{self.BASELINE_DAYS} days' - interval '{self.RECENT_HOURS} hours'
+            GROUP BY 1, 2
+            """
+        else:
+            self.loggerv3.info(f'{self.schema}.run_metrics does not exist yet, comparing run times only')
+            run_rows = f"SELECT job_start, filename, NULL::float AS rows FROM {self.schema}.run_logs WHERE 1 = 0"
+        self.loggerv3.info('Querying run_logs')
+        query = f"""
+        WITH run_rows AS (
+            {run_rows}
+        ), runs AS (
+            SELECT
+                rl.process_handler,
+                rl.filename,
+                rl.job_start,
+                rl.run_time_sec,
+                rr.rows,
+                rl.job_start >= getdate() - interval '{self.RECENT_HOURS} hours' AS is_recent
+            FROM {self.schema}.run_logs rl
+            LEFT JOIN run_rows rr ON rr.job_start = rl.job_start AND rr.filename = rl.filename
+            WHERE rl.final_status = 'SUCCESS'
+                AND rl.job_start >= getdate() - interval '{self.BASELINE_DAYS} days' - interval '{self.RECENT_HOURS} hours'
+        ), recent AS (
+            SELECT
+                process_handler,
+                filename,
+                job_start,
+                run_time_sec,
+                rows,
+                row_number() OVER (PARTITION BY process_handler, filename ORDER BY run_time_sec DESC) AS rn
+            FROM runs
+            WHERE is_recent
+        ), baseline AS (
+            SELECT
+                process_handler,
+                filename,
+                count(*) AS baseline_runs,
+                median(run_time_sec) AS baseline_sec,
+                avg(rows) AS baseline_rows
+            FROM runs
+            WHERE NOT is_recent
+            GROUP BY 1, 2
+        )
+        SELECT
+            r.process_handler,
+            r.filename,
+            r.job_start,
+            r.run_time_sec,
+            r.rows,
+            b.baseline_runs,
+            b.baseline_sec,
+            b.baseline_rows
+        FROM recent r
+        JOIN baseline b ON b.process_handler = r.process_handler AND b.filename = r.filename
+        WHERE r.rn = 1;
+        """
+        results = self.db_connector.read_redshift(query)
+        for result in results:
+            self.runs.append({
+                'process_handler': result[0],
+                'filename': result[1],
+                'job_start': result[2],
+                'run_time_sec': float(result[3]) if result[3] is not None else None,
+                'rows': result[4],
+                'baseline_runs': result[5],
+                'baseline_sec': float(result[6]) if result[6] is not None else None,
+                'baseline_rows': result[7]
+            })
+
+
+    def detect_regressions(self):
+        self.loggerv3.info('Detecting Runtime Regressions')
+        for run in self.runs:
+            if run['run_time_sec'] is None or run['baseline_sec'] is None or run['baseline_runs'] < self.MIN_BASELINE_RUNS:
+                continue
+            # Short jobs are compared against at least a second, and must slow down by MIN_REGRESSION_SECONDS to count
+            if run['run_time_sec'] >= max(run['baseline_sec'], 1) * self.REGRESSION_FACTOR and run['run_time_sec'] - run['baseline_sec'] >= self.MIN_REGRESSION_SECONDS:
+                self.regressions.append(run)
+        self.loggerv3.info(f'{len(self.regressions)} regression(s) in {len(self.runs)} job(s)')
+
+
+    def build_message(self, run):
+        message = f"{run['filename']} ({run['process_handler']}) took {round(run['run_time_sec'] / 60, 1)} minutes at {run['job_start']}, "
+        message += f"{round(run['run_time_sec'] / run['baseline_sec'], 1) if run['baseline_sec'] > 0 else 'n/a'}x its "
+        message += f"{self.BASELINE_DAYS}-day median of {round(run['baseline_sec'] / 60, 1)} minutes over {run['baseline_runs']} runs."
+        if run['rows'] is not None and run['baseline_rows'] is not None:
+            message += f"\nRows read and written: {int(run['rows'])}, against an average of {int(run['baseline_rows'])}."
+        return message
+
+
+    def publish_regressions(self):
+        for run in self.regressions:
+            message = self.build_message(run)
+            self.loggerv3.warning(message)
+            self.sns_connector.send_message(topic_arn=self.topic_arn, message_title='JOB RUNTIME REGRESSION DETECTED', message_body=message)
+
+
+    def execute(self):
+        self.loggerv3.start(f"Running Runtime Regression Job for {self.target_date}")
+        self.query_runs()
+        self.detect_regressions()
+        self.publish_regressions()
+        self.loggerv3.success("All Processing Complete!")
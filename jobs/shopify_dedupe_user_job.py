@@ -157,12 +157,14 @@ class ShopifyDedupeUserJob(EtlJobV3):
 
 	def get_rooster_teeth_user_ids(self):
 		self.loggerv3.info('Getting rooster teeth user IDs')
-		results = self.db_connector.query_v2_db(f"""SELECT uuid, email
-													FROM production.users;
-												""")
+		external_ids = set([record['external_id'] for record in self.dupe_records])
 		self.rooster_teeth_user_ids = {}
-		for result in results:
-			self.rooster_teeth_user_ids[result[0]] = result[1].lower()
+		for results in self.db_connector.query_mysql_iter('v2_db', """SELECT uuid, email
+																	FROM production.users;
+																"""):
+			for result in results:
+				if result[0] in external_ids:
+					self.rooster_teeth_user_ids[result[0]] = result[1].lower()
 
 
 	def append_rooster_teeth_ids(self):
@@ -35,44 +35,20 @@ class ShopifyOrdersJob(EtlJobV3):
 				eol.sku IS NOT NULL
 				AND eol.variant_id is NOT NULL;
 		"""
-		results = self.db_connector.read_redshift(query)
-		for result in results:
-			self.orders_data.append({
-				'order_id': result[0],
-				'order_number': result[1],
-				'product_id': result[2],
-				'variant_id': result[3],
-				'quantity': result[4],
-				'shopify_id': result[5],
-				'order_total_cents': result[6],
-				'order_total_discounts_cents': result[7],
-				'sku': result[8],
-				'financial_status': result[9],
-				'fulfillment_status': result[10],
-				'landing_site': result[11],
-				'referring_site': result[12],
-				'created_at': result[13]
-			})
+		for chunk in self.db_connector.read_redshift_iter(query, as_dataframe=True):
+			self.orders_data.append(chunk)
 
-		self.final_dataframe = pd.DataFrame(self.orders_data)
-
-
-	def truncate_data(self):
-		self.loggerv3.info('Truncate data')
-		self.db_connector.write_redshift(f"""
-			TRUNCATE TABLE warehouse.{self.table_name};
-		""")
+		self.final_dataframe = pd.concat(self.orders_data, ignore_index=True) if len(self.orders_data) > 0 else pd.DataFrame()
 
 
 	def write_results_to_redshift(self):
 		self.loggerv3.info("Writing to Redshift...")
-		self.db_connector.write_to_sql(self.final_dataframe, self.table_name, self.db_connector.sv2_engine(), schema='warehouse', method='multi', index=False, if_exists='append', chunksize=5000)
+		self.db_connector.bulk_load(self.final_dataframe, self.table_name, schema='warehouse', mode='replace')
 		self.db_connector.update_redshift_table_permissions(self.table_name)
 
 
 	def execute(self):
 		self.loggerv3.info("Moving Shopify Orders Data")
 		self.get_orders_data()
-		self.truncate_data()
 		self.write_results_to_redshift()
 		self.loggerv3.success("All Processing Complete!")
@@ -71,21 +71,19 @@ class SupportingCastEpisodesJob(EtlJobV3):
 
     def get_rt_users(self):
         self.loggerv3.info('Getting RT users')
-        self.rt_users = []
-        results = self.db_connector.query_v2_db(f"""SELECT u.uuid, u.email, u.id
-                                                    FROM production.users u;
-                                                """)
-        for result in results:
-            self.rt_users.append({
-                'rt_uuid': result[0],
-                'email': result[1].lower(),
-                'rt_id': result[2]
-            })
+        record_emails = set(self.records_df['email'])
+        rt_users = []
+        for chunk in self.db_connector.query_mysql_iter('v2_db', """SELECT u.uuid as rt_uuid, u.email, u.id as rt_id
+                                                                    FROM production.users u;
+                                                                """, as_dataframe=True):
+            chunk['email'] = chunk['email'].str.lower()
+            rt_users.append(chunk[chunk['email'].isin(record_emails)])
+        self.rt_users = pd.concat(rt_users, ignore_index=True) if len(rt_users) > 0 else pd.DataFrame(columns=['rt_uuid', 'email', 'rt_id'])
 
 
     def merge_records_to_rt_users(self):
         self.loggerv3.info('Merging records to RT users')
-        self.rt_users_df = pd.DataFrame(self.rt_users, index=None)
+        self.rt_users_df = self.rt_users
         self.final_dataframe = self.records_df.merge(self.rt_users_df, on='email', how='left')
 
 
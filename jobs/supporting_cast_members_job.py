@@ -59,24 +59,20 @@ class SupportingCastMembersJob(EtlJobV3):
 
     def get_rt_users(self):
         self.loggerv3.info('Getting RT users')
-        self.rt_users = []
-        results = self.db_connector.query_v2_db(f"""SELECT u.uuid, u.email, u.id
-                                                    FROM production.users u;
-                                                """)
-
-        for result in results:
-            self.rt_users.append({
-                'rt_uuid': result[0],
-                'email': result[1].lower(),
-                'rt_id': result[2]
-            })
+        member_emails = set([record['email'] for record in self.member_records])
+        rt_users = []
+        for chunk in self.db_connector.query_mysql_iter('v2_db', """SELECT u.uuid as rt_uuid, u.email, u.id as rt_id
+                                                                    FROM production.users u;
+                                                                """, as_dataframe=True):
+            chunk['email'] = chunk['email'].str.lower()
+            rt_users.append(chunk[chunk['email'].isin(member_emails)])
+        self.rt_users = pd.concat(rt_users, ignore_index=True) if len(rt_users) > 0 else pd.DataFrame(columns=['rt_uuid', 'email', 'rt_id'])
 
 
     def merge_member_records_to_rt_users(self):
         self.loggerv3.info('Merging records to RT users')
         member_records_df = pd.DataFrame(self.member_records, index=None)
-        rt_users_df = pd.DataFrame(self.rt_users, index=None)
-        self.final_members_dataframe = member_records_df.merge(rt_users_df, on='email', how='left')
+        self.final_members_dataframe = member_records_df.merge(self.rt_users, on='email', how='left')
 
 
     def build_member_plans(self):
@@ -46,28 +46,8 @@ class ViewerGraphGenerator(EtlJobV3):
 					    vv.start_timestamp >= '{self.start_date}' AND
 					    vv.start_timestamp < '{self.cap_date}';"""
 
-		results = self.db_connector.read_redshift(query)
-		for result in results:
-			self.data['raw'].append({
-					'session_id': 								result[0],
-				    'user_key': 								result[1],
-				    'anonymous_id': 							result[2],
-				    'user_tier': 								result[3],
-				    'episode_key': 								result[4],
-				    'active_seconds': 							result[5],
-				    'start_timestamp': 							result[6],
-				    'platform': 								result[7],
-				    'series_title': 							result[8],
-				    'series_id': 								result[9],
-				    'season_title': 							result[10],
-				    'season_id': 								result[11],
-				    'episode_length_s': 						result[12],
-				    'episode_air_date': 						result[13],
-				    'episode_title':							result[14],
-				    'channel_title': 							result[15],
-				    'channel_id': 								result[16],
-				    'episode_number':							result[17]
-			})
+		# Arrow keeps nullable ids as ints and None, where pandas would turn them into floats and NaN
+		self.data['raw'] = self.db_connector.extract_bulk(query, as_arrow=True).to_pylist()
 
 
 	def parse_data(self):
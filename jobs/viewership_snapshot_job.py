@@ -0,0 +1,32 @@
+from base.etl_jobv3 import EtlJobV3
+from utils.components.viewership_snapshot import get_snapshot_window, VIEWERSHIP_RELATION
+
+
+class ViewershipSnapshotJob(EtlJobV3):
+
+	def __init__(self, target_date = None, db_connector = None, api_connector = None, file_location = '', days = 14):
+		super().__init__(jobname = __name__, target_date = target_date, db_connector = db_connector, table_name = 'vod_viewership_snapshot')
+		self.schema = 'staging'
+		self.window = get_snapshot_window(self.target_date, days)
+
+
+	def build_snapshot(self):
+		self.loggerv3.info(f"Snapshotting viewership from {self.window['start']} to {self.window['end']}")
+		self.db_connector.write_redshift(f"DROP TABLE IF EXISTS {self.schema}.{self.table_name};")
+		self.db_connector.write_redshift(f"""
+			CREATE TABLE {self.schema}.{self.table_name}
+			DISTKEY(user_key)
+			SORTKEY(start_timestamp)
+			AS
+			SELECT *
+			FROM {VIEWERSHIP_RELATION}
+			WHERE start_timestamp >= '{self.window['start']}'
+			  AND start_timestamp < '{self.window['end']}';
+		""")
+		self.db_connector.update_redshift_table_permissions(self.table_name, schema=self.schema)
+
+
+	def execute(self):
+		self.loggerv3.start(f"Running Viewership Snapshot for {self.target_date}")
+		self.build_snapshot()
+		self.loggerv3.success("All Processing Complete!")
@@ -11,9 +11,7 @@ class YouTubeWriteReportingJob(EtlJobV3):
         super().__init__(jobname=__name__, db_connector=db_connector, target_date=target_date)
         self.target_date = target_date  # Report Create Time from yt_job_history
         self.prod_schema = 'warehouse'
-        self.staging_schema = 'staging'
         self.prod_table = 'content_owner_combined_a2'
-        self.staging_table = 'stage_content_owner_combined_a2'
         self.bucket_name = 'rt-datapipeline'
         self.s3_folder = 'raw/yt-reporting'
         self.s3_api_connector = S3ApiConnector(file_location=self.file_location, bucket=self.bucket_name, profile_name='roosterteeth', dry_run=self.db_connector.dry_run)
@@ -112,10 +110,23 @@ class YouTubeWriteReportingJob(EtlJobV3):
         self.final_dataframe = self.final_dataframe.drop_duplicates()
 
 
-    def write_to_redshift_staging(self):
-        self.loggerv3.info('Writing to Redshift staging')
-        self.db_connector.write_to_sql(self.final_dataframe, self.staging_table, self.db_connector.sv2_engine(), schema=self.staging_schema, chunksize=5000, method='multi', index=False, if_exists='append')
-        self.db_connector.update_redshift_table_permissions(self.staging_table, self.staging_schema)
+    def upsert_to_redshift(self):
+        self.loggerv3.info('Upserting to Redshift')
+        self.db_connector.upsert(
+            self.final_dataframe,
+            self.prod_table,
+            keys=[
+                'start_date', 'channel_id', 'video_id', 'claimed_status', 'uploader_type', 'live_or_on_demand',
+                'subscribed_status', 'country_code', 'playback_location_type', 'traffic_source_type', 'device_type',
+                'operating_system'
+            ],
+            update_columns=[
+                'views', 'watch_time_minutes', 'average_view_duration_seconds', 'average_view_duration_percentage',
+                'red_views', 'red_watch_time_minutes'
+            ],
+            schema=self.prod_schema
+        )
+        self.db_connector.update_redshift_table_permissions(self.prod_table, self.prod_schema)
 
 
     def update_yt_job_history(self):
@@ -129,62 +140,6 @@ class YouTubeWriteReportingJob(EtlJobV3):
             self.db_connector.write_redshift(query)
 
 
-    def merge_stage_to_prod(self):
-        self.loggerv3.info('Merging staging to prod')
-        query = f"""
-            BEGIN TRANSACTION;
-            
-                UPDATE {self.prod_schema}.{self.prod_table}
-                SET 
-                    views = staging.views,
-                    watch_time_minutes = staging.watch_time_minutes,
-                    average_view_duration_seconds = staging.average_view_duration_seconds,
-                    average_view_duration_percentage = staging.average_view_duration_percentage,
-                    red_views = staging.red_views,
-                    red_watch_time_minutes = staging.red_watch_time_minutes
-                FROM {self.staging_schema}.{self.staging_table} staging
-                JOIN {self.prod_schema}.{self.prod_table} prod
-                    ON staging.start_date = prod.start_date
-                    AND staging.channel_id = prod.channel_id
-                    AND staging.video_id = prod.video_id
-                    AND staging.claimed_status = prod.claimed_status
-                    AND staging.uploader_type = prod.uploader_type
-                    AND staging.live_or_on_demand = prod.live_or_on_demand
-                    AND staging.subscribed_status = prod.subscribed_status
-                    AND staging.country_code = prod.country_code
-                    AND staging.playback_location_type = prod.playback_location_type
-                    AND staging.traffic_source_type = prod.traffic_source_type
-                    AND staging.device_type = prod.device_type
-                    AND staging.operating_system = prod.operating_system;
-    
-                DELETE FROM {self.staging_schema}.{self.staging_table}
-                USING {self.prod_schema}.{self.prod_table} prod
-                WHERE 
-                    prod.start_date = {self.staging_table}.start_date
-                    AND prod.channel_id = {self.staging_table}.channel_id
-                    AND prod.video_id = {self.staging_table}.video_id
-                    AND prod.claimed_status = {self.staging_table}.claimed_status
-                    AND prod.uploader_type = {self.staging_table}.uploader_type
-                    AND prod.live_or_on_demand = {self.staging_table}.live_or_on_demand
-                    AND prod.subscribed_status = {self.staging_table}.subscribed_status
-                    AND prod.country_code  = {self.staging_table}.country_code
-                    AND prod.playback_location_type = {self.staging_table}.playback_location_type
-                    AND prod.traffic_source_type = {self.staging_table}.traffic_source_type
-                    AND prod.device_type = {self.staging_table}.device_type
-                    AND prod.operating_system = {self.staging_table}.operating_system;
-    
-                INSERT INTO {self.prod_schema}.{self.prod_table}
-                SELECT * FROM {self.staging_schema}.{self.staging_table};
-    
-                TRUNCATE {self.staging_schema}.{self.staging_table};
-    
-                COMMIT;
-                
-            END TRANSACTION;
-        """
-        self.db_connector.write_redshift(query)
-
-
     def execute(self):
         self.loggerv3.start(f"Running YouTube Write Reporting Job")
         self.set_dates()
@@ -193,8 +148,7 @@ class YouTubeWriteReportingJob(EtlJobV3):
         self.download_from_s3()
         self.read_downloaded_files()
         self.clean_dataframe()
-        self.write_to_redshift_staging()
+        self.upsert_to_redshift()
         self.update_yt_job_history()
         self.clean_up()
-        self.merge_stage_to_prod()
         self.loggerv3.success("All Processing Complete!")
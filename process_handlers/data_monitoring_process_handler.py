@@ -4,6 +4,7 @@ from jobs.log_file_handler_job import LogFileHandlerJob
 from jobs.sv2_table_usage_job import Sv2TableUsageJob
 from jobs.file_identifier_job import FileIdentifierJob
 from jobs.anomaly_detection_job import AnomalyDetectionJob
+from jobs.runtime_regression_job import RuntimeRegressionJob
 from utils.connectors.database_connector import DatabaseConnector
 from utils.components.dater import Dater
 from utils.components.loggerv3 import Loggerv3
@@ -33,6 +34,9 @@ class DataMonitoringProcessHandler(ServerProcessHandler):
         adj = AnomalyDetectionJob(target_date=today, db_connector=self.connector)
         adj.execute()
 
+        rrj = RuntimeRegressionJob(target_date=today, db_connector=self.connector)
+        rrj.execute()
+
         fij = FileIdentifierJob(db_connector=self.connector)
         fij.execute()
 
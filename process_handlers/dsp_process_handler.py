@@ -1,28 +1,9 @@
 import config
+from base.job_dag import JobDag
+from base.job_runner import JobSpec
 from base.server_process_handler import ServerProcessHandler
-from jobs.premium_attributions_v3_job import PremiumAttributionsV3Job
-from jobs.core_dag_data_check_job import CoreDagDataCheckJob
-from jobs.agg_daily_membership_job import AggDailyMembershipJob
-from jobs.agg_daily_membership_job_v2 import AggDailyMembershipJobV2
-from jobs.agg_daily_rttv_viewership_job_v2 import AggDailyRttvViewershipJobV2
-from jobs.comments_job import CommentsJob
-from jobs.daily_combined_yt_rt_viewership_job import DailyCombinedYtRtViewershipJob
-from jobs.daily_web_signups_job import DailyWebSignupsJob
-from jobs.decile_reporting_job import DecileReportingJob
-from jobs.deleted_comments_job import DeletedCommentsJob
-from jobs.dim_episode_job import DimEpisodeJob
-from jobs.dim_shopify_rt_job import DimShopifyRtJob
-from jobs.dim_content_blocks_job import DimContentBlocksJob
-from jobs.engagements_job import EngagementsJob
-from jobs.giftcards_job import GiftcardsJob
-from jobs.livestream_schedule_job_v2 import LivestreamScheduleJobV2
-from jobs.subscription_count_job_v2 import SubscriptionCountJobV2
-from jobs.staff_created_comments_job import StaffCreatedCommentsJob
-from jobs.staff_created_posts_job import StaffCreatedPostsJob
-from jobs.signup_flow_campaign_attributions_job import SignupFlowCampaignAttributionsJob
-from jobs.youtube_rt_members_job import YouTubeRTMembersJob
-from jobs.weekly_audience_fan_community_job import WeeklyAudienceFanCommunityJob
 from utils.connectors.database_connector import DatabaseConnector
+from utils.components.checkpoint_store import CheckpointStore
 from utils.components.dater import Dater
 from utils.components.loggerv3 import Loggerv3
 
@@ -49,70 +30,30 @@ class DspProcessHandler(ServerProcessHandler):
 		yesterday = self.dater.format_date(self.dater.find_previous_day(self.dater.get_today()))
 		four_days_ago = self.dater.format_date(self.dater.find_x_days_ago(self.dater.get_today(), 4))
 
-		cddcj = CoreDagDataCheckJob(db_connector=self.connector)
-		cddcj.execute()
-
-		gcj = GiftcardsJob(target_date = yesterday, db_connector = self.connector)
-		gcj.execute()
-
-		dej = DimEpisodeJob(db_connector = self.connector)
-		dej.execute()
-
-		dsrj = DimShopifyRtJob(db_connector = self.connector)
-		dsrj.execute()
-
-		ej = EngagementsJob(target_date = yesterday, db_connector = self.connector)
-		ej.execute()
-
-		cj = CommentsJob(target_date = yesterday, db_connector = self.connector)
-		cj.execute()
-
-		admj = AggDailyMembershipJob(target_date = yesterday, db_connector = self.connector)
-		admj.execute()
-
-		dcj = DeletedCommentsJob(target_date = yesterday, db_connector = self.connector)
-		dcj.execute()
-
-		sccj = StaffCreatedCommentsJob(target_date = yesterday, db_connector = self.connector)
-		sccj.execute()
-
-		scpj = StaffCreatedPostsJob(target_date = yesterday, db_connector = self.connector)
-		scpj.execute()
-
-		wafcj = WeeklyAudienceFanCommunityJob(target_date=yesterday, db_connector=self.connector)
-		wafcj.execute()
-
-		scjv2 = SubscriptionCountJobV2(target_date=yesterday, db_connector=self.connector)
-		scjv2.execute()
-
-		admjv2 = AggDailyMembershipJobV2(target_date=yesterday, db_connector=self.connector)
-		admjv2.execute()
-
-		dcyrvj = DailyCombinedYtRtViewershipJob(target_date=yesterday, db_connector=self.connector)
-		dcyrvj.execute()
-
-		dwsj = DailyWebSignupsJob(target_date=yesterday, db_connector=self.connector)
-		dwsj.execute()
-
-		lsjv2 = LivestreamScheduleJobV2(target_date=yesterday, db_connector=self.connector)
-		lsjv2.execute()
-
-		adrvjv2 = AggDailyRttvViewershipJobV2(target_date=yesterday, db_connector=self.connector)
-		adrvjv2.execute()
-
-		dcbj = DimContentBlocksJob(db_connector = self.connector)
-		dcbj.execute()
-
-		tyrtmj = YouTubeRTMembersJob(db_connector=self.connector)
-		tyrtmj.execute()
-
-		sfcaj = SignupFlowCampaignAttributionsJob(db_connector=self.connector)
-		sfcaj.execute()
-
-		pajv3 = PremiumAttributionsV3Job(target_date=four_days_ago, db_connector=self.connector)
-		pajv3.execute()
-
-		drj = DecileReportingJob(target_date=yesterday, db_connector=self.connector)
-		drj.execute()
+		dag = JobDag(self.loggerv3, checkpoint_store=CheckpointStore(''.join([self.file_location, 'checkpoints/job_checkpoints.db'])))
+		core = ['core_dag_data_check']
+		dag.add('core_dag_data_check', JobSpec('jobs.core_dag_data_check_job.CoreDagDataCheckJob'), reads=['warehouse.vod_sessions'])
+		dag.add('giftcards', JobSpec('jobs.giftcards_job.GiftcardsJob', {'target_date': yesterday}), upstream=core, writes=['warehouse.giftcards'])
+		dag.add('dim_episode', JobSpec('jobs.dim_episode_job.DimEpisodeJob'), upstream=core, writes=['warehouse.dim_segment_episode'])
+		dag.add('dim_shopify_rt', JobSpec('jobs.dim_shopify_rt_job.DimShopifyRtJob'), upstream=core, writes=['warehouse.dim_shopify_rt'])
+		dag.add('engagements', JobSpec('jobs.engagements_job.EngagementsJob', {'target_date': yesterday}), upstream=core, writes=['warehouse.site_engagements'])
+		dag.add('comments', JobSpec('jobs.comments_job.CommentsJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.dim_segment_episode'], writes=['warehouse.comments'])
+		dag.add('agg_daily_membership', JobSpec('jobs.agg_daily_membership_job.AggDailyMembershipJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.subscription', 'warehouse.dim_user'], writes=['warehouse.agg_daily_segment_membership'])
+		dag.add('deleted_comments', JobSpec('jobs.deleted_comments_job.DeletedCommentsJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.dim_segment_episode'], writes=['warehouse.deleted_comments'])
+		dag.add('staff_created_comments', JobSpec('jobs.staff_created_comments_job.StaffCreatedCommentsJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.dim_segment_episode'], writes=['warehouse.staff_created_comments'])
+		dag.add('staff_created_posts', JobSpec('jobs.staff_created_posts_job.StaffCreatedPostsJob', {'target_date': yesterday}), upstream=core, writes=['warehouse.staff_created_posts'])
+		dag.add('weekly_audience_fan_community', JobSpec('jobs.weekly_audience_fan_community_job.WeeklyAudienceFanCommunityJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.vod_viewership', 'warehouse.livestream_viewership', 'warehouse.chat_event', 'warehouse.fact_visits', 'warehouse.shopify_orders', 'warehouse.dim_shopify_rt', 'warehouse.dim_user'], writes=['warehouse.weekly_audience_fan_community'])
+		dag.add('subscription_count_v2', JobSpec('jobs.subscription_count_job_v2.SubscriptionCountJobV2', {'target_date': yesterday}), upstream=core, writes=['warehouse.subscription_count_v2'])
+		dag.add('agg_daily_membership_v2', JobSpec('jobs.agg_daily_membership_job_v2.AggDailyMembershipJobV2', {'target_date': yesterday}), upstream=core, reads=['warehouse.subscription', 'warehouse.dim_user'], writes=['warehouse.agg_daily_membership_v2'])
+		dag.add('daily_combined_yt_rt_viewership', JobSpec('jobs.daily_combined_yt_rt_viewership_job.DailyCombinedYtRtViewershipJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.vod_viewership', 'warehouse.content_owner_combined_a2', 'warehouse.dim_yt_video_v2', 'warehouse.yt_video_map'], writes=['warehouse.daily_combined_yt_rt_viewership'])
+		dag.add('daily_web_signups', JobSpec('jobs.daily_web_signups_job.DailyWebSignupsJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.signup_flow_event', 'warehouse.gate_signup_complete', 'warehouse.hero_signup_complete', 'warehouse.chat_signup_complete', 'warehouse.community_signup_complete'], writes=['warehouse.daily_web_signups'])
+		dag.add('livestream_schedule_v2', JobSpec('jobs.livestream_schedule_job_v2.LivestreamScheduleJobV2', {'target_date': yesterday}), upstream=core, reads=['warehouse.dim_segment_episode'], writes=['warehouse.livestream_schedule_v2'])
+		dag.add('agg_daily_rttv_viewership', JobSpec('jobs.agg_daily_rttv_viewership_job_v2.AggDailyRttvViewershipJobV2', {'target_date': yesterday}), upstream=core, reads=['warehouse.livestream_heartbeat', 'warehouse.livestream_schedule_v2'], writes=['warehouse.agg_daily_rttv_viewership'])
+		dag.add('dim_content_blocks', JobSpec('jobs.dim_content_blocks_job.DimContentBlocksJob'), upstream=core, writes=['staging.stage_dim_content_blocks', 'warehouse.dim_content_blocks'])
+		dag.add('youtube_rt_members', JobSpec('jobs.youtube_rt_members_job.YouTubeRTMembersJob'), upstream=core, writes=['staging.stage_youtube_rt_members', 'warehouse.youtube_rt_members'])
+		dag.add('signup_flow_campaign_attributions', JobSpec('jobs.signup_flow_campaign_attributions_job.SignupFlowCampaignAttributionsJob'), upstream=core, reads=['warehouse.signup_flow_event', 'warehouse.subscription', 'warehouse.dim_user'], writes=['warehouse.signup_flow_campaign_attributions'])
+		dag.add('premium_attributions_v3', JobSpec('jobs.premium_attributions_v3_job.PremiumAttributionsV3Job', {'target_date': four_days_ago}), upstream=core, reads=['warehouse.vod_viewership', 'warehouse.livestream_heartbeat', 'warehouse.subscription', 'warehouse.dim_user', 'warehouse.dim_segment_episode', 'warehouse.livestream_schedule_v2', 'warehouse.signup_flow_campaign_attributions', 'warehouse.youtube_rt_members'], writes=['warehouse.premium_attributions_v3'])
+		dag.add('decile_reporting', JobSpec('jobs.decile_reporting_job.DecileReportingJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.vod_deciles'], writes=['warehouse.vod_decile_reporting'])
+		dag.run()
 
 		self.loggerv3.success("All Processing Complete!")
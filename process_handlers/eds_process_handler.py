@@ -1,35 +1,12 @@
 import config
+from base.job_dag import JobDag
+from base.job_runner import JobSpec
 from base.server_process_handler import ServerProcessHandler
-from jobs.core_dag_data_check_job import CoreDagDataCheckJob
+from utils.components.checkpoint_store import CheckpointStore
 from utils.components.dater import Dater
 from utils.connectors.database_connector import DatabaseConnector
-from jobs.agg_daily_general_engagement_job_v2 import AggDailyGeneralEngagementJobV2
-from jobs.agg_daily_livestream_job_v2 import AggDailyLivestreamJobV2
-from jobs.agg_daily_vod_job_v2 import AggDailyVodJobV2
-from jobs.agg_weekly_general_engagement_job_v2 import AggWeeklyGeneralEngagementJobV2
-from jobs.agg_weekly_livestream_job_v2 import AggWeeklyLivestreamJobV2
-from jobs.agg_weekly_vod_job_v2 import AggWeeklyVodJobV2
-from jobs.cancellation_request_lookbacks_job import CancellationRequestLookbacksJob
-from jobs.daily_at_risk_balance_job import DailyAtRiskBalanceJob
-from jobs.daily_median_platform_viewership_job import DailyMedianPlatformViewershipJob
-from jobs.daily_signups_job import DailySignupsJob
-from jobs.daily_subscription_pauses_job import DailySubscriptionPausesJob
-from jobs.first_two_weeks_viewership_job import FirstTwoWeeksViewershipJob
-# from jobs.ftp_viewership_lookback_job import FtpViewershipLookBackJob
-from jobs.new_viewers_job import NewViewersJob
-from jobs.new_viewers_viewership_job import NewViewersViewershipJob
-from jobs.new_viewer_retention_job import NewViewerRetentionJob
-from jobs.pending_cancel_balance_job import PendingCancelBalanceJob
-from jobs.premium_attributions_job import PremiumAttributionsJob
-from jobs.reactivated_viewers_job import ReactivatedViewersJob
-from jobs.returning_attributions_job import ReturningAttributionsJob
-from jobs.signup_attributions_job import SignupAttributionsJob
-# from jobs.trial_attribution_v2_job import TrialAttributionV2Job
-# from jobs.trial_behavior_v2_job import TrialBehaviorV2Job
-from jobs.vod_viewership_job import VodViewershipJob
-from jobs.weekly_median_platform_viewership_job import WeeklyMedianPlatformViewershipJob
-from jobs.livestream_viewership_job import LivestreamViewershipJob
 from utils.components.loggerv3 import Loggerv3
+from utils.components.viewership_snapshot import use_viewership_snapshot, SNAPSHOT_RELATION
 
 
 class EdsProcessHandler(ServerProcessHandler):
@@ -57,89 +34,42 @@ class EdsProcessHandler(ServerProcessHandler):
 		seven_days_ago = self.dater.format_date(self.dater.find_x_days_ago(self.dater.get_today(), 7))
 		ten_days_ago = self.dater.format_date(self.dater.find_x_days_ago(self.dater.get_today(), 10))
 
-		cddcj = CoreDagDataCheckJob(db_connector=self.connector)
-		cddcj.execute()
-
-		vvj = VodViewershipJob(target_date = yesterday, db_connector = self.connector)
-		vvj.execute()
-
-		lvj = LivestreamViewershipJob(target_date = yesterday, db_connector = self.connector)
-		lvj.execute()
-
+		# Jobs read warehouse.vod_viewership until the snapshot has been rebuilt in this run
+		config.viewership_snapshot = None
+		dag = JobDag(self.loggerv3, checkpoint_store=CheckpointStore(''.join([self.file_location, 'checkpoints/job_checkpoints.db'])))
+		core = ['core_dag_data_check']
+		dag.add('core_dag_data_check', JobSpec('jobs.core_dag_data_check_job.CoreDagDataCheckJob'), reads=['warehouse.vod_sessions'])
+		dag.add('vod_viewership', JobSpec('jobs.vod_viewership_job.VodViewershipJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.vod_sessions'], writes=['warehouse.vod_viewership'])
+		# One scan of the trailing two weeks of viewership, read by the jobs below instead of warehouse.vod_viewership
+		dag.add('viewership_snapshot', JobSpec('jobs.viewership_snapshot_job.ViewershipSnapshotJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.vod_viewership'], writes=[SNAPSHOT_RELATION], on_success=lambda: use_viewership_snapshot(yesterday))
+		dag.add('livestream_viewership', JobSpec('jobs.livestream_viewership_job.LivestreamViewershipJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.livestream_heartbeat'], writes=['warehouse.livestream_viewership'])
 		# Commenting out due to removal of public trials from site
-		# taj = TrialAttributionV2Job(target_date = seven_days_ago, db_connector = self.connector)
-		# taj.execute()
-
-		sa = SignupAttributionsJob(target_date = two_days_ago, db_connector = self.connector)
-		sa.execute()
-
-		ra = ReturningAttributionsJob(target_date = two_days_ago, db_connector = self.connector)
-		ra.execute()
-
-		dmpv = DailyMedianPlatformViewershipJob(target_date = yesterday, db_connector = self.connector)
-		dmpv.execute()
-
-		wmpv = WeeklyMedianPlatformViewershipJob(target_date = yesterday, db_connector = self.connector)
-		wmpv.execute()
-
-		pcbj = PendingCancelBalanceJob(target_date = yesterday, db_connector = self.connector)
-		pcbj.execute()
-
-		crlbj = CancellationRequestLookbacksJob(target_date = yesterday, db_connector = self.connector)
-		crlbj.execute()
-
-		dspj = DailySubscriptionPausesJob(target_date = yesterday, db_connector = self.connector)
-		dspj.execute()
-
-		adlj = AggDailyLivestreamJobV2(target_date = yesterday, db_connector = self.connector)
-		adlj.execute()
-
-		awlj = AggWeeklyLivestreamJobV2(target_date = yesterday, db_connector = self.connector)
-		awlj.execute()
-
-		adgejv2 = AggDailyGeneralEngagementJobV2(target_date = yesterday, db_connector = self.connector)
-		adgejv2.execute()
-
-		awgejv2 = AggWeeklyGeneralEngagementJobV2(target_date = yesterday, db_connector = self.connector)
-		awgejv2.execute()
-
-		advjv2 = AggDailyVodJobV2(target_date = yesterday, db_connector = self.connector)
-		advjv2.execute()
-
-		awvjv2 = AggWeeklyVodJobV2(target_date = yesterday, db_connector = self.connector)
-		awvjv2.execute()
-
-		nvj = NewViewersJob(target_date = yesterday, db_connector = self.connector)
-		nvj.execute()
-
-		nvrj = NewViewerRetentionJob(target_date = today, db_connector = self.connector)
-		nvrj.execute()
-
-		darbj = DailyAtRiskBalanceJob(target_date = today, db_connector = self.connector)
-		darbj.execute()
-
-		ftwsvj = FirstTwoWeeksViewershipJob(target_date = today, db_connector = self.connector)
-		ftwsvj.execute()
-
+		# dag.add('trial_attribution_v2', JobSpec('jobs.trial_attribution_v2_job.TrialAttributionV2Job', {'target_date': seven_days_ago}), upstream=core)
+		dag.add('signup_attributions', JobSpec('jobs.signup_attributions_job.SignupAttributionsJob', {'target_date': two_days_ago}), upstream=core, reads=['warehouse.vod_viewership', 'warehouse.subscription', 'warehouse.dim_segment_episode'], writes=['warehouse.signup_attributions'])
+		dag.add('returning_attributions', JobSpec('jobs.returning_attributions_job.ReturningAttributionsJob', {'target_date': two_days_ago}), upstream=core, reads=['warehouse.vod_viewership', 'warehouse.subscription', 'warehouse.dim_segment_episode'], writes=['warehouse.returning_attributions'])
+		dag.add('daily_median_platform_viewership', JobSpec('jobs.daily_median_platform_viewership_job.DailyMedianPlatformViewershipJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.vod_viewership'], writes=['warehouse.daily_median_platform_viewership'])
+		dag.add('weekly_median_platform_viewership', JobSpec('jobs.weekly_median_platform_viewership_job.WeeklyMedianPlatformViewershipJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.vod_viewership'], writes=['warehouse.weekly_median_platform_viewership'])
+		dag.add('pending_cancel_balance', JobSpec('jobs.pending_cancel_balance_job.PendingCancelBalanceJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.subscription'], writes=['warehouse.pending_cancel_balance'])
+		dag.add('cancellation_request_lookbacks', JobSpec('jobs.cancellation_request_lookbacks_job.CancellationRequestLookbacksJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.subscription', 'warehouse.vod_viewership', 'warehouse.livestream_viewership', 'warehouse.dim_user', 'warehouse.dim_segment_episode'], writes=['warehouse.cancellation_request_lookbacks'])
+		dag.add('daily_subscription_pauses', JobSpec('jobs.daily_subscription_pauses_job.DailySubscriptionPausesJob', {'target_date': yesterday}), upstream=core, reads=['warehouse.subscription'], writes=['warehouse.daily_subscription_pauses'])
+		dag.add('agg_daily_livestream', JobSpec('jobs.agg_daily_livestream_job_v2.AggDailyLivestreamJobV2', {'target_date': yesterday}), upstream=core, reads=['warehouse.livestream_viewership'], writes=['warehouse.agg_daily_livestream'])
+		dag.add('agg_weekly_livestream', JobSpec('jobs.agg_weekly_livestream_job_v2.AggWeeklyLivestreamJobV2', {'target_date': yesterday}), upstream=core, reads=['warehouse.livestream_viewership'], writes=['warehouse.agg_weekly_livestream'])
+		dag.add('agg_daily_general_engagement', JobSpec('jobs.agg_daily_general_engagement_job_v2.AggDailyGeneralEngagementJobV2', {'target_date': yesterday}), upstream=core, reads=[SNAPSHOT_RELATION, 'warehouse.vod_viewership', 'warehouse.livestream_viewership', 'warehouse.dim_user', 'warehouse.fact_visits'], writes=['warehouse.agg_daily_general_engagement'])
+		dag.add('agg_weekly_general_engagement', JobSpec('jobs.agg_weekly_general_engagement_job_v2.AggWeeklyGeneralEngagementJobV2', {'target_date': yesterday}), upstream=core, reads=[SNAPSHOT_RELATION, 'warehouse.vod_viewership', 'warehouse.livestream_viewership', 'warehouse.dim_user', 'warehouse.fact_visits'], writes=['warehouse.agg_weekly_general_engagement'])
+		dag.add('agg_daily_vod', JobSpec('jobs.agg_daily_vod_job_v2.AggDailyVodJobV2', {'target_date': yesterday}), upstream=core, reads=[SNAPSHOT_RELATION, 'warehouse.vod_viewership'], writes=['warehouse.agg_daily_vod'])
+		dag.add('agg_weekly_vod', JobSpec('jobs.agg_weekly_vod_job_v2.AggWeeklyVodJobV2', {'target_date': yesterday}), upstream=core, reads=[SNAPSHOT_RELATION, 'warehouse.vod_viewership'], writes=['warehouse.agg_weekly_vod'])
+		dag.add('new_viewers', JobSpec('jobs.new_viewers_job.NewViewersJob', {'target_date': yesterday}), upstream=core, reads=[SNAPSHOT_RELATION, 'warehouse.vod_viewership'], writes=['warehouse.new_viewers'])
+		dag.add('new_viewer_retention', JobSpec('jobs.new_viewer_retention_job.NewViewerRetentionJob', {'target_date': today}), upstream=core, reads=['warehouse.vod_viewership'], writes=['warehouse.new_viewer_retention'])
+		dag.add('daily_at_risk_balance', JobSpec('jobs.daily_at_risk_balance_job.DailyAtRiskBalanceJob', {'target_date': today}), upstream=core, reads=['warehouse.subscription', 'warehouse.vod_viewership'], writes=['warehouse.daily_at_risk_balance'])
+		dag.add('first_two_weeks_viewership', JobSpec('jobs.first_two_weeks_viewership_job.FirstTwoWeeksViewershipJob', {'target_date': today}), upstream=core, reads=['warehouse.subscription', 'warehouse.vod_viewership', 'warehouse.livestream_viewership', 'warehouse.dim_user', 'warehouse.dim_segment_episode'], writes=['warehouse.first_two_weeks_viewership'])
 		# Commenting out due to removal of public trials from site
-		# fvlj = FtpViewershipLookBackJob(target_date=yesterday, db_connector=self.connector)
-		# fvlj.execute()
-
-		nvvj = NewViewersViewershipJob(target_date=yesterday, db_connector=self.connector)
-		nvvj.execute()
-
-		rvj = ReactivatedViewersJob(target_date=yesterday, db_connector=self.connector)
-		rvj.execute()
-
-		daj = DailySignupsJob(target_date=two_days_ago, db_connector=self.connector)
-		daj.execute()
-
-		paj = PremiumAttributionsJob(target_date=two_days_ago, db_connector=self.connector)
-		paj.execute()
-
+		# dag.add('ftp_viewership_lookback', JobSpec('jobs.ftp_viewership_lookback_job.FtpViewershipLookBackJob', {'target_date': yesterday}), upstream=core)
+		dag.add('new_viewers_viewership', JobSpec('jobs.new_viewers_viewership_job.NewViewersViewershipJob', {'target_date': yesterday}), upstream=core, reads=[SNAPSHOT_RELATION, 'warehouse.vod_viewership', 'warehouse.dim_segment_episode'], writes=['warehouse.new_viewers_viewership'])
+		dag.add('reactivated_viewers', JobSpec('jobs.reactivated_viewers_job.ReactivatedViewersJob', {'target_date': yesterday}), upstream=core, reads=[SNAPSHOT_RELATION, 'warehouse.vod_viewership', 'warehouse.livestream_viewership', 'warehouse.dim_user'], writes=['warehouse.reactivated_viewers'])
+		dag.add('daily_signups', JobSpec('jobs.daily_signups_job.DailySignupsJob', {'target_date': two_days_ago}), upstream=core, reads=['warehouse.signup_flow_event'], writes=['warehouse.daily_signups'])
+		dag.add('premium_attributions', JobSpec('jobs.premium_attributions_job.PremiumAttributionsJob', {'target_date': two_days_ago}), upstream=core, reads=['warehouse.vod_viewership', 'warehouse.subscription', 'warehouse.dim_segment_episode'], writes=['warehouse.premium_attributions_v2'])
 		# Commenting out due to removal of public trials from site
-		# tb = TrialBehaviorV2Job(target_date=ten_days_ago, db_connector=self.connector)
-		# tb.execute()
-
+		# dag.add('trial_behavior_v2', JobSpec('jobs.trial_behavior_v2_job.TrialBehaviorV2Job', {'target_date': ten_days_ago}), upstream=core)
+		dag.run()
 
 		self.loggerv3.success("All Processing Complete!")
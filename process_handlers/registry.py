@@ -0,0 +1,69 @@
+import importlib
+import inspect
+
+
+# Server name -> dotted path of its process handler. Handlers are imported only when run, so starting one
+# does not pay for importing every other handler's jobs and their dependencies
+HANDLERS = {
+	'eds': 'process_handlers.eds_process_handler.EdsProcessHandler',
+	'eds-hf': 'process_handlers.eds_high_frequency_process_handler.EdsHighFrequencyProcessHandler',
+	'on-demand': 'process_handlers.on_demand_process_handler.OnDemandProcessHandler',
+	'eds-m': 'process_handlers.eds_monthly_process_handler.EdsMonthlyProcessHandler',
+	'dsp': 'process_handlers.dsp_process_handler.DspProcessHandler',
+	'dsp-hf': 'process_handlers.dsp_high_frequency_process_handler.DspHighFrequencyProcessHandler',
+	'braze': 'process_handlers.braze_process_handler.BrazeProcessHandler',
+	'dsp-sc': 'process_handlers.dsp_supporting_cast_process_handler.DspSupportingCastProcessHandler',
+	'dsp-ad': 'process_handlers.dsp_after_dark_process_handler.DspAfterDarkProcessHandler',
+	'megaphone': 'process_handlers.megaphone_process_handler.MegaphoneProcessHandler',
+	'dsp-p': 'process_handlers.dsp_popularity_process_handler.DspPopularityProcessHandler',
+	'dsp-yt': 'process_handlers.dsp_youtube_process_handler.DspYouTubeProcessHandler',
+	'dsp-at': 'process_handlers.dsp_airtable_process_handler.DspAirtableProcessHandler',
+	'quarterly-sales': 'process_handlers.quarterly_sales_process_handler.QuarterlySalesProcessHandler',
+	'graph': 'process_handlers.graph_process_handler.GraphProcessHandler',
+	'weekly-data-review': 'process_handlers.weekly_data_review_process_handler.WeeklyDataReviewProcessHandler',
+	'yt-channel-scraper': 'process_handlers.yt_channel_scraper_process_handler.YTChannelScraperProcessHandler',
+	'sales-metrics': 'process_handlers.sales_metrics_process_handler.SalesMetricsProcessHandler',
+	'mpa': 'process_handlers.monthly_premium_attributions_process_handler.MonthlyPremiumAttributionsProcessHandler',
+	'channel-trajectory': 'process_handlers.channel_trajectory_process_handler.ChannelTrajectoryProcessHandler',
+	'data-monitoring': 'process_handlers.data_monitoring_process_handler.DataMonitoringProcessHandler'
+}
+
+# Handlers run from olympus_main.py
+OLYMPUS_HANDLERS = [name for name in HANDLERS if name not in ('quarterly-sales', 'graph', 'weekly-data-review', 'yt-channel-scraper')]
+
+
+def get_handler(name, servers=None):
+	"""
+	Imports and returns the process handler class registered under name.
+
+	:param name: Server name, e.g. dsp-hf
+	:param servers: Names allowed to run. Defaults to every registered handler
+	"""
+	if name not in (servers if servers is not None else HANDLERS):
+		raise ValueError(f'Unknown process handler: {name}')
+	module_path, class_name = HANDLERS[name].rsplit('.', 1)
+	return getattr(importlib.import_module(module_path), class_name)
+
+
+def get_handler_kwargs(name, target_date=None, dry_run=False, servers=None):
+	"""
+	Arguments for the handler's constructor besides local_mode.
+
+	Raises ValueError when target_date or dry_run is set for a handler that does not take it, rather than running it
+	for today's dates or against production.
+	"""
+	parameters = inspect.signature(get_handler(name, servers)).parameters
+	kwargs = {}
+	for parameter, value in (('target_date', target_date), ('dry_run', dry_run)):
+		if not value:
+			continue
+		if parameter not in parameters:
+			raise ValueError(f'{name} does not take {parameter}')
+		kwargs[parameter] = value
+	return kwargs
+
+
+def run_handler(name, local_mode=None, servers=None, target_date=None, dry_run=False):
+	handler = get_handler(name, servers)(local_mode, **get_handler_kwargs(name, target_date, dry_run, servers))
+	handler.run_jobs()
+	return handler
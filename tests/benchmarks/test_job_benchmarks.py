@@ -0,0 +1,214 @@
+"""
+Benchmarks of the Python side of key jobs, run against replayed warehouse fixtures at 1x, 10x and 100x scale.
+
+Run with: python -m pytest tests/benchmarks --benchmark-only
+Compare runs with --benchmark-autosave and --benchmark-compare.
+
+Fixtures are generated from a seeded synthetic warehouse, recorded through RecordReplayConnector exactly as a
+live run would be, then replayed with their rows repeated per scale. Fixtures recorded from a live connector
+into the same directory layout replay the same way.
+"""
+import copy
+import os
+import pytest
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+import pandas as pd
+import pyarrow as pa
+from utils.connectors.record_replay_connector import RecordReplayConnector
+
+pytest.importorskip('pytest_benchmark')
+
+SCALES = [1, 10, 100]
+TIERS = ['anon', 'free', 'trial', 'premium']
+
+
+class SyntheticWarehouse:
+
+    def __init__(self, results):
+        """Live connector stand-in that answers each query with the first result whose marker the query contains"""
+        self.results = results
+        self.dry_run = True
+
+
+    def lookup(self, query):
+        for marker, result in self.results:
+            if marker in query:
+                return result
+        raise KeyError(f'No synthetic result for query: {query[:100]}')
+
+
+    def read_redshift(self, query):
+        return self.lookup(query)
+
+
+    def extract_bulk(self, query, as_arrow=False, max_workers=8):
+        result = self.lookup(query)
+        return pa.Table.from_pandas(result, preserve_index=False) if as_arrow is True else result
+
+
+    def query_mysql_iter(self, target, query, chunk_rows=10000, as_dataframe=False):
+        rows = self.lookup(query)
+        for idx in range(0, len(rows), chunk_rows):
+            yield rows[idx:idx + chunk_rows]
+
+
+@pytest.fixture(scope='module')
+def fixture_root():
+    directory = tempfile.mkdtemp()
+    yield directory
+    shutil.rmtree(directory)
+
+
+def build_job(job_cls, db_connector, **kwargs):
+    with patch('base.etl_jobv3.Loggerv3', MagicMock()):
+        return job_cls(db_connector=db_connector, **kwargs)
+
+
+def replay_job(fixture_directory, job_cls, synthetic, loaders, scale, **kwargs):
+    """Records the loaders' queries against the synthetic warehouse once, then builds a job replaying them at scale"""
+    if not os.path.isfile(os.path.join(fixture_directory, 'index.json')):
+        recorder = RecordReplayConnector(fixture_directory, connector=SyntheticWarehouse(synthetic()), mode='record')
+        job = build_job(job_cls, recorder, **kwargs)
+        for loader in loaders:
+            getattr(job, loader)()
+    job = build_job(job_cls, RecordReplayConnector(fixture_directory, scale=scale), **kwargs)
+    for loader in loaders:
+        getattr(job, loader)()
+    return job
+
+
+def viewership_rows(rng, rows=2000):
+    start = datetime(2022, 10, 1)
+    return pd.DataFrame([{
+        'session_id': f'session-{idx}',
+        'user_key': rng.randint(1, rows // 4),
+        'anonymous_id': f'anon-{rng.randint(1, rows)}',
+        'user_tier': rng.choice(TIERS),
+        'episode_key': rng.randint(1, 300),
+        'active_seconds': rng.randint(0, 3600),
+        'start_timestamp': (start + timedelta(days=rng.randint(0, 30))).strftime('%Y-%m-%d'),
+        'platform': rng.choice(['web', 'ios', 'android', 'roku']),
+        'series_title': f'Series {idx % 40}',
+        'series_id': idx % 40,
+        'season_title': f'Season {idx % 120}',
+        'season_id': idx % 120 if idx % 7 else None,
+        'episode_length_s': rng.choice([0, 600, 1200, 1800, 3600]),
+        'episode_air_date': '2022-09-01',
+        'episode_title': f'Episode {idx % 300}',
+        'channel_title': f'Channel {idx % 8}',
+        'channel_id': idx % 8,
+        'episode_number': idx % 20
+    } for idx in range(rows)])
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def test_viewer_graph_parse_data(benchmark, fixture_root, scale):
+    from jobs.viewer_graph_generator_job import ViewerGraphGenerator
+    rng = random.Random(7)
+    job = replay_job(f'{fixture_root}/viewer_graph', ViewerGraphGenerator, lambda: [('vod_viewership', viewership_rows(rng))], ['get_raw_data'], scale)
+    raw = job.data['raw']
+
+    def setup():
+        job.data = {'raw': raw}
+
+    benchmark.pedantic(job.parse_data, setup=setup, rounds=3)
+    assert len(job.data['watches']) > 0
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def test_agg_daily_general_engagement_process(benchmark, fixture_root, scale):
+    from jobs.agg_daily_general_engagement_job_v2 import AggDailyGeneralEngagementJobV2
+    rng = random.Random(11)
+
+    def synthetic():
+        vod = [(f'anon-{idx}', idx if idx % 5 else None, rng.choice(TIERS + ['double_gold']), rng.randint(1, 7200)) for idx in range(5000)]
+        live = [(idx, rng.choice(['free', 'trial', 'premium', 'double_gold']), rng.randint(1, 7200)) for idx in range(2500, 6000)]
+        return [('fact_visits', [(12345,)]), ('livestream_viewership', live), ('vod_viewership', vod)]
+
+    job = replay_job(f'{fixture_root}/general_engagement', AggDailyGeneralEngagementJobV2, synthetic, ['process'], scale, target_date='2023-03-14')
+
+    def setup():
+        job.vod_viewers = {}
+        job.live_viewers = {}
+
+    benchmark.pedantic(job.process, setup=setup, rounds=3)
+    assert job.ge_df['total_unique_visitors'][0] == 12345
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def test_decile_reporting_process_decile_records(benchmark, fixture_root, scale):
+    from jobs.decile_reporting_job import DecileReportingJob
+    rng = random.Random(13)
+
+    def synthetic():
+        return [('vod_deciles', pd.DataFrame([{
+            'session_id': f'session-{idx}',
+            'user_key': rng.randint(1, 1000),
+            'user_tier': rng.choice(TIERS),
+            'anonymous_id': f'anon-{idx}',
+            'episode_key': rng.randint(1, 300),
+            'start_timestamp': '2023-03-14 12:00:00',
+            'platform': 'web',
+            'on_mobile_device': rng.random() < 0.5,
+            'decile': int(''.join([rng.choice('01') for _ in range(11)]))
+        } for idx in range(5000)]))]
+
+    job = replay_job(f'{fixture_root}/deciles', DecileReportingJob, synthetic, ['load_decile_records'], scale, target_date='2023-03-14')
+    benchmark.pedantic(job.process_decile_records, rounds=3)
+    assert len(job.parsed_deciles.index) == 5000 * scale
+
+
+def braze_records(rng, emails=1000):
+    records = []
+    for idx in range(emails * 2):
+        email = f'user{idx % emails}@mail.com'
+        last_used = (datetime(2021, 1, 1) + timedelta(minutes=rng.randint(0, 500000))).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        records.append({
+            'external_id': f'external-{idx}',
+            'email': email,
+            'apps': [{'name': 'RoosterTeeth', 'last_used': last_used}] if idx % 3 else None,
+            'total_revenue': float(rng.choice([0, 0, 5, 10])),
+            'custom_attributes': {f'attribute_{key}': True for key in range(rng.randint(0, 12))} if idx % 4 else None,
+            'custom_events': [{'name': f'Event {key}', 'first': '2020-06-26T21:48:58.581Z', 'last': last_used, 'count': rng.randint(1, 3)} for key in range(rng.randint(0, 3))],
+            'purchases': [{'name': '672', 'first': '2021-10-21T10:49:10.000Z', 'last': '2021-10-21T10:49:10.000Z', 'count': 1}] if idx % 5 == 0 else None
+        })
+    return records
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def test_shopify_dedupe_pipeline(benchmark, fixture_root, scale):
+    from jobs.shopify_dedupe_user_job import ShopifyDedupeUserJob
+    rng = random.Random(17)
+    records = braze_records(rng, emails=1000 * scale)
+    users = [(record['external_id'], record['email'].upper()) for record in records if int(record['external_id'].split('-')[1]) % 2]
+    fixture_directory = f'{fixture_root}/shopify_{scale}'
+    braze_api_connector = RecordReplayConnector(f'{fixture_root}/braze')
+    braze_api_connector.app_id = 'app'
+    with patch('jobs.shopify_dedupe_user_job.BrazeApiConnector', return_value=braze_api_connector), \
+            patch('jobs.shopify_dedupe_user_job.S3ApiConnector', return_value=RecordReplayConnector(f'{fixture_root}/s3')):
+        job = build_job(ShopifyDedupeUserJob, RecordReplayConnector(fixture_directory, connector=SyntheticWarehouse([('production.users', users)]), mode='record'))
+    # Records are generated per scale rather than repeated, since repeated records would collapse into the same emails
+    job.dupe_records = copy.deepcopy(records)
+    job.get_rooster_teeth_user_ids()
+    job.db_connector = RecordReplayConnector(fixture_directory)
+    pipeline = [
+        'extract_last_used_attribute', 'determine_max_last_used', 'get_rooster_teeth_user_ids', 'append_rooster_teeth_ids',
+        'extract_custom_attribute_count', 'determine_max_custom_attributes', 'extract_custom_events_into_dict', 'select_records_to_update',
+        'check_for_missing_records_to_update', 'select_records_to_remove', 'append_new_custom_attributes', 'append_update_new_custom_event',
+        'append_new_purchases', 'update_total_revenue', 'build_attributes_output_data_structure', 'build_events_output_data_structure',
+        'build_purchases_output_data_structure', 'create_attribute_batches', 'create_event_batches', 'create_purchase_batches', 'create_remove_batches'
+    ]
+
+    def setup():
+        job.dupe_records = copy.deepcopy(records)
+
+    def run():
+        for phase in pipeline:
+            getattr(job, phase)()
+
+    benchmark.pedantic(run, setup=setup, rounds=3)
+    assert len(job.records_to_remove) == 1000 * scale
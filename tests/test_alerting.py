@@ -0,0 +1,64 @@
+import config
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from utils.components.alert_coalescer import AlertCoalescer
+from utils.components.loggerv3 import Loggerv3
+from utils.components.record_buffer_handler import read_last_json_line
+
+
+class FakeAlerter:
+
+    def __init__(self):
+        self.alerts = []
+
+
+    def alert(self, log_line, job_name):
+        self.alerts.append([(log_line, job_name)])
+
+
+    def alert_many(self, alerts):
+        self.alerts.append(alerts)
+
+
+class TestAlerting(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + '/'
+
+
+    def test_equal_burst_sent_as_one_alert(self):
+        alerter = FakeAlerter()
+        coalescer = AlertCoalescer(window_seconds=600)
+        for idx in range(3):
+            coalescer.add(alerter, {'message': f'error {idx}'}, f'jobs.job_{idx}')
+        self.assertEqual(alerter.alerts, [])
+        self.assertEqual(coalescer.flush(), 3)
+        self.assertEqual(len(alerter.alerts), 1)
+        self.assertEqual([job_name for _, job_name in alerter.alerts[0]], ['jobs.job_0', 'jobs.job_1', 'jobs.job_2'])
+
+
+    def test_equal_alert_built_from_buffered_record(self):
+        with patch('utils.components.loggerv3.OpsGenieAPIConnector', MagicMock()):
+            loggerv3 = Loggerv3(name='tests.alerting_job', file_location=self.directory, local_mode=True)
+        loggerv3.info('Starting')
+        with patch('builtins.open', side_effect=AssertionError('log file read')):
+            log_line = loggerv3.get_last_log_line()
+        self.assertEqual((log_line['message'], log_line['level']), ('Starting', 'INFO'))
+        loggerv3.close()
+        self.assertEqual(loggerv3.get_last_log_line()['message'], 'Starting')
+
+
+    def test_equal_last_json_line_read_from_tail(self):
+        path = self.directory + 'log.json'
+        with open(path, 'w') as f:
+            for idx in range(2000):
+                f.write(json.dumps({'message': f'line {idx}'}) + '\n')
+        self.assertEqual(read_last_json_line(path, block_size=64), {'message': 'line 1999'})
+
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
@@ -0,0 +1,174 @@
+import config
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+from sqlalchemy import create_engine
+from unittest.mock import MagicMock, patch
+from utils.connectors.database_connector import DatabaseConnector
+
+
+class TestDatabaseConnectorWriteBuffer(unittest.TestCase):
+
+
+    def setUp(self):
+        with patch('base.connector.SecretSquirrel', MagicMock()):
+            self.connector = DatabaseConnector('')
+        self.statements = []
+        self.engine = MagicMock()
+        self.engine.connect.return_value.execute.side_effect = lambda query: self.statements.append(query) or MagicMock(rowcount=0)
+        self.connector.sv2_engine = MagicMock(return_value=self.engine)
+        self.connector.get_last_query_id = MagicMock(return_value=None)
+        self.connector.bulk_load = MagicMock(side_effect=lambda dataframe, table_name, schema: self.statements.append(f'bulk_load {schema}.{table_name} {len(dataframe)}'))
+        self.connector.buffer_writes()
+
+
+    def test_equal_buffer_flushed_before_next_statement(self):
+        dataframe = pd.DataFrame({'id': [1, 2]})
+        self.connector.write_to_sql(dataframe, 'stage_dim_content_blocks', self.engine, schema='staging', index=False, if_exists='append')
+        self.connector.write_to_sql(dataframe, 'stage_dim_content_blocks', self.engine, schema='staging', index=False, if_exists='append')
+        self.assertEqual(self.statements, [])
+        self.connector.write_redshift('INSERT INTO warehouse.dim_content_blocks SELECT * FROM staging.stage_dim_content_blocks;')
+        self.assertEqual(self.statements, [
+            'bulk_load staging.stage_dim_content_blocks 4',
+            'INSERT INTO warehouse.dim_content_blocks SELECT * FROM staging.stage_dim_content_blocks;'
+        ])
+
+
+    def test_equal_typed_append_written_directly(self):
+        self.connector.write_to_sql(pd.DataFrame({'id': [1]}), 'comments', self.engine, schema='warehouse', index=False, if_exists='append')
+        with patch('utils.connectors.database_connector.sql.to_sql') as to_sql:
+            self.connector.write_to_sql(pd.DataFrame({'id': [2]}), 'comments', self.engine, schema='warehouse', index=False, if_exists='append', dtype={'id': 'BIGINT'})
+        self.assertEqual(self.statements, ['bulk_load warehouse.comments 1'])
+        self.assertEqual(to_sql.call_args.kwargs['dtype'], {'id': 'BIGINT'})
+
+
+class TestDatabaseConnectorQueryCache(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with patch('base.connector.SecretSquirrel', MagicMock()):
+            self.connector = DatabaseConnector('')
+        engine = create_engine('sqlite://')
+        engine.execute("ATTACH DATABASE ':memory:' AS warehouse")
+        engine.execute('CREATE TABLE warehouse.vod_viewership (user_key INTEGER, active_seconds INTEGER)')
+        engine.execute('INSERT INTO warehouse.vod_viewership VALUES (1, 10), (2, NULL)')
+        self.connector.sv2_engine = MagicMock(return_value=engine)
+        self.connector.get_last_query_id = MagicMock(return_value=None)
+        self.connector.get_table_watermark = MagicMock(return_value='watermark')
+        self.connector.enable_query_cache(self.directory)
+
+
+    def test_equal_cached_rows_match_uncached_rows(self):
+        query = 'SELECT user_key, active_seconds FROM warehouse.vod_viewership ORDER BY user_key'
+        uncached = self.connector.read_redshift(query)
+        cached = self.connector.read_redshift(query)
+        self.assertEqual(self.connector.query_cache.hits, 1)
+        self.assertEqual(cached, uncached)
+        self.assertEqual([(row.user_key, row._mapping['active_seconds']) for row in cached], [(1, 10), (2, None)])
+
+
+    def test_equal_unresolved_tables_not_cached(self):
+        self.connector.read_redshift('SELECT vv.user_key FROM warehouse.vod_viewership vv, vod_viewership other')
+        self.connector.get_table_watermark.assert_not_called()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+class TestDatabaseConnectorReadOnly(unittest.TestCase):
+
+
+    def setUp(self):
+        with patch('base.connector.SecretSquirrel', MagicMock()):
+            self.connector = DatabaseConnector('')
+
+
+    def test_equal_reads_mentioning_keywords_allowed(self):
+        self.connector.check_read_only("""
+            SELECT asset_id, reset_at, offset_seconds, "update" -- delete later
+            FROM warehouse.asset_set
+            WHERE status != 'deleted' AND note LIKE '%insert into%'
+            LIMIT 10 OFFSET 20
+        """)
+
+
+    def test_raises_for_writes(self):
+        for query in ('DELETE FROM warehouse.asset_set', 'update warehouse.asset_set SET reset_at = NULL', 'SELECT 1; DROP TABLE warehouse.asset_set'):
+            with self.assertRaises(ValueError):
+                self.connector.check_read_only(query)
+
+
+class TestDatabaseConnectorRowsWritten(unittest.TestCase):
+
+
+    def setUp(self):
+        with patch('base.connector.SecretSquirrel', MagicMock()):
+            self.connector = DatabaseConnector('')
+        engine = MagicMock()
+        engine.connect.return_value.execute.return_value = MagicMock(rowcount=100)
+        self.connector.sv2_engine = MagicMock(return_value=engine)
+        self.connector.get_last_query_id = MagicMock(return_value=None)
+
+
+    def test_equal_only_inserts_counted(self):
+        self.connector.write_redshift('TRUNCATE warehouse.agg_daily_vod;')
+        self.connector.write_redshift("DELETE FROM warehouse.agg_daily_vod WHERE run_date = '2023-01-01';")
+        self.assertEqual(self.connector.rows_written, 0)
+        self.connector.write_redshift("DELETE FROM warehouse.agg_daily_vod WHERE note = 'a;b'; INSERT INTO warehouse.agg_daily_vod SELECT * FROM staging.agg_daily_vod;")
+        self.assertEqual(self.connector.rows_written, 100)
+
+
+class TestDatabaseConnectorQueryByKeys(unittest.TestCase):
+
+
+    def setUp(self):
+        with patch('base.connector.SecretSquirrel', MagicMock()):
+            self.connector = DatabaseConnector('')
+        self.statements = []
+        self.cursor = MagicMock()
+        self.connector.get_mysql_connection = MagicMock(return_value=MagicMock(cursor=MagicMock(return_value=self.cursor)))
+
+
+    def test_equal_mysql_template_percent_signs_sent_as_is(self):
+        from mysql.connector.cursor import RE_PY_PARAM, _ParamSubstitutor
+
+        def execute(operation, params=None):
+            # The substitution the pinned mysql-connector applies to positional parameters
+            self.statements.append(RE_PY_PARAM.sub(_ParamSubstitutor([str(param).encode() for param in params]), operation.encode()).decode())
+
+        self.cursor.execute.side_effect = execute
+        self.cursor.fetchall.return_value = []
+        self.connector.query_by_keys("SELECT id FROM comments WHERE body LIKE 'lol%' AND DATE_FORMAT(created_at, '%Y') = '2023' AND id IN {keys}", [1, 2], target='comments')
+        self.assertEqual(self.statements, ["SELECT id FROM comments WHERE body LIKE 'lol%' AND DATE_FORMAT(created_at, '%Y') = '2023' AND id IN (1, 2)"])
+
+
+    def test_equal_mysql_key_table_dropped_after_failure(self):
+        self.cursor.execute.side_effect = lambda operation, params=None: self.statements.append(operation.split(' (')[0])
+        self.cursor.fetchall.side_effect = IOError('lost connection')
+        with self.assertRaises(IOError):
+            self.connector.query_by_keys('SELECT id FROM comments WHERE id IN {keys}', [1, 2, 3], target='comments', max_bound_keys=2)
+        self.assertTrue(self.statements[-1].startswith('DROP TEMPORARY TABLE IF EXISTS query_keys_'))
+
+
+class TestDatabaseConnectorExtractBulk(unittest.TestCase):
+
+
+    def test_equal_nullable_ints_kept_in_arrow(self):
+        with patch('base.connector.SecretSquirrel', MagicMock()):
+            connector = DatabaseConnector('')
+        cursor = MagicMock()
+        cursor.description = [('user_key',), ('decile',)]
+        cursor.fetchmany.side_effect = [[(1, 1111100000), (None, None)], []]
+        connector.sv2_engine = MagicMock()
+        connector.sv2_engine.return_value.raw_connection.return_value.cursor.return_value = cursor
+        local_mode = config.local_mode
+        config.local_mode = True
+        try:
+            rows = connector.extract_bulk('SELECT user_key, decile FROM warehouse.vod_deciles', as_arrow=True).to_pylist()
+        finally:
+            config.local_mode = local_mode
+        self.assertEqual(rows, [{'user_key': 1, 'decile': 1111100000}, {'user_key': None, 'decile': None}])
+
@@ -0,0 +1,140 @@
+import config
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.exc import OperationalError
+from base.etl_jobv3 import EtlJobV3, idempotent_phase
+from utils.components.retry import is_transient_error
+
+
+class FakeConnector:
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_written = 0
+
+
+class PhasedJob(EtlJobV3):
+
+    def __init__(self, db_connector=None):
+        super().__init__(db_connector=db_connector, jobname='tests.phased_job')
+        self.helper_calls = 0
+
+
+    def get_raw_data(self):
+        self.db_connector.rows_read += 10
+        self.helper()
+
+
+    def helper(self):
+        self.helper_calls += 1
+
+
+    def write_results(self):
+        self.db_connector.rows_written += 4
+
+
+    def execute(self):
+        self.get_raw_data()
+        self.write_results()
+        self.write_results()
+
+
+class FlakyJob(PhasedJob):
+
+    def __init__(self, db_connector=None, read_error=None, write_error=None):
+        super().__init__(db_connector=db_connector)
+        self.read_error = read_error
+        self.write_error = write_error
+        self.raw_data_calls = 0
+        self.retry_attempts = 2
+
+
+    @idempotent_phase
+    def get_raw_data(self):
+        self.raw_data_calls += 1
+        if self.read_error is not None:
+            error, self.read_error = self.read_error, None
+            raise error
+        return 'raw'
+
+
+    def write_results(self, raw):
+        self.db_connector.rows_written += 4
+        if self.write_error is not None:
+            error, self.write_error = self.write_error, None
+            raise error
+
+
+    def execute(self):
+        raw = self.get_raw_data()
+        self.write_results(raw)
+
+
+class TestEtlJobV3(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_location = config.file_location
+        config.file_location = self.directory + '/'
+        self.job_retry_backoff_seconds = config.job_retry_backoff_seconds
+        with patch('base.etl_jobv3.Loggerv3', MagicMock()):
+            self.job = PhasedJob(db_connector=FakeConnector())
+
+
+    def test_equal_phases_timed_with_rows(self):
+        self.job.execute()
+        timings = self.job.phase_timings
+        self.assertEqual(list(timings), ['get_raw_data', 'write_results'])
+        self.assertEqual((timings['get_raw_data']['rows_in'], timings['write_results']['rows_out'], timings['write_results']['calls']), (10, 8, 2))
+        self.assertEqual(self.job.helper_calls, 1)
+        self.assertEqual(self.job.loggerv3.timing.call_count, 2)
+
+
+    def test_equal_profile_written(self):
+        config.profile_jobs = True
+        try:
+            self.job.execute()
+        finally:
+            config.profile_jobs = False
+        profiles = os.listdir(os.path.join(self.directory, 'profiles', os.listdir(os.path.join(self.directory, 'profiles'))[0]))
+        self.assertEqual(profiles, ['tests.phased_job.prof'])
+
+
+    def test_equal_transient_error_retries_idempotent_phase(self):
+        config.job_retry_backoff_seconds = 0
+        error = OperationalError('SELECT', {}, Exception('ERROR: 1023 Serializable isolation violation on table'))
+        with patch('base.etl_jobv3.Loggerv3', MagicMock()):
+            job = FlakyJob(db_connector=FakeConnector(), read_error=error)
+        job.execute()
+        self.assertEqual((job.raw_data_calls, job.db_connector.rows_written), (2, 4))
+        self.assertEqual(job.phase_timings['get_raw_data']['calls'], 1)
+        self.assertEqual(job.loggerv3.warning.call_count, 1)
+
+
+    def test_raises_transient_error_in_unmarked_phase(self):
+        config.job_retry_backoff_seconds = 0
+        error = OperationalError('COPY', {}, Exception('ERROR: 1023 Serializable isolation violation on table'))
+        with patch('base.etl_jobv3.Loggerv3', MagicMock()):
+            job = FlakyJob(db_connector=FakeConnector(), write_error=error)
+        with self.assertRaises(OperationalError):
+            job.execute()
+        self.assertEqual((job.raw_data_calls, job.db_connector.rows_written), (1, 4))
+
+
+    def test_raises_non_transient_error(self):
+        with patch('base.etl_jobv3.Loggerv3', MagicMock()):
+            job = FlakyJob(db_connector=FakeConnector(), read_error=KeyError('user_key'))
+        with self.assertRaises(KeyError):
+            job.execute()
+        self.assertEqual(job.raw_data_calls, 1)
+        self.assertFalse(is_transient_error(OperationalError('SELECT', {}, Exception('relation "users" does not exist'))))
+
+
+    def tearDown(self):
+        config.job_retry_backoff_seconds = self.job_retry_backoff_seconds
+        config.file_location = self.file_location
+        shutil.rmtree(self.directory)
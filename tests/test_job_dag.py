@@ -0,0 +1,125 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+from base.exceptions import JobDagException
+from base.job_dag import JobDag
+from utils.components.checkpoint_store import CheckpointStore
+
+
+class FakeJob:
+
+    def __init__(self, name, log, fail=False, barrier=None):
+        self.name = name
+        self.log = log
+        self.fail = fail
+        self.barrier = barrier
+        self.loggerv3 = MagicMock()
+
+
+    def execute(self):
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        if self.fail:
+            raise IOError(f'{self.name} failed')
+        self.log.append(self.name)
+
+
+class TestJobDag(unittest.TestCase):
+
+
+    def setUp(self):
+        self.log = []
+        self.dag = JobDag(MagicMock(), max_workers=4)
+
+
+    def add(self, name, fail=False, barrier=None, **kwargs):
+        self.dag.add(name, lambda: FakeJob(name, self.log, fail=fail, barrier=barrier), **kwargs)
+
+
+    def test_equal_upstream_inferred_from_tables(self):
+        self.add('load', writes=['warehouse.vod_viewership'])
+        self.add('agg', reads=['warehouse.vod_viewership'], writes=['warehouse.agg_daily_vod'])
+        self.add('other', reads=['warehouse.subscription'])
+        self.add('reload', writes=['warehouse.vod_viewership'])
+        upstream = self.dag.resolve_upstream()
+        self.assertEqual((upstream['agg'], upstream['other'], upstream['reload']), ({'load'}, set(), {'load', 'agg'}))
+
+
+    def test_equal_independent_jobs_run_concurrently(self):
+        # Both jobs must be inside execute at once for the barrier to release
+        barrier = threading.Barrier(2)
+        self.add('first', barrier=barrier)
+        self.add('second', barrier=barrier)
+        self.add('last', upstream=['first', 'second'])
+        self.assertEqual(self.dag.run(), {'first': 'succeeded', 'second': 'succeeded', 'last': 'succeeded'})
+        self.assertEqual(self.log[-1], 'last')
+
+
+    def test_equal_failure_skips_downstream_only(self):
+        self.add('check', fail=True)
+        self.add('downstream', upstream=['check'])
+        self.add('downstream_of_downstream', upstream=['downstream'])
+        self.add('independent')
+        with self.assertRaises(JobDagException) as context:
+            self.dag.run()
+        self.assertEqual(context.exception.skipped_jobs, ['downstream', 'downstream_of_downstream'])
+        self.assertEqual(self.log, ['independent'])
+
+
+    def test_equal_resume_skips_succeeded_jobs(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = CheckpointStore(os.path.join(directory, 'checkpoints.db'))
+            store.record('test_handler', 'load', '2023-01-01', 'succeeded', 10)
+            store.record('test_handler', 'agg', '2023-01-01', 'failed')
+            self.dag.checkpoint_store = store
+            self.dag.handler = 'test_handler'
+            self.add('load', target_date='2023-01-01')
+            self.add('agg', upstream=['load'], target_date='2023-01-01')
+            self.dag.run()
+            self.assertEqual(self.log, ['agg'])
+            self.assertEqual(store.get_status('test_handler', 'agg', '2023-01-01'), 'succeeded')
+        finally:
+            shutil.rmtree(directory)
+
+
+    def test_equal_upstream_rerun_invalidates_checkpoint(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = CheckpointStore(os.path.join(directory, 'checkpoints.db'))
+            store.record('test_handler', 'snapshot', '2023-01-01', 'succeeded', 10)
+            store.record('test_handler', 'report', '2023-01-01', 'succeeded', 10)
+            self.dag.checkpoint_store = store
+            self.dag.handler = 'test_handler'
+            succeeded = []
+            self.add('load', target_date='2023-01-01', writes=['warehouse.vod_viewership'])
+            self.add('snapshot', target_date='2023-01-01', reads=['warehouse.vod_viewership'], on_success=lambda: succeeded.append('snapshot'))
+            self.add('report', target_date='2023-01-01', on_success=lambda: succeeded.append('report'))
+            self.dag.run()
+            self.assertEqual((sorted(self.log), succeeded), (['load', 'snapshot'], ['snapshot']))
+        finally:
+            shutil.rmtree(directory)
+
+
+    def test_raises_cycle(self):
+        self.add('a', upstream=['b'])
+        self.add('b', upstream=['a'])
+        with self.assertRaises(ValueError):
+            self.dag.resolve_upstream()
+
+
+    def test_equal_handler_nodes_declare_tables_their_jobs_query(self):
+        # The DAG orders jobs only by what they declare, so an undeclared read can run against a table mid-rebuild
+        for handler in ('process_handlers/dsp_process_handler.py', 'process_handlers/eds_process_handler.py'):
+            with open(handler) as f:
+                lines = [line for line in f.read().splitlines() if not line.strip().startswith('#')]
+            source = '\n'.join(lines).replace('SNAPSHOT_RELATION', "'staging.vod_viewership_snapshot'")
+            for name, module, declarations in re.findall(r"dag\.add\('(\w+)', JobSpec\('jobs\.(\w+)\.\w+'(.*)\)", source):
+                declared = set(re.findall(r"'([\w.]+)'", declarations))
+                with open(f'jobs/{module}.py') as f:
+                    queried = set(re.findall(r'\b(?:warehouse|staging)\.[a-z0-9_]+', f.read()))
+                self.assertEqual(queried - declared, set(), f'{handler} {name}')
@@ -0,0 +1,75 @@
+import config
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from base.job_runner import JobSpec, ProcessJobRunner, get_context
+
+
+class SucceedingJob:
+
+    def __init__(self, db_connector=None, target_date=None):
+        self.jobname = 'succeeding_job'
+        self.loggerv3 = MagicMock()
+        self.target_date = target_date
+
+
+    def execute(self):
+        # Context arrives explicitly, not through the parent's config module
+        if config.process_handler != 'test_handler':
+            raise ValueError(config.process_handler)
+
+
+class FailingJob(SucceedingJob):
+
+    def execute(self):
+        raise IOError(f'No data for {self.target_date}')
+
+
+class ExitingJob(SucceedingJob):
+
+    def execute(self):
+        os._exit(3)
+
+
+class TestProcessJobRunner(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, 'secrets.json'), 'w') as f:
+            f.write('{}')
+        self.context = (config.file_location, config.process_handler)
+        config.file_location = self.directory + '/'
+        config.process_handler = 'test_handler'
+        self.runner = ProcessJobRunner(max_processes=2, poll_seconds=0.1)
+
+
+    def test_equal_succeeded(self):
+        result = self.runner.run(JobSpec('test_job_runner.SucceedingJob', {'target_date': '2023-01-01'}))
+        self.assertEqual((result['status'], result['exitcode']), ('succeeded', 0))
+
+
+    def test_equal_failed_with_error(self):
+        result = self.runner.run(JobSpec('test_job_runner.FailingJob', {'target_date': '2023-01-01'}))
+        self.assertEqual((result['status'], result['error']), ('failed', 'OSError: No data for 2023-01-01'))
+
+
+    def test_equal_killed_without_status(self):
+        result = self.runner.run(JobSpec('test_job_runner.ExitingJob'))
+        self.assertEqual((result['status'], result['exitcode']), ('killed', 3))
+
+
+    def test_equal_context_carries_cli_config(self):
+        query_cache_enabled = config.query_cache_enabled
+        config.query_cache_enabled = True
+        try:
+            self.assertEqual(get_context()['query_cache_enabled'], True)
+        finally:
+            config.query_cache_enabled = query_cache_enabled
+
+
+    def tearDown(self):
+        config.file_location, config.process_handler = self.context
+        shutil.rmtree(self.directory)
@@ -0,0 +1,53 @@
+import config
+import json
+import os
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from jobs.log_file_handler_job import LogFileHandlerJob
+
+
+class TestLogFileHandlerJob(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_location = config.file_location
+        config.file_location = self.directory + '/'
+        self.today = datetime.today().strftime('%Y-%m-%d')
+        self.old_day = (datetime.today() - timedelta(days=20)).strftime('%Y-%m-%d')
+        self.recent_day = (datetime.today() - timedelta(days=1)).strftime('%Y-%m-%d')
+        for day in (self.today, self.old_day, self.recent_day):
+            os.makedirs(f'{self.directory}/logs/{day}')
+            with open(f'{self.directory}/logs/{day}/jobs.vod_viewership_job.json.1', 'w') as f:
+                f.write(json.dumps({'message': 'Starting', 'time': f'{day}T05:00:00', 'level': 'START', 'process_handler': 'eds'}) + '\n')
+            with open(f'{self.directory}/logs/{day}/jobs.vod_viewership_job.json', 'w') as f:
+                f.write(json.dumps({'message': 'get_raw_data: 1.2s wall', 'level': 'TIMING', 'wall_seconds': 1.2}) + '\n')
+        os.makedirs(f'{self.directory}/logs/run_logs_spool')
+        self.uploads = {}
+        s3_api_connector = MagicMock()
+        s3_api_connector.upload_file.side_effect = lambda path, key: self.uploads.update({key: pd.read_parquet(path)})
+        with patch('base.etl_jobv3.Loggerv3', MagicMock()), patch('jobs.log_file_handler_job.S3ApiConnector', return_value=s3_api_connector):
+            self.job = LogFileHandlerJob()
+            self.job.execute()
+
+
+    def test_equal_closed_days_archived(self):
+        self.assertEqual(sorted([key.split('/')[2] for key in self.uploads]), [f'log_date={self.old_day}', f'log_date={self.recent_day}'])
+        archive = self.uploads[[key for key in self.uploads if self.recent_day in key][0]]
+        self.assertEqual(list(archive['level']), ['START', 'TIMING'])
+        self.assertEqual(json.loads(archive['details'][1]), {'wall_seconds': 1.2})
+
+
+    def test_equal_old_days_removed_and_recent_compressed(self):
+        self.assertEqual(sorted(os.listdir(f'{self.directory}/logs')), sorted([self.today, self.recent_day, 'run_logs_spool']))
+        self.assertEqual(sorted(os.listdir(f'{self.directory}/logs/{self.recent_day}')), ['.archived', 'jobs.vod_viewership_job.json.1.gz', 'jobs.vod_viewership_job.json.gz'])
+        self.assertEqual(sorted(os.listdir(f'{self.directory}/logs/{self.today}')), ['jobs.vod_viewership_job.json', 'jobs.vod_viewership_job.json.1'])
+
+
+    def tearDown(self):
+        config.file_location = self.file_location
+        shutil.rmtree(self.directory)
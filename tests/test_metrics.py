@@ -0,0 +1,100 @@
+import config
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from base.etl_jobv3 import EtlJobV3
+from utils.components.metrics import MetricsRegistry
+
+
+class CountingJob(EtlJobV3):
+
+    def __init__(self):
+        super().__init__(jobname='tests.counting_job')
+
+
+    def download(self):
+        with self.metrics.timer('s3_download'):
+            self.metrics.counter('files_downloaded').inc(3)
+
+
+    def execute(self):
+        self.download()
+
+
+class WritingJob(EtlJobV3):
+
+    def __init__(self, db_connector=None):
+        super().__init__(db_connector=db_connector, jobname='tests.writing_job')
+
+
+    def write_results(self):
+        self.db_connector.rows_written += 4
+        self.metrics.counter('rows_written').inc(4)
+
+
+    def execute(self):
+        self.write_results()
+
+
+class TestMetrics(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+
+    def test_equal_prometheus_text(self):
+        metrics = MetricsRegistry('jobs.vod_viewership_job')
+        metrics.counter('rows_written').inc(10)
+        metrics.gauge('peak_rss_mb').set_max(512)
+        metrics.gauge('peak_rss_mb').set_max(256)
+        metrics.histogram('query_seconds', buckets=[1, 10]).observe(5)
+        self.assertEqual(metrics.to_prometheus_text().splitlines(), [
+            '# TYPE hestia_job_peak_rss_mb gauge',
+            'hestia_job_peak_rss_mb{job="jobs.vod_viewership_job"} 512',
+            '# TYPE hestia_job_query_seconds histogram',
+            'hestia_job_query_seconds_bucket{job="jobs.vod_viewership_job",le="1"} 0',
+            'hestia_job_query_seconds_bucket{job="jobs.vod_viewership_job",le="10"} 1',
+            'hestia_job_query_seconds_bucket{job="jobs.vod_viewership_job",le="+Inf"} 1',
+            'hestia_job_query_seconds_sum{job="jobs.vod_viewership_job"} 5',
+            'hestia_job_query_seconds_count{job="jobs.vod_viewership_job"} 1',
+            '# TYPE hestia_job_rows_written_total counter',
+            'hestia_job_rows_written_total{job="jobs.vod_viewership_job"} 10'
+        ])
+        with self.assertRaises(ValueError):
+            metrics.gauge('rows_written')
+
+
+    def test_equal_job_metrics_written_on_execute(self):
+        config.metrics_textfile_directory = self.directory
+        try:
+            with patch('base.etl_jobv3.Loggerv3', MagicMock()):
+                job = CountingJob()
+            job.execute()
+        finally:
+            config.metrics_textfile_directory = None
+        with open(f'{self.directory}/tests.counting_job.prom') as f:
+            text = f.read()
+        self.assertIn('hestia_job_files_downloaded_total{job="tests.counting_job"} 3', text)
+        self.assertIn('hestia_job_s3_download_seconds_count{job="tests.counting_job"} 1', text)
+        self.assertIn('# TYPE hestia_job_run_seconds gauge', text)
+
+
+    def test_equal_job_rows_written_not_double_counted(self):
+        db_connector = MagicMock(rows_read=0, rows_written=0)
+        config.metrics_textfile_directory = self.directory
+        try:
+            with patch('base.etl_jobv3.Loggerv3', MagicMock()):
+                job = WritingJob(db_connector=db_connector)
+            job.execute()
+        finally:
+            config.metrics_textfile_directory = None
+        with open(f'{self.directory}/tests.writing_job.prom') as f:
+            text = f.read()
+        self.assertIn('hestia_job_rows_written_total{job="tests.writing_job"} 4', text)
+        self.assertIn('hestia_job_connector_rows_written_total{job="tests.writing_job"} 4', text)
+
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from decimal import Decimal
+from utils.components.query_cache import QueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = QueryCache(self.directory, max_bytes=10 ** 7)
+        self.query = """
+            SELECT vv.user_key, sum(vv.active_seconds)
+            FROM warehouse.vod_viewership vv
+            INNER JOIN warehouse.dim_segment_episode dse ON vv.episode_key = dse.episode_key
+            WHERE dse.channel_title = 'Rooster  Teeth'
+            GROUP BY 1;
+        """
+        self.rows = [(1, Decimal('10.5')), (2, None)]
+
+
+    def test_equal_normalize_keeps_literals(self):
+        normalized = self.cache.normalize(self.query)
+        self.assertIn("'Rooster  Teeth'", normalized)
+        self.assertFalse(normalized.endswith(';'))
+
+
+    def test_equal_referenced_tables(self):
+        self.assertEqual(self.cache.referenced_tables(self.query), ['warehouse.dim_segment_episode', 'warehouse.vod_viewership'])
+
+
+    def test_equal_referenced_tables_in_comma_joins_and_subqueries(self):
+        query = """
+            WITH recent AS (SELECT user_key FROM warehouse.vod_viewership WHERE extract(day from start_timestamp) = 1)
+            SELECT dse.episode_key, u.user_key
+            FROM warehouse.dim_segment_episode dse, recent r, (SELECT user_key FROM warehouse.dim_user) u
+            WHERE r.user_key = u.user_key AND trim(both ' ' from dse.channel_title) != '';
+        """
+        self.assertEqual(self.cache.referenced_tables(query), ['warehouse.dim_segment_episode', 'warehouse.dim_user', 'warehouse.vod_viewership'])
+
+
+    def test_none_referenced_tables_unqualified(self):
+        self.assertIsNone(self.cache.referenced_tables('SELECT * FROM warehouse.vod_viewership vv, dim_user du WHERE vv.user_key = du.user_key'))
+        self.assertIsNone(self.cache.referenced_tables('SELECT * FROM warehouse.vod_viewership vv JOIN dim_user du ON vv.user_key = du.user_key'))
+
+
+    def test_equal_get_after_put(self):
+        self.cache.put(self.query, 'watermark', ['user_key', 'active_seconds'], self.rows)
+        rows = self.cache.get(self.query.replace('SELECT', 'select').replace('\n', ' '), 'watermark')
+        self.assertEqual(rows, self.rows)
+        self.assertEqual([row.active_seconds for row in rows], [Decimal('10.5'), None])
+
+
+    def test_none_get_after_watermark_change(self):
+        self.cache.put(self.query, 'watermark', ['user_key', 'active_seconds'], self.rows)
+        self.assertIsNone(self.cache.get(self.query, 'new watermark'))
+
+
+    def test_false_evict_over_max_bytes(self):
+        self.cache.put(self.query, 'watermark', ['user_key', 'active_seconds'], self.rows)
+        self.cache.max_bytes = 0
+        self.cache.evict()
+        self.assertFalse(os.listdir(self.directory))
+
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
@@ -0,0 +1,62 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from utils.components.query_recorder import QueryRecorder
+
+
+class TestQueryRecorder(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.sink_path = os.path.join(self.directory, 'queries.jsonl')
+        self.recorder = QueryRecorder(capacity=3, sink_path=self.sink_path)
+
+
+    def test_equal_fingerprint_ignores_literals(self):
+        first = self.recorder.fingerprint("SELECT * FROM warehouse.vod_viewership WHERE start_timestamp >= '2023-01-01' LIMIT 10;")
+        second = self.recorder.fingerprint("select *\n  from warehouse.vod_viewership where start_timestamp >= '2023-02-01' limit 20")
+        self.assertEqual(first, second)
+
+
+    def test_equal_ring_keeps_latest_events(self):
+        for idx in range(5):
+            self.recorder.record('job', 'sv2', f'SELECT {idx}', idx)
+        self.assertEqual([event['wall_seconds'] for event in self.recorder.get_events()], [2, 3, 4])
+
+
+    def test_equal_sink_writes_every_event(self):
+        for idx in range(5):
+            self.recorder.record('job', 'sv2', f'SELECT {idx}', idx, rows=1, query_id=idx)
+        with open(self.sink_path, 'r') as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual([event['query_id'] for event in events], [0, 1, 2, 3, 4])
+
+
+    def test_equal_summary_groups_by_fingerprint(self):
+        self.recorder.record('job_a', 'sv2', "SELECT * FROM a WHERE id = 1", 1.5, rows=10)
+        self.recorder.record('job_b', 'sv2', "SELECT * FROM a WHERE id = 2", 2.5, rows=5)
+        self.recorder.record('job_a', 'v2_db', "SELECT * FROM users", 3)
+        top = self.recorder.summary(top_n=1)[0]
+        self.assertEqual((top['calls'], top['total_seconds'], top['rows'], top['jobs']), (2, 4, 15, ['job_a', 'job_b']))
+
+
+    def test_equal_estimate_bytes(self):
+        self.assertEqual(self.recorder.estimate_bytes([('abc', 12, None)] * 500, sample_rows=100), 2500)
+
+
+    def test_equal_from_sink_reads_events_after_offset(self):
+        self.recorder.record('jobs.previous_run', 'sv2', 'SELECT 1', 1)
+        offset = os.path.getsize(self.sink_path)
+        # Worker processes append to the same sink through their own recorders
+        QueryRecorder(sink_path=self.sink_path).record('jobs.worker_job', 'sv2', 'SELECT 2', 2)
+        with open(self.sink_path, 'a') as f:
+            f.write('{"partial": ')
+        events = QueryRecorder.from_sink(self.sink_path, offset).get_events()
+        self.assertEqual([event['job_name'] for event in events], ['jobs.worker_job'])
+
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+import pandas as pd
+from base.exceptions import MissingFixtureException
+from utils.connectors.record_replay_connector import RecordReplayConnector
+
+
+class LiveConnector:
+
+    def __init__(self):
+        self.dry_run = False
+        self.calls = 0
+
+
+    def read_redshift(self, query):
+        self.calls += 1
+        return [(1, 'free', Decimal('1.50'), date(2023, 3, 14)), (2, None, None, None)]
+
+
+    def extract_bulk(self, query):
+        self.calls += 1
+        return pd.DataFrame({'user_key': [1, 2], 'user_tier': ['free', 'premium']})
+
+
+    def query_mysql_iter(self, target, query, chunk_rows=2):
+        self.calls += 1
+        yield [('a', 'a@mail.com'), ('b', 'b@mail.com')]
+        yield [('c', 'c@mail.com')]
+
+
+    def make_request(self, endpoint, request_data):
+        self.calls += 1
+        return {'users': [{'external_id': 'a', 'apps': None}]}
+
+
+class TestRecordReplayConnector(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.live = LiveConnector()
+        self.recorder = RecordReplayConnector(self.directory, connector=self.live, mode='record')
+        self.recorded = [
+            self.recorder.read_redshift('SELECT 1'),
+            self.recorder.extract_bulk('SELECT 2'),
+            list(self.recorder.query_mysql_iter('v2_db', 'SELECT 3')),
+            self.recorder.make_request('export_segment', {'segment_id': 'x'})
+        ]
+
+
+    def replay(self, connector):
+        return [
+            connector.read_redshift('SELECT 1'),
+            connector.extract_bulk('SELECT 2'),
+            list(connector.query_mysql_iter('v2_db', 'SELECT 3')),
+            connector.make_request('export_segment', {'segment_id': 'x'})
+        ]
+
+
+    def test_equal_replay_returns_recorded_results(self):
+        replayed = self.replay(RecordReplayConnector(self.directory))
+        self.assertEqual(replayed[0], self.recorded[0])
+        pd.testing.assert_frame_equal(replayed[1], self.recorded[1])
+        self.assertEqual(replayed[2:], self.recorded[2:])
+        self.assertEqual(self.live.calls, 4)
+
+
+    def test_equal_replay_scales_rows(self):
+        replayed = self.replay(RecordReplayConnector(self.directory, scale=3))
+        self.assertEqual((len(replayed[0]), len(replayed[1].index), sum([len(chunk) for chunk in replayed[2]])), (6, 6, 9))
+
+
+    def test_equal_replayed_writes_kept(self):
+        connector = RecordReplayConnector(self.directory)
+        connector.write_to_sql(pd.DataFrame({'a': [1, 2]}), 'agg_daily_vod', connector.sv2_engine(), schema='warehouse', index=False)
+        self.assertEqual((connector.writes[0]['method'], connector.rows_written), ('write_to_sql', 2))
+
+
+    def test_raises_for_unrecorded_call(self):
+        with self.assertRaises(MissingFixtureException):
+            RecordReplayConnector(self.directory).read_redshift('SELECT 4')
+
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
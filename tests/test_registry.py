@@ -0,0 +1,56 @@
+import importlib.util
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+from process_handlers.registry import HANDLERS, OLYMPUS_HANDLERS, get_handler, get_handler_kwargs
+
+
+class DailyHandler:
+
+    def __init__(self, local_mode):
+        self.local_mode = local_mode
+
+
+class MonthlyHandler:
+
+    def __init__(self, local_mode, target_date='2023-09-01', dry_run=False):
+        self.local_mode = local_mode
+
+
+class TestRegistry(unittest.TestCase):
+
+
+    def test_equal_every_handler_module_exists(self):
+        for name, path in HANDLERS.items():
+            module_path, class_name = path.rsplit('.', 1)
+            spec = importlib.util.find_spec(module_path)
+            self.assertIsNotNone(spec, name)
+            with open(spec.origin, 'r') as f:
+                self.assertIn(f'class {class_name}', f.read(), name)
+
+
+    def test_equal_main_imports_no_handler(self):
+        # A fresh interpreter, since other tests may already have imported handlers into this one
+        code = "import sys, main; print(sorted(m for m in sys.modules if m.startswith(('process_handlers.', 'jobs.', 'pandas'))))"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "['process_handlers.registry']")
+
+
+    def test_raises_for_server_outside_subset(self):
+        self.assertIn('dsp-hf', OLYMPUS_HANDLERS)
+        with self.assertRaises(ValueError):
+            get_handler('graph', OLYMPUS_HANDLERS)
+        with self.assertRaises(ValueError):
+            get_handler('unknown')
+
+
+    def test_equal_handler_kwargs_passed_when_taken(self):
+        with patch('process_handlers.registry.get_handler', return_value=MonthlyHandler):
+            self.assertEqual(get_handler_kwargs('eds-m', target_date='2024-01-01', dry_run=True), {'target_date': '2024-01-01', 'dry_run': True})
+        with patch('process_handlers.registry.get_handler', return_value=DailyHandler):
+            self.assertEqual(get_handler_kwargs('eds', dry_run=False), {})
+            with self.assertRaises(ValueError):
+                get_handler_kwargs('eds', dry_run=True)
+            with self.assertRaises(ValueError):
+                get_handler_kwargs('eds', target_date='2024-01-01')
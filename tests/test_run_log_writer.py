@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from utils.components.run_log_writer import RunLogWriter
+
+
+class FakeConnector:
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.writes = []
+        self.statements = []
+
+
+    def sv2_engine(self):
+        return None
+
+
+    def write_to_sql(self, dataframe, name, engine, **kwargs):
+        if self.fail is True:
+            raise ConnectionError('server closed the connection')
+        self.writes.append(dataframe)
+
+
+    def write_redshift(self, query):
+        self.statements.append(query)
+
+
+    def update_redshift_table_permissions(self, table_name, schema='warehouse'):
+        pass
+
+
+def run_log_row(filename):
+    return {'job_start': '2023-03-14 05:00:00', 'filename': filename, 'final_status': 'SUCCESS', 'run_time_sec': 12.0, 'process_handler': 'eds'}
+
+
+class TestRunLogWriter(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + '/'
+
+
+    def test_equal_rows_written_in_one_batch(self):
+        connector = FakeConnector()
+        writer = RunLogWriter(self.directory, connector=connector, flush_seconds=600)
+        writer.put(run_log_row('jobs.a'))
+        writer.put(run_log_row('jobs.b'))
+        self.assertEqual(writer.close(), 2)
+        self.assertEqual(len(connector.writes), 1)
+        self.assertEqual(list(connector.writes[0]['filename']), ['jobs.a', 'jobs.b'])
+        self.assertFalse(os.path.isfile(writer.spool_path))
+
+
+    def test_equal_ddl_run_once_before_first_write(self):
+        connector = FakeConnector()
+        writer = RunLogWriter(self.directory, connector=connector, flush_seconds=600, table_name='run_metrics', ddl='CREATE TABLE IF NOT EXISTS {schema}.run_metrics (job_start TIMESTAMP);')
+        writer.put(run_log_row('jobs.a'))
+        writer.flush()
+        writer.put(run_log_row('jobs.b'))
+        writer.close()
+        self.assertEqual((connector.statements, len(connector.writes)), (['CREATE TABLE IF NOT EXISTS data_monitoring_tools.run_metrics (job_start TIMESTAMP);'], 2))
+
+
+    def test_equal_failed_rows_kept_in_spool(self):
+        writer = RunLogWriter(self.directory, connector=FakeConnector(fail=True), flush_seconds=600)
+        writer.put(run_log_row('jobs.a'))
+        self.assertEqual(writer.close(), 0)
+        with open(writer.spool_path) as f:
+            self.assertEqual([json.loads(line)['filename'] for line in f], ['jobs.a'])
+
+
+    def test_equal_dead_process_spool_recovered(self):
+        os.makedirs(self.directory + 'logs/run_logs_spool')
+        # Pids above pid_max are never running
+        with open(self.directory + 'logs/run_logs_spool/99999999.jsonl', 'w') as f:
+            f.write(json.dumps(run_log_row('jobs.crashed')) + '\n')
+        connector = FakeConnector()
+        writer = RunLogWriter(self.directory, connector=connector, flush_seconds=600)
+        self.assertEqual(writer.close(), 1)
+        self.assertEqual(list(connector.writes[0]['filename']), ['jobs.crashed'])
+        self.assertEqual(os.listdir(self.directory + 'logs/run_logs_spool'), [])
+
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
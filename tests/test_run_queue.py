@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from api.base.run_queue import RunQueue
+
+
+class FakeJob:
+
+    def __init__(self):
+        self.phase_timings = {
+            'get_raw_data': {'calls': 1, 'wall_seconds': 1.0, 'cpu_seconds': 0.5, 'peak_rss_delta_mb': 0, 'rows_in': 10, 'rows_out': 0},
+            'write_results': {'calls': 1, 'wall_seconds': 0.5, 'cpu_seconds': 0.1, 'peak_rss_delta_mb': 0, 'rows_in': 0, 'rows_out': 4}
+        }
+
+
+def run_fake_job(content):
+    return FakeJob()
+
+
+def run_until_released(content):
+    # Runs happen in worker processes, so they report through files
+    with open(os.path.join(content['directory'], 'calls'), 'a') as f:
+        f.write(f"{content['target_date']}\n")
+    for _ in range(500):
+        if os.path.exists(os.path.join(content['directory'], 'release')):
+            return None
+        time.sleep(0.01)
+
+
+def run_failing(content):
+    raise IOError('no data')
+
+
+def run_setting_config(content):
+    import config
+    previous = config.dry_run
+    config.dry_run = content['dry_run']
+    with open(os.path.join(content['directory'], content['name']), 'w') as f:
+        f.write(str(previous))
+
+
+class TestRunQueue(unittest.TestCase):
+
+
+    def setUp(self):
+        self.run_queue = RunQueue(max_workers=2)
+        self.directory = tempfile.mkdtemp()
+
+
+    def wait_for(self, run_id):
+        for _ in range(3000):
+            run = self.run_queue.get_run(run_id)
+            if run['status'] in ('succeeded', 'failed'):
+                return run
+            time.sleep(0.01)
+        self.fail(f'{run_id} did not finish')
+
+
+    def release(self):
+        open(os.path.join(self.directory, 'release'), 'w').close()
+
+
+    def read_calls(self):
+        with open(os.path.join(self.directory, 'calls')) as f:
+            return f.read().split()
+
+
+    def test_equal_run_reports_phase_timings(self):
+        run = self.wait_for(self.run_queue.submit('jobs', 'fake_job', run_fake_job, {'target_date': '2023-01-01'})['run_id'])
+        self.assertEqual((run['status'], run['rows_in'], run['rows_out']), ('succeeded', 10, 4))
+
+
+    def test_equal_identical_submissions_coalesced(self):
+        first = self.run_queue.submit('jobs', 'fake_job', run_until_released, {'target_date': '2023-01-01', 'directory': self.directory})
+        second = self.run_queue.submit('jobs', 'fake_job', run_until_released, {'target_date': '2023-01-01', 'directory': self.directory})
+        other = self.run_queue.submit('jobs', 'fake_job', run_until_released, {'target_date': '2023-01-02', 'directory': self.directory})
+        self.release()
+        for run_id in (first['run_id'], other['run_id']):
+            self.wait_for(run_id)
+        self.assertEqual((second['run_id'], second['coalesced'], len(self.read_calls())), (first['run_id'], True, 2))
+        self.assertNotEqual(other['run_id'], first['run_id'])
+
+
+    def test_equal_dry_run_and_local_mode_not_coalesced(self):
+        real = self.run_queue.submit('process_handlers', 'eds', run_until_released, {'target_date': '2023-01-01', 'dry_run': None, 'local_mode': None, 'directory': self.directory})
+        dry = self.run_queue.submit('process_handlers', 'eds', run_until_released, {'target_date': '2023-01-01', 'dry_run': 'true', 'local_mode': None, 'directory': self.directory})
+        local = self.run_queue.submit('process_handlers', 'eds', run_until_released, {'target_date': '2023-01-01', 'dry_run': None, 'local_mode': 'true', 'directory': self.directory})
+        self.release()
+        for status in (real, dry, local):
+            self.wait_for(status['run_id'])
+        self.assertEqual(([status['coalesced'] for status in (real, dry, local)], len(self.read_calls())), ([False, False, False], 3))
+        self.assertEqual(dry['dry_run'], 'true')
+
+
+    def test_equal_runs_do_not_share_config(self):
+        first = self.run_queue.submit('jobs', 'first', run_setting_config, {'target_date': None, 'dry_run': 'first', 'name': 'first', 'directory': self.directory})
+        self.wait_for(first['run_id'])
+        second = self.run_queue.submit('jobs', 'second', run_setting_config, {'target_date': None, 'dry_run': 'second', 'name': 'second', 'directory': self.directory})
+        self.wait_for(second['run_id'])
+        with open(os.path.join(self.directory, 'second')) as f:
+            self.assertEqual(f.read(), 'False')
+
+
+    def test_equal_failed_run_keeps_error(self):
+        run = self.wait_for(self.run_queue.submit('jobs', 'fake_job', run_failing, {})['run_id'])
+        self.assertEqual((run['status'], run['error']), ('failed', 'OSError: no data'))
+
+
+    def tearDown(self):
+        self.run_queue.executor.shutdown(wait=True)
+        shutil.rmtree(self.directory)
@@ -0,0 +1,57 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from jobs.runtime_regression_job import RuntimeRegressionJob
+
+
+class FakeConnector:
+
+    def __init__(self, results, has_run_metrics=True):
+        self.results = results
+        self.has_run_metrics = has_run_metrics
+        self.dry_run = True
+        self.queries = []
+
+
+    def read_redshift(self, query):
+        self.queries.append(query)
+        if 'information_schema.tables' in query:
+            return [(1 if self.has_run_metrics else 0,)]
+        return self.results
+
+
+class TestRuntimeRegressionJob(unittest.TestCase):
+
+
+    def build_job(self, results, has_run_metrics=True):
+        with patch('base.etl_jobv3.Loggerv3', MagicMock()), patch('jobs.runtime_regression_job.SNSApiConnector', MagicMock()):
+            job = RuntimeRegressionJob(target_date='2023-03-14', db_connector=FakeConnector(results, has_run_metrics))
+        job.execute()
+        return job
+
+
+    def test_equal_slow_runs_published(self):
+        started = datetime(2023, 3, 14, 5)
+        job = self.build_job([
+            ('process_handlers.eds_process_handler', 'jobs.vod_viewership_job', started, 2400, 1000, 20, 180.0, 950.0),
+            ('process_handlers.eds_process_handler', 'jobs.new_viewers_job', started, 300, None, 20, 180.0, None),
+            ('process_handlers.eds_process_handler', 'jobs.series_dim_job', started, 30, None, 20, 5.0, None),
+            ('process_handlers.eds_process_handler', 'jobs.graph_job', started, 2400, None, 2, 180.0, None)
+        ])
+        self.assertEqual([run['filename'] for run in job.regressions], ['jobs.vod_viewership_job'])
+        job.sns_connector.send_message.assert_called_once()
+        message = job.sns_connector.send_message.call_args.kwargs['message_body']
+        self.assertTrue(message.startswith('jobs.vod_viewership_job (process_handlers.eds_process_handler) took 40.0 minutes'))
+        self.assertIn('13.3x its 28-day median of 3.0 minutes over 20 runs', message)
+        self.assertIn('Rows read and written: 1000, against an average of 950.', message)
+
+
+    def test_equal_no_regressions(self):
+        job = self.build_job([])
+        self.assertEqual(job.regressions, [])
+        job.sns_connector.send_message.assert_not_called()
+
+
+    def test_equal_missing_run_metrics_not_queried(self):
+        job = self.build_job([], has_run_metrics=False)
+        self.assertNotIn('run_metrics', job.db_connector.queries[-1])
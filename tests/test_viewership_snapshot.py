@@ -0,0 +1,37 @@
+import config
+import unittest
+from utils.components.viewership_snapshot import use_viewership_snapshot, viewership_relation, SNAPSHOT_RELATION, VIEWERSHIP_RELATION
+
+
+class TestViewershipSnapshot(unittest.TestCase):
+
+
+    def setUp(self):
+        use_viewership_snapshot('2023-03-14', days=14)
+
+
+    def test_equal_covered_windows_read_snapshot(self):
+        self.assertEqual(config.viewership_snapshot['start'], '2023-03-01')
+        self.assertEqual(viewership_relation('2023-03-14', '2023-03-15'), SNAPSHOT_RELATION)
+        self.assertEqual(viewership_relation('2023-03-01', '2023-03-15'), SNAPSHOT_RELATION)
+
+
+    def test_equal_uncovered_windows_read_warehouse(self):
+        self.assertEqual(viewership_relation('2023-02-28', '2023-03-15'), VIEWERSHIP_RELATION)
+        self.assertEqual(viewership_relation('2023-03-14', '2023-03-16'), VIEWERSHIP_RELATION)
+        config.viewership_snapshot = None
+        self.assertEqual(viewership_relation('2023-03-14', '2023-03-15'), VIEWERSHIP_RELATION)
+
+
+    def test_equal_dry_run_reads_warehouse(self):
+        config.viewership_snapshot = None
+        config.dry_run = True
+        try:
+            use_viewership_snapshot('2023-03-14', days=14)
+        finally:
+            config.dry_run = False
+        self.assertEqual(viewership_relation('2023-03-14', '2023-03-15'), VIEWERSHIP_RELATION)
+
+
+    def tearDown(self):
+        config.viewership_snapshot = None
@@ -1,7 +1,6 @@
 import config
 import pandas as pd
 from utils.connectors.database_connector import DatabaseConnector
-from utils.components.batcher import Batcher
 from utils.components.loggerv3 import Loggerv3
 
 
@@ -10,7 +9,6 @@ class FreeViewersByChannel:
 	def __init__(self, target_date, channel):
 		self.db_connector = DatabaseConnector(file_location=config.file_location)
 		self.loggerv3 = Loggerv3(name=__name__, file_location=config.file_location, local_mode=True)
-		self.batcher = Batcher()
 		self.target_date = target_date
 		self.target_date = target_date
 		self.channel = channel
@@ -19,7 +17,6 @@ class FreeViewersByChannel:
 		self.file_name = '_'.join([self.user_tier, self.channel.lower().strip().replace(' ', '_'), 'viewers.csv'])
 		self.viewers = []
 		self.user_emails = []
-		self.batches = None
 		self.current_subs = []
 		self.already_subbed = None
 		self.final_dataframe = None
@@ -48,24 +45,20 @@ class FreeViewersByChannel:
 
 	def get_viewer_info(self):
 		self.loggerv3.info("Getting viewer info")
-		target_keys = [f"'{x}'" for x in self.viewers]
-		self.batches = self.batcher.list_to_list_batch(batch_limit=500, iterator=target_keys)
-		for batch in self.batches:
-			users = ','.join(batch)
-			results = self.db_connector.query_v2_db(f"""
-			    SELECT
-			        uuid,
-			        email,
-			        username
-			    FROM users
-			    WHERE uuid in ({users});
-			""")
-			for result in results:
-				self.user_emails.append({
-					'uuid': result[0],
-					'email': result[1],
-					'username': result[2]
-				})
+		results = self.db_connector.query_by_keys("""
+		    SELECT
+		        uuid,
+		        email,
+		        username
+		    FROM users
+		    WHERE uuid in {keys};
+		""", self.viewers, target='v2_db')
+		for result in results:
+			self.user_emails.append({
+				'uuid': result[0],
+				'email': result[1],
+				'username': result[2]
+			})
 
 
 	def load_active_subs(self):
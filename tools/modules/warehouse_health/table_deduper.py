@@ -79,21 +79,19 @@ class TableDeduper:
 	def get_dupes_from_existing(self):
 		self.loggerv3.info('Getting dupe rows from existing table')
 
-		for batch in self.primary_key_batches:
-			target_keys = ','.join([f"'{x}'" for x in batch])
-			query = f"""
-    		SELECT *
-    		FROM {self.existing_schema}.{self.table}
-    		WHERE {self.primary_key_creator()} in ({target_keys});
-			"""
-			results = self.db_connector.read_redshift(query)
-			for result in results:
-				result_len = len(result)
-				row = {}
-				for i in range(result_len):
-					row[f'col{i}'] = result[i]
-				self.dupe_rows.append(row)
-			self.loggerv3.info(f'Dupe Rows: {len(self.dupe_rows)}')
+		query = f"""
+		SELECT *
+		FROM {self.existing_schema}.{self.table}
+		WHERE {self.primary_key_creator()} in {{keys}};
+		"""
+		results = self.db_connector.query_by_keys(query, self.dupe_primary_keys)
+		for result in results:
+			result_len = len(result)
+			row = {}
+			for i in range(result_len):
+				row[f'col{i}'] = result[i]
+			self.dupe_rows.append(row)
+		self.loggerv3.info(f'Dupe Rows: {len(self.dupe_rows)}')
 
 
 	def write_dupes_to_temp(self):
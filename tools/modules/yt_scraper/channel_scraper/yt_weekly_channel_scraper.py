@@ -25,7 +25,6 @@ class YTWeeklyChannelScraper:
         self.dater = Dater()
         self.start_dates = start_dates
         self.backfill = backfill
-        self.staging_schema = 'staging'
         self.prod_schema = 'warehouse'
         self.duration = 7
         self.channels = {}
@@ -37,7 +36,7 @@ class YTWeeklyChannelScraper:
         self.final_dataframe = None
         self.url = 'https://www.youtube.com/'
         self.membership_channels = ['Funhaus', 'DEATH BATTLE!']
-        self.set_clause = None
+        self.update_columns = None
         self.MIN_SLEEP = 6
         self.MAX_SLEEP = 8
         self.channel_positions = sv.channel_positions
@@ -367,65 +366,19 @@ class YTWeeklyChannelScraper:
     def build_final_dataframe(self):
         self.loggerv3.info('Building final dataframe')
         self.final_dataframe = pd.DataFrame(self.cleaned_metrics)
-        self.set_clause = f"""
-            revenue =  staging.revenue, 
-            unique_viewers =  staging.unique_viewers,
-            returning_viewers = staging.returning_viewers,
-            video_rev = staging.video_rev,
-            video_rpm = staging.video_rpm,
-            video_views = staging.video_views,
-            shorts_rev = staging.shorts_rev,
-            shorts_rpm = staging.shorts_rpm,
-            shorts_views = staging.shorts_views,
-            livestream_rev = staging.livestream_rev,
-            livestream_rpm = staging.livestream_rpm,
-            livestream_views = staging.livestream_views,
-            returning_vods_uvs = staging.returning_vods_uvs,
-            new_vods_uvs = staging.new_vods_uvs,
-            returning_shorts_uvs = staging.returning_shorts_uvs,
-            new_shorts_uvs = staging.new_shorts_uvs,
-            returning_live_uvs = staging.returning_live_uvs,
-            new_live_uvs = staging.new_live_uvs
-        """
+        self.update_columns = [
+            'revenue', 'unique_viewers', 'returning_viewers', 'video_rev', 'video_rpm', 'video_views', 'shorts_rev',
+            'shorts_rpm', 'shorts_views', 'livestream_rev', 'livestream_rpm', 'livestream_views', 'returning_vods_uvs',
+            'new_vods_uvs', 'returning_shorts_uvs', 'new_shorts_uvs', 'returning_live_uvs', 'new_live_uvs'
+        ]
         if not self.backfill:
-            self.set_clause += ", memberships = staging.memberships"
-
-
-    def write_to_redshift_staging(self):
-        self.loggerv3.info('Writing to Redshift staging')
-        self.db_connector.write_to_sql(self.final_dataframe, f'stage_{self.table_name}', self.db_connector.sv2_engine(), schema=self.staging_schema, chunksize=5000, method='multi', index=False, if_exists='append')
-        self.db_connector.update_redshift_table_permissions(f'stage_{self.table_name}', self.staging_schema)
-
-
-    def merge_stage_to_prod(self):
-        self.loggerv3.info('Merging staging to prod')
-        query = f"""
-               BEGIN TRANSACTION;
-
-                   UPDATE {self.prod_schema}.{self.table_name}
-                   SET
-                        {self.set_clause}
-                   FROM {self.staging_schema}.stage_{self.table_name} staging
-                   JOIN {self.prod_schema}.{self.table_name} prod
-                       ON staging.channel_id = prod.channel_id
-                       AND staging.week_ending = prod.week_ending;
-
-                   DELETE FROM {self.staging_schema}.stage_{self.table_name}
-                   USING {self.prod_schema}.{self.table_name} prod
-                   WHERE 
-                        prod.channel_id = stage_{self.table_name}.channel_id
-                        AND prod.week_ending = stage_{self.table_name}.week_ending;
-
-                   INSERT INTO {self.prod_schema}.{self.table_name}
-                   SELECT * FROM {self.staging_schema}.stage_{self.table_name};
-
-                   TRUNCATE {self.staging_schema}.stage_{self.table_name};
+            self.update_columns.append('memberships')
 
-                   COMMIT;
 
-               END TRANSACTION;
-           """
-        self.db_connector.write_redshift(query)
+    def upsert_to_redshift(self):
+        self.loggerv3.info('Upserting to Redshift')
+        self.db_connector.upsert(self.final_dataframe, self.table_name, keys=['channel_id', 'week_ending'], update_columns=self.update_columns, schema=self.prod_schema)
+        self.db_connector.update_redshift_table_permissions(self.table_name, self.prod_schema)
 
 
     def close_browser(self):
@@ -441,7 +394,6 @@ class YTWeeklyChannelScraper:
         self.get_channel_metrics()
         self.clean_raw_data()
         self.build_final_dataframe()
-        self.write_to_redshift_staging()
-        self.merge_stage_to_prod()
+        self.upsert_to_redshift()
         self.close_browser()
         self.loggerv3.success("All Processing Complete!")
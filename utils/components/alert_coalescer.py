@@ -0,0 +1,71 @@
+import atexit
+import config
+import threading
+
+
+class AlertCoalescer:
+
+	def __init__(self, window_seconds=30):
+		"""
+		Collects the alerts raised within window_seconds of the first one and sends them as a single alert.
+
+		:param window_seconds: Seconds from the first alert of a burst to sending it. 0 sends every alert at once
+		"""
+		self.window_seconds = window_seconds
+		self.alerts = []
+		self.alerter = None
+		self.timer = None
+		self.lock = threading.Lock()
+
+
+	def add(self, alerter, log_line, job_name):
+		"""
+		Queues an alert. The first alert of a burst starts the window.
+
+		:param alerter: OpsGenieAPIConnector the burst is sent with
+		:param log_line: Structured log record the alert is about
+		:param job_name: Name of the job that logged it
+		"""
+		with self.lock:
+			self.alerts.append((log_line, job_name))
+			if self.alerter is None:
+				self.alerter = alerter
+			if self.window_seconds <= 0:
+				send_now = True
+			else:
+				send_now = False
+				if self.timer is None:
+					self.timer = threading.Timer(self.window_seconds, self.flush)
+					self.timer.daemon = True
+					self.timer.start()
+		if send_now is True:
+			self.flush()
+
+
+	def flush(self):
+		"""Sends the queued alerts, one by one if there is one, else as one aggregated alert"""
+		with self.lock:
+			alerts, alerter = self.alerts, self.alerter
+			self.alerts, self.alerter = [], None
+			if self.timer is not None:
+				self.timer.cancel()
+				self.timer = None
+		if len(alerts) == 1:
+			alerter.alert(*alerts[0])
+		elif len(alerts) > 1:
+			alerter.alert_many(alerts)
+		return len(alerts)
+
+
+alert_coalescer = None
+alert_coalescer_lock = threading.Lock()
+
+
+def get_alert_coalescer():
+	"""The process's AlertCoalescer, flushed when the process exits"""
+	global alert_coalescer
+	with alert_coalescer_lock:
+		if alert_coalescer is None:
+			alert_coalescer = AlertCoalescer(window_seconds=config.alert_coalesce_seconds)
+			atexit.register(alert_coalescer.flush)
+		return alert_coalescer
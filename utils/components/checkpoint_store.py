@@ -0,0 +1,85 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class CheckpointStore:
+
+	def __init__(self, path):
+		"""
+		Local SQLite record of which jobs of a process handler have run for a target date, so a rerun after a
+		failure can skip the jobs that already succeeded.
+
+		:param path: Path of the SQLite file. Its directory is created if needed
+		"""
+		self.path = path
+		directory = os.path.dirname(self.path)
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+		with self.connect() as connection:
+			connection.execute('PRAGMA journal_mode=WAL')
+			connection.execute("""
+				CREATE TABLE IF NOT EXISTS checkpoints (
+					handler TEXT NOT NULL,
+					job TEXT NOT NULL,
+					target_date TEXT NOT NULL,
+					status TEXT NOT NULL,
+					output_rows INTEGER,
+					updated_at TEXT NOT NULL,
+					PRIMARY KEY (handler, job, target_date)
+				)
+			""")
+
+
+	@contextmanager
+	def connect(self):
+		# One short-lived connection per call, so the store can be shared across worker threads
+		connection = sqlite3.connect(self.path, timeout=30)
+		try:
+			with connection:
+				yield connection
+		finally:
+			connection.close()
+
+
+	def get_status(self, handler, job, target_date):
+		with self.connect() as connection:
+			result = connection.execute(
+				'SELECT status FROM checkpoints WHERE handler = ? AND job = ? AND target_date = ?',
+				(handler, job, str(target_date))
+			).fetchone()
+		return result[0] if result else None
+
+
+	def has_succeeded(self, handler, job, target_date):
+		return self.get_status(handler, job, target_date) == 'succeeded'
+
+
+	def record(self, handler, job, target_date, status, output_rows=None):
+		with self.connect() as connection:
+			connection.execute(
+				'INSERT OR REPLACE INTO checkpoints (handler, job, target_date, status, output_rows, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+				(handler, job, str(target_date), status, output_rows, datetime.now().isoformat())
+			)
+
+
+	def get_checkpoints(self, handler, target_date=None):
+		query = 'SELECT job, target_date, status, output_rows, updated_at FROM checkpoints WHERE handler = ?'
+		params = [handler]
+		if target_date is not None:
+			query += ' AND target_date = ?'
+			params.append(str(target_date))
+		with self.connect() as connection:
+			results = connection.execute(query, params).fetchall()
+		return [dict(zip(['job', 'target_date', 'status', 'output_rows', 'updated_at'], result)) for result in results]
+
+
+	def clear(self, handler, target_date=None):
+		query = 'DELETE FROM checkpoints WHERE handler = ?'
+		params = [handler]
+		if target_date is not None:
+			query += ' AND target_date = ?'
+			params.append(str(target_date))
+		with self.connect() as connection:
+			connection.execute(query, params)
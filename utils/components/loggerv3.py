@@ -1,15 +1,15 @@
-import pandas as pd
 import config
-import json
 import json_log_formatter
 import logging
+import logging.handlers
 import os
 import traceback
 from datetime import datetime
-from time import sleep
+from utils.components.alert_coalescer import get_alert_coalescer
 from utils.components.dater import Dater
+from utils.components.record_buffer_handler import RecordBufferHandler, read_last_json_line
+from utils.components.run_log_writer import get_run_log_writer
 from utils.connectors.opsgenie_api_connector import OpsGenieAPIConnector
-from utils.connectors.database_connector import DatabaseConnector
 
 
 class Loggerv3(logging.Logger):
@@ -44,22 +44,20 @@ class Loggerv3(logging.Logger):
         self.stream_date_format = '%Y-%m-%d %H:%M:%S'
         self.logStreamHandler = None
         self.logFileHandler = None
+        self.recordBufferHandler = None
         self.assign_handlers()
         self.process_handler = config.process_handler
         self.MAX_DETAILS_LENGTH = 1000
         self.run_start_time = None
         self.run_end_time = None
         self.write_logs_to_table = True
-        self.connector = DatabaseConnector(file_location)
-        self.schema = 'data_monitoring_tools'
-        self.table_name = 'run_logs'
 
 
     def create_full_logger_path(self):
         """If directory doesn't exist, create it"""
         logger_path = '/'.join([self.directory, self.today])
-        if not os.path.isdir(logger_path):
-            os.mkdir(logger_path)
+        # Jobs in a JobDag construct their loggers concurrently
+        os.makedirs(logger_path, exist_ok=True)
         self.filename = ''.join([self.filename.split('.py')[0], '.json'])
         self.full_logger_path = '/'.join([logger_path, self.filename])
 
@@ -68,6 +66,7 @@ class Loggerv3(logging.Logger):
         if len(self.logger.handlers) == 0:
             self.create_stream_handler(self.logger)
             self.create_file_handler(self.full_logger_path, self.logger)
+            self.create_record_buffer_handler(self.logger)
 
 
     def create_stream_handler(self, logger):
@@ -79,16 +78,30 @@ class Loggerv3(logging.Logger):
 
 
     def create_file_handler(self, path, logger):
-        self.logFileHandler = logging.FileHandler(path, mode='a')
+        # Rotated files (<job>.json.1, ...) are compressed and archived with the rest of the day by LogFileHandlerJob
+        self.logFileHandler = logging.handlers.RotatingFileHandler(path, mode='a', maxBytes=config.log_max_bytes, backupCount=config.log_backup_count)
         json_formatter = json_log_formatter.JSONFormatter()
         self.logFileHandler.setFormatter(json_formatter)
         self.logFileHandler.setLevel(self.log_level)
         logger.addHandler(self.logFileHandler)
 
 
+    def create_record_buffer_handler(self, logger):
+        self.recordBufferHandler = RecordBufferHandler()
+        self.recordBufferHandler.setLevel(self.log_level)
+        logger.addHandler(self.recordBufferHandler)
+
+
     def kickoff_logger(self):
         if self.run_start_time is None:
             self.run_start_time = datetime.now()
+        today = self.dater.format_date(self.dater.get_today())
+        if today != self.today:
+            # A process running past midnight moves on to the new day's log file, so the previous day can be closed
+            self.today = today
+            self.filename = os.path.basename(self.name)
+            self.create_full_logger_path()
+            self.close()
         self.assign_handlers()
 
 
@@ -100,7 +113,6 @@ class Loggerv3(logging.Logger):
 
     def success(self, msg):
         status = 'SUCCESS'
-        sleep(5)
         self.write_logs_to_redshift(status)
         self.logger.info(msg, extra={'level': status, 'process_handler': self.process_handler})
         self.close()
@@ -155,6 +167,12 @@ class Loggerv3(logging.Logger):
             raise
 
 
+    def timing(self, msg, **timings):
+        """Logs an info line whose timings are kept as fields of the json log"""
+        self.kickoff_logger()
+        self.logger.info(msg, extra={'level': 'TIMING', 'process_handler': self.process_handler, **timings})
+
+
     def inline_info(self, msg):
         self.kickoff_logger()
         inline_logger = logging.getLogger(f'{self.name} - Inline')
@@ -202,6 +220,7 @@ class Loggerv3(logging.Logger):
 
 
     def write_logs_to_redshift(self, final_status):
+        """Queues the run's run_logs row. It is written in a batch by the process's RunLogWriter, not here"""
         if self.write_logs_to_table is True:
             self.run_end_time = datetime.now()
             data = {
@@ -211,17 +230,20 @@ class Loggerv3(logging.Logger):
                 'run_time_sec': round((self.run_end_time - self.run_start_time).total_seconds(), 0),
                 'process_handler': self.write_process_handler_helper()
             }
-            dataframe = pd.DataFrame([data])
-            self.connector.write_to_sql(dataframe, self.table_name, self.connector.sv2_engine(), schema=self.schema, method='multi', index=False, if_exists='append')
-            self.connector.update_redshift_table_permissions(self.table_name, schema=self.schema)
+            get_run_log_writer(self.file_location).put(data)
+
+
+    def get_last_log_line(self):
+        for handler in self.logger.handlers:
+            if isinstance(handler, RecordBufferHandler) and handler.get_last_record() is not None:
+                return handler.get_last_record()
+        # The logger's handlers belong to another Loggerv3 of the same name or were closed, so read the file's tail
+        return read_last_json_line(self.full_logger_path)
 
 
     def send_alert(self):
+        log_line = self.get_last_log_line()
         if self.alert:
-            data = [json.loads(line) for line in open(self.full_logger_path, 'r')]
-            log_line = data[-1]
-            self.alerter.alert(log_line, self.name)
+            get_alert_coalescer().add(self.alerter, log_line, self.name)
         else:
-            data = [json.loads(line) for line in open(self.full_logger_path, 'r')]
-            log_line = data[-1]
             print(log_line)
@@ -0,0 +1,197 @@
+import math
+import os
+import re
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+
+DEFAULT_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 600, 1800)
+# Table of MetricsRegistry.to_rows, joined to run_logs on job_start and filename
+RUN_METRICS_DDL = """
+	CREATE TABLE IF NOT EXISTS {schema}.run_metrics (
+		job_start TIMESTAMP NOT NULL,
+		filename VARCHAR(256) NOT NULL,
+		process_handler VARCHAR(256),
+		metric VARCHAR(256) NOT NULL,
+		metric_type VARCHAR(16) NOT NULL,
+		value DOUBLE PRECISION,
+		count BIGINT
+	)
+	DISTKEY(filename)
+	SORTKEY(job_start);
+"""
+
+
+class Counter:
+
+	metric_type = 'counter'
+
+	def __init__(self):
+		self.value = 0
+		self.lock = threading.Lock()
+
+
+	def inc(self, amount=1):
+		if amount < 0:
+			raise ValueError('Counters can only increase')
+		with self.lock:
+			self.value += amount
+
+
+class Gauge:
+
+	metric_type = 'gauge'
+
+	def __init__(self):
+		self.value = 0
+		self.lock = threading.Lock()
+
+
+	def set(self, value):
+		with self.lock:
+			self.value = value
+
+
+	def set_max(self, value):
+		"""Keeps the highest value set, e.g. for peaks sampled through a run"""
+		with self.lock:
+			self.value = max(self.value, value)
+
+
+	def inc(self, amount=1):
+		with self.lock:
+			self.value += amount
+
+
+	def dec(self, amount=1):
+		with self.lock:
+			self.value -= amount
+
+
+class Histogram:
+
+	metric_type = 'histogram'
+
+	def __init__(self, buckets=DEFAULT_BUCKETS):
+		self.buckets = sorted(buckets)
+		self.bucket_counts = [0] * len(self.buckets)
+		self.count = 0
+		self.value = 0
+		self.lock = threading.Lock()
+
+
+	def observe(self, value):
+		with self.lock:
+			self.count += 1
+			self.value += value
+			for idx, bound in enumerate(self.buckets):
+				if value <= bound:
+					self.bucket_counts[idx] += 1
+
+
+class MetricsRegistry:
+
+	def __init__(self, job_name, prefix='hestia_job'):
+		"""
+		Counters, gauges and histograms of one job, aggregated in process and exported once the job ends.
+
+		Exported as a Prometheus textfile collector file, with each metric labelled by job, and as run_metrics rows.
+
+		:param job_name: Name of the job, used as the job label
+		:param prefix: Prefix of the exported metric names
+		"""
+		self.job_name = job_name
+		self.prefix = prefix
+		self.metrics = {}
+		self.lock = threading.Lock()
+
+
+	def get_or_create(self, name, metric_class, **kwargs):
+		name = re.sub(r'[^a-zA-Z0-9_]', '_', name)
+		with self.lock:
+			if name not in self.metrics:
+				self.metrics[name] = metric_class(**kwargs)
+			metric = self.metrics[name]
+		if not isinstance(metric, metric_class):
+			raise ValueError(f'{name} is already a {metric.metric_type}')
+		return metric
+
+
+	def counter(self, name):
+		return self.get_or_create(name, Counter)
+
+
+	def gauge(self, name):
+		return self.get_or_create(name, Gauge)
+
+
+	def histogram(self, name, buckets=DEFAULT_BUCKETS):
+		return self.get_or_create(name, Histogram, buckets=buckets)
+
+
+	@contextmanager
+	def timer(self, name, buckets=DEFAULT_BUCKETS):
+		"""Observes the seconds spent in the with block in the <name>_seconds histogram"""
+		started = perf_counter()
+		try:
+			yield
+		finally:
+			self.histogram(f'{name}_seconds', buckets=buckets).observe(perf_counter() - started)
+
+
+	def reset(self):
+		with self.lock:
+			self.metrics = {}
+
+
+	def format_value(self, value):
+		if isinstance(value, float) and math.isinf(value):
+			return '+Inf'
+		return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+	def to_prometheus_text(self):
+		"""The metrics in the Prometheus text exposition format"""
+		lines = []
+		label = 'job="{}"'.format(str(self.job_name).replace('\\', '\\\\').replace('"', '\\"'))
+		with self.lock:
+			metrics = sorted(self.metrics.items())
+		for name, metric in metrics:
+			full_name = f'{self.prefix}_{name}_total' if metric.metric_type == 'counter' else f'{self.prefix}_{name}'
+			lines.append(f'# TYPE {full_name} {metric.metric_type}')
+			if metric.metric_type == 'histogram':
+				with metric.lock:
+					for bound, bucket_count in zip(metric.buckets, metric.bucket_counts):
+						lines.append(f'{full_name}_bucket{{{label},le="{self.format_value(bound)}"}} {bucket_count}')
+					lines.append(f'{full_name}_bucket{{{label},le="+Inf"}} {metric.count}')
+					lines.append(f'{full_name}_sum{{{label}}} {self.format_value(metric.value)}')
+					lines.append(f'{full_name}_count{{{label}}} {metric.count}')
+			else:
+				lines.append(f'{full_name}{{{label}}} {self.format_value(metric.value)}')
+		return '\n'.join(lines) + '\n'
+
+
+	def write_textfile(self, directory):
+		"""Writes the metrics to <directory>/<job_name>.prom, replacing the file in one step as the collector expects"""
+		os.makedirs(directory, exist_ok=True)
+		path = '/'.join([directory, f'{self.job_name}.prom'])
+		with open(f'{path}.tmp', 'w') as f:
+			f.write(self.to_prometheus_text())
+		os.replace(f'{path}.tmp', path)
+		return path
+
+
+	def to_rows(self, job_start, process_handler):
+		"""One run_metrics row per metric. Histograms keep their sum as value alongside their count"""
+		with self.lock:
+			metrics = sorted(self.metrics.items())
+		return [{
+			'job_start': job_start,
+			'filename': self.job_name,
+			'process_handler': process_handler,
+			'metric': name,
+			'metric_type': metric.metric_type,
+			'value': float(metric.value),
+			'count': metric.count if metric.metric_type == 'histogram' else None
+		} for name, metric in metrics]
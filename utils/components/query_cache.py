@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import re
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import datetime
+from sqlalchemy.engine.result import result_tuple
+
+
+# Functions whose arguments use FROM, e.g. extract(day from start_timestamp)
+FUNCTIONS_WITH_FROM = ('extract', 'trim', 'substring', 'position', 'overlay')
+# Keywords after which a FROM list's commas no longer separate relations
+FROM_LIST_END = ('where', 'group', 'having', 'order', 'limit', 'offset', 'union', 'intersect', 'except', 'minus', 'qualify', 'window')
+
+
+class QueryCache:
+
+	def __init__(self, directory, max_bytes):
+		"""
+		Local Parquet cache of read query results, keyed by normalized SQL text.
+
+		Each entry stores the watermark of the tables the query read. An entry is only served while the
+		caller's current watermark matches, so any insert into or delete from a referenced table invalidates it.
+		Served rows have the same Row type, with the same column names, as a query's uncached results.
+
+		:param directory: Directory the cached results are written to
+		:param max_bytes: Size cap for the directory. The least recently used entries are evicted past it
+		"""
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		os.makedirs(self.directory, exist_ok=True)
+
+
+	def normalize(self, query):
+		"""Lowercases and collapses whitespace outside of string literals"""
+		parts = re.split(r"('(?:[^']|'')*')", query.strip().rstrip(';'))
+		normalized = []
+		for part in parts:
+			if part.startswith("'"):
+				normalized.append(part)
+			else:
+				normalized.append(re.sub(r'\s+', ' ', part.lower()))
+		return ''.join(normalized).strip()
+
+
+	def referenced_tables(self, query):
+		"""
+		The schema.table names of every relation in the query's FROM lists and joins, CTEs aside.
+
+		Returns None when a relation cannot be resolved to one, e.g. an unqualified table or a table function,
+		since changes to it could not be tracked.
+		"""
+		normalized = re.sub(r"'(?:[^']|'')*'", "''", self.normalize(query))
+		ctes = set(re.findall(r'(?:\bwith(?: recursive)?|,) ([a-z_][a-z0-9_]*) as ?\(', normalized))
+		tokens = re.findall(r'[a-z_][a-z0-9_$]*(?:\.[a-z_][a-z0-9_$]*)*|\S', normalized)
+		tables = set()
+		# The token before each open parenthesis, to tell function arguments from subqueries
+		parentheses = []
+		from_lists = set()
+		expecting = False
+		previous = None
+		for token in tokens:
+			depth = len(parentheses)
+			if expecting:
+				expecting = False
+				if token == '(':
+					parentheses.append(None)
+				elif '.' in token:
+					tables.add(token)
+				elif token not in ctes:
+					return None
+			elif token == '(':
+				parentheses.append(previous)
+			elif token == ')':
+				from_lists.discard(depth)
+				if parentheses:
+					parentheses.pop()
+			elif token == 'from' and previous != 'distinct' and (not parentheses or parentheses[-1] not in FUNCTIONS_WITH_FROM):
+				from_lists.add(depth)
+				expecting = True
+			elif token == 'join' or (token == ',' and depth in from_lists):
+				expecting = True
+			elif token in FROM_LIST_END:
+				from_lists.discard(depth)
+			previous = token
+		return sorted(tables)
+
+
+	def get_key(self, query):
+		normalized = self.normalize(query)
+		# Results of queries relative to the current date are only valid for that day
+		if re.search(r'\b(current_date|getdate|sysdate)\b', normalized):
+			normalized = ' '.join([normalized, datetime.now().strftime('%Y-%m-%d')])
+		return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+	def get_paths(self, key):
+		base = os.path.join(self.directory, key)
+		return f'{base}.parquet', f'{base}.json'
+
+
+	def get(self, query, watermark):
+		data_path, meta_path = self.get_paths(self.get_key(query))
+		try:
+			with open(meta_path, 'r') as f:
+				meta = json.load(f)
+			if meta['watermark'] != watermark:
+				self.misses += 1
+				return None
+			table = pq.read_table(data_path)
+		except (OSError, ValueError, KeyError, pa.ArrowException):
+			self.misses += 1
+			return None
+
+		os.utime(meta_path)
+		self.hits += 1
+		make_row = result_tuple(meta['columns'])
+		return [make_row(values) for values in zip(*[column.to_pylist() for column in table.columns])]
+
+
+	def put(self, query, watermark, columns, rows):
+		data_path, meta_path = self.get_paths(self.get_key(query))
+		try:
+			arrays = [pa.array([row[idx] for row in rows]) for idx in range(len(columns))]
+			# Result sets may repeat a column name, so columns are stored positionally
+			table = pa.Table.from_arrays(arrays, names=[f'c{idx}' for idx in range(len(columns))])
+		except (pa.ArrowException, TypeError, ValueError):
+			# Columns pyarrow cannot type (e.g. mixed types) are not cached
+			return
+
+		pq.write_table(table, f'{data_path}.tmp')
+		os.replace(f'{data_path}.tmp', data_path)
+		with open(f'{meta_path}.tmp', 'w') as f:
+			json.dump({'query': query, 'columns': list(columns), 'watermark': watermark, 'cached_at': datetime.now().isoformat()}, f)
+		os.replace(f'{meta_path}.tmp', meta_path)
+		self.evict()
+
+
+	def evict(self):
+		entries = []
+		total_bytes = 0
+		for file in os.listdir(self.directory):
+			if not file.endswith('.json'):
+				continue
+			data_path, meta_path = self.get_paths(file[:-len('.json')])
+			try:
+				size = os.path.getsize(data_path) + os.path.getsize(meta_path)
+				last_used = os.path.getmtime(meta_path)
+			except OSError:
+				continue
+			entries.append((last_used, data_path, meta_path, size))
+			total_bytes += size
+
+		for last_used, data_path, meta_path, size in sorted(entries):
+			if total_bytes <= self.max_bytes:
+				break
+			for path in (meta_path, data_path):
+				if os.path.exists(path):
+					os.remove(path)
+			total_bytes -= size
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+
+
+class QueryRecorder:
+
+	def __init__(self, capacity=10000, sink_path=None):
+		"""
+		Records one structured event per query run through a DatabaseConnector.
+
+		Events are kept in a bounded in-memory ring, so a long handler run only holds the latest capacity events,
+		and are optionally appended to a JSONL file as they happen.
+
+		:param capacity: Number of events kept in memory
+		:param sink_path: Path of a JSONL file each event is appended to. None disables the sink
+		"""
+		self.events = deque(maxlen=capacity)
+		self.sink_path = sink_path
+		self.lock = threading.Lock()
+
+
+	def fingerprint(self, query):
+		"""Hash of the query with literals replaced, so runs of the same statement with different values group together"""
+		normalized = re.sub(r"'(?:[^']|'')*'", '?', query.strip().rstrip(';'))
+		normalized = re.sub(r'\b\d+(?:\.\d+)?\b', '?', normalized)
+		normalized = re.sub(r'\s+', ' ', normalized.lower()).strip()
+		return hashlib.md5(normalized.encode('utf-8')).hexdigest()[:12]
+
+
+	def estimate_bytes(self, rows, sample_rows=100):
+		"""Approximate size of a result set, extrapolated from the text width of its first sample_rows rows"""
+		if rows is None or len(rows) == 0:
+			return 0
+		sample = rows[:sample_rows]
+		sample_bytes = sum([sum([len(str(value)) for value in row if value is not None]) for row in sample])
+		return int(sample_bytes * len(rows) / len(sample))
+
+
+	def record(self, job_name, target, query, wall_seconds, rows=None, byte_count=None, query_id=None, kind='read'):
+		event = {
+			'recorded_at': datetime.now().isoformat(),
+			'job_name': job_name,
+			'target': target,
+			'kind': kind,
+			'fingerprint': self.fingerprint(query),
+			'query': query.strip()[:1000],
+			'wall_seconds': round(wall_seconds, 4),
+			'rows': rows,
+			'bytes': byte_count,
+			'query_id': query_id
+		}
+		with self.lock:
+			self.events.append(event)
+			if self.sink_path:
+				with open(self.sink_path, 'a') as f:
+					f.write(json.dumps(event, default=str) + '\n')
+		return event
+
+
+	def get_events(self, job_name=None):
+		with self.lock:
+			events = list(self.events)
+		if job_name is None:
+			return events
+		return [event for event in events if event['job_name'] == job_name]
+
+
+	def slowest(self, top_n=10):
+		return sorted(self.get_events(), key=lambda event: event['wall_seconds'], reverse=True)[:top_n]
+
+
+	def summary(self, top_n=10):
+		"""Events grouped by fingerprint, ordered by total wall time"""
+		groups = {}
+		for event in self.get_events():
+			group = groups.setdefault(event['fingerprint'], {
+				'fingerprint': event['fingerprint'],
+				'target': event['target'],
+				'jobs': set(),
+				'calls': 0,
+				'total_seconds': 0,
+				'max_seconds': 0,
+				'rows': 0,
+				'bytes': 0,
+				'query': event['query']
+			})
+			group['jobs'].add(event['job_name'])
+			group['calls'] += 1
+			group['total_seconds'] += event['wall_seconds']
+			group['max_seconds'] = max(group['max_seconds'], event['wall_seconds'])
+			group['rows'] += event['rows'] or 0
+			group['bytes'] += event['bytes'] or 0
+
+		top = sorted(groups.values(), key=lambda group: group['total_seconds'], reverse=True)[:top_n]
+		for group in top:
+			group['jobs'] = sorted([str(job) for job in group['jobs']])
+			group['total_seconds'] = round(group['total_seconds'], 4)
+		return top
+
+
+	def format_summary(self, top_n=10):
+		lines = [f'Top {top_n} queries by total wall time:']
+		for group in self.summary(top_n):
+			query = re.sub(r'\s+', ' ', group['query'])[:120]
+			lines.append(f"{group['total_seconds']:>10.2f}s {group['calls']:>5} calls {group['rows']:>12} rows  {group['target']:<16} {', '.join(group['jobs'])}: {query}")
+		return '\n'.join(lines)
+
+
+	@classmethod
+	def from_sink(cls, sink_path, offset=0):
+		"""
+		Loads the events appended to a JSONL sink after offset, e.g. those every worker process of a run wrote to it.
+
+		:param sink_path: Path of the JSONL sink
+		:param offset: Byte offset to read from, usually the sink's size when the run started
+		"""
+		recorder = cls(capacity=None)
+		if not os.path.isfile(sink_path):
+			return recorder
+		with open(sink_path, 'r') as f:
+			f.seek(offset)
+			for line in f:
+				try:
+					recorder.events.append(json.loads(line))
+				except ValueError:
+					# A line still being appended by another process
+					continue
+		return recorder
+
+
+	def clear(self):
+		with self.lock:
+			self.events.clear()
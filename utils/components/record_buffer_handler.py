@@ -0,0 +1,47 @@
+import json
+import json_log_formatter
+import logging
+import os
+from collections import deque
+
+
+class RecordBufferHandler(logging.Handler):
+
+	def __init__(self, capacity=50, level=logging.NOTSET):
+		"""
+		Keeps the last capacity records of a logger in memory, formatted like its json log file.
+
+		:param capacity: Number of records kept
+		:param level: logging level
+		"""
+		super().__init__(level)
+		self.records = deque(maxlen=capacity)
+		self.setFormatter(json_log_formatter.JSONFormatter())
+
+
+	def emit(self, record):
+		try:
+			self.records.append(json.loads(self.format(record)))
+		except Exception:
+			self.handleError(record)
+
+
+	def get_last_record(self):
+		return self.records[-1] if len(self.records) > 0 else None
+
+
+def read_last_json_line(path, block_size=8192):
+	"""Parses the last line of a JSONL file, reading backwards from its end rather than through the whole file"""
+	with open(path, 'rb') as f:
+		f.seek(0, os.SEEK_END)
+		position = f.tell()
+		tail = b''
+		while position > 0:
+			read_size = min(block_size, position)
+			position -= read_size
+			f.seek(position)
+			tail = f.read(read_size) + tail
+			lines = tail.rstrip(b'\n').split(b'\n')
+			if len(lines) > 1 or position == 0:
+				return json.loads(lines[-1]) if lines[-1] else None
+	return None
@@ -0,0 +1,47 @@
+import random
+import requests
+from base.exceptions import ResponseCodeException
+from botocore.exceptions import ClientError, ConnectionClosedError, ConnectTimeoutError, EndpointConnectionError, ReadTimeoutError
+from sqlalchemy.exc import DBAPIError
+
+
+TRANSIENT_MESSAGES = [
+	'serializable isolation violation',
+	'could not serialize access',
+	'deadlock detected',
+	'server closed the connection',
+	'connection reset',
+	'ssl syscall error',
+	'could not connect to server',
+	'connection timed out',
+	'lost connection to mysql',
+	'too many connections',
+	'lock wait timeout'
+]
+TRANSIENT_AWS_CODES = {
+	'Throttling', 'ThrottlingException', 'SlowDown', 'RequestLimitExceeded', 'TooManyRequestsException', 'RequestTimeout',
+	'ServiceUnavailable', 'InternalError', '500', '503'
+}
+
+
+def is_transient_error(exception):
+	"""True for errors a retry can be expected to get past: serialization conflicts, dropped connections and throttling"""
+	if isinstance(exception, (EndpointConnectionError, ConnectionClosedError, ConnectTimeoutError, ReadTimeoutError, requests.ConnectionError, requests.Timeout)):
+		return True
+	if isinstance(exception, ClientError):
+		return exception.response.get('Error', {}).get('Code') in TRANSIENT_AWS_CODES
+	if isinstance(exception, requests.HTTPError) and exception.response is not None:
+		return exception.response.status_code == 429 or exception.response.status_code >= 500
+	if isinstance(exception, ResponseCodeException):
+		return str(exception.code) == '429' or str(exception.code).startswith('5')
+	if isinstance(exception, DBAPIError):
+		if exception.connection_invalidated is True:
+			return True
+		message = str(exception.orig if exception.orig is not None else exception).lower()
+		return any([transient in message for transient in TRANSIENT_MESSAGES])
+	return False
+
+
+def get_backoff_seconds(attempt, base_seconds, max_seconds):
+	"""Exponential backoff with full jitter for the given 1-based attempt"""
+	return random.uniform(0, min(max_seconds, base_seconds * 2 ** (attempt - 1)))
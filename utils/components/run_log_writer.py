@@ -0,0 +1,162 @@
+import atexit
+import config
+import json
+import logging
+import os
+import pandas as pd
+import threading
+from utils.connectors.database_connector import DatabaseConnector
+
+
+class RunLogWriter:
+
+	def __init__(self, file_location, connector=None, flush_seconds=60, schema='data_monitoring_tools', table_name='run_logs', ddl=None):
+		"""
+		Buffers run_logs (or run_metrics) rows and writes them to Redshift in one batch from a background thread.
+
+		Each row is appended to a JSONL spool under logs/<table_name>_spool before it is buffered, and the spool is only
+		cleared once its rows are written. A process that dies with rows still spooled has them picked up by the next
+		writer started on the same file_location.
+
+		:param file_location: Base directory of the spool
+		:param connector: DatabaseConnector to write with. Created on the first flush when None
+		:param flush_seconds: Seconds between background flushes
+		:param schema: Schema of the table
+		:param table_name: Name of the table. Its rows need a job_start column
+		:param ddl: CREATE TABLE IF NOT EXISTS statement, formatted with schema, run before the first write so the table
+			is never created by pandas with inferred types
+		"""
+		self.file_location = file_location
+		self.connector = connector
+		self.flush_seconds = flush_seconds
+		self.schema = schema
+		self.table_name = table_name
+		self.ddl = ddl
+		self.table_created = False
+		self.spool_directory = ''.join([file_location, 'logs/', f'{table_name}_spool'])
+		os.makedirs(self.spool_directory, exist_ok=True)
+		self.spool_path = '/'.join([self.spool_directory, f'{os.getpid()}.jsonl'])
+		self.rows = []
+		self.lock = threading.Lock()
+		self.flush_lock = threading.Lock()
+		self.wake = threading.Event()
+		self.stopped = False
+		self.thread = None
+		self.recover_spools()
+
+
+	def is_running(self, pid):
+		try:
+			os.kill(pid, 0)
+		except ProcessLookupError:
+			return False
+		except PermissionError:
+			return True
+		return True
+
+
+	def recover_spools(self):
+		"""Takes over the spooled rows of processes that are no longer running"""
+		for filename in os.listdir(self.spool_directory):
+			pid = filename.split('.')[0]
+			if not filename.endswith('.jsonl') or not pid.isdigit() or int(pid) == os.getpid() or self.is_running(int(pid)):
+				continue
+			# Renaming claims the spool, so two writers starting at once do not both take it over
+			claimed_path = '/'.join([self.spool_directory, f'{os.getpid()}.{pid}.claimed'])
+			try:
+				os.rename('/'.join([self.spool_directory, filename]), claimed_path)
+			except FileNotFoundError:
+				continue
+			with open(claimed_path, 'r') as f:
+				rows = [json.loads(line) for line in f if line.strip()]
+			with self.lock:
+				self.spool(rows)
+				self.rows.extend(rows)
+			os.remove(claimed_path)
+
+
+	def spool(self, rows):
+		with open(self.spool_path, 'a') as f:
+			for row in rows:
+				f.write(json.dumps(row, default=str) + '\n')
+			f.flush()
+			os.fsync(f.fileno())
+
+
+	def put(self, row):
+		"""Spools and buffers a run_logs row. It is written on the next flush"""
+		with self.lock:
+			self.spool([row])
+			self.rows.append(row)
+			if self.thread is None and self.stopped is False:
+				self.thread = threading.Thread(target=self.run, name='run-log-writer', daemon=True)
+				self.thread.start()
+
+
+	def run(self):
+		while self.stopped is False:
+			self.wake.wait(self.flush_seconds)
+			self.wake.clear()
+			# close does the final flush
+			if self.stopped is True:
+				break
+			self.flush()
+
+
+	def flush(self):
+		"""Writes every buffered row in one statement. Rows are kept for the next flush if the write fails"""
+		with self.flush_lock:
+			with self.lock:
+				batch = list(self.rows)
+			if len(batch) == 0:
+				return 0
+			try:
+				if self.connector is None:
+					self.connector = DatabaseConnector(self.file_location)
+				if self.ddl is not None and self.table_created is False:
+					self.connector.write_redshift(self.ddl.format(schema=self.schema))
+					self.table_created = True
+				dataframe = pd.DataFrame(batch)
+				dataframe['job_start'] = pd.to_datetime(dataframe['job_start'])
+				self.connector.write_to_sql(dataframe, self.table_name, self.connector.sv2_engine(), schema=self.schema, method='multi', index=False, if_exists='append')
+				self.connector.update_redshift_table_permissions(self.table_name, schema=self.schema)
+			except Exception as e:
+				logging.getLogger(__name__).warning(f'Could not write {len(batch)} {self.table_name} row(s), kept in {self.spool_path}: {e}')
+				return 0
+			with self.lock:
+				self.rows = self.rows[len(batch):]
+				if os.path.isfile(self.spool_path):
+					os.remove(self.spool_path)
+				if len(self.rows) > 0:
+					self.spool(self.rows)
+			return len(batch)
+
+
+	def close(self):
+		"""Stops the background thread and flushes what is left"""
+		self.stopped = True
+		self.wake.set()
+		if self.thread is not None:
+			self.thread.join(timeout=self.flush_seconds)
+		return self.flush()
+
+
+run_log_writers = {}
+run_log_writers_lock = threading.Lock()
+
+
+def get_run_log_writer(file_location, table_name='run_logs', ddl=None):
+	"""The process's RunLogWriter for file_location and table_name, flushed when the process exits"""
+	with run_log_writers_lock:
+		if (file_location, table_name) not in run_log_writers:
+			writer = RunLogWriter(file_location, flush_seconds=config.run_logs_flush_seconds, table_name=table_name, ddl=ddl)
+			atexit.register(writer.close)
+			run_log_writers[(file_location, table_name)] = writer
+		return run_log_writers[(file_location, table_name)]
+
+
+def flush_run_logs():
+	"""Writes the buffered rows of every writer in the process"""
+	with run_log_writers_lock:
+		writers = list(run_log_writers.values())
+	return sum([writer.flush() for writer in writers])
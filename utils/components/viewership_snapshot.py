@@ -0,0 +1,45 @@
+import config
+from datetime import datetime, timedelta
+
+
+SNAPSHOT_RELATION = 'staging.vod_viewership_snapshot'
+VIEWERSHIP_RELATION = 'warehouse.vod_viewership'
+
+
+def get_snapshot_window(target_date, days=14):
+	"""The [start, end) dates a snapshot for target_date covers: the trailing days days, target_date included"""
+	target_dt = datetime.strptime(target_date, '%Y-%m-%d')
+	return {
+		'start': (target_dt - timedelta(days=days - 1)).strftime('%Y-%m-%d'),
+		'end': (target_dt + timedelta(days=1)).strftime('%Y-%m-%d')
+	}
+
+
+def use_viewership_snapshot(target_date, days=14):
+	"""
+	Points viewership_relation at the snapshot for target_date, for the jobs of this run and their worker processes.
+
+	Only call it once the snapshot has been rebuilt in this run. Under dry_run it never is, so nothing changes.
+
+	:param target_date: Last date in the snapshot, as YYYY-MM-DD
+	:param days: Number of trailing dates in the snapshot
+	"""
+	if config.dry_run is True:
+		return
+	config.viewership_snapshot = dict(get_snapshot_window(target_date, days), relation=SNAPSHOT_RELATION)
+
+
+def viewership_relation(start, end):
+	"""
+	Relation to read warehouse.vod_viewership rows with start_timestamp in [start, end) from.
+
+	Returns the run's snapshot when it covers the whole window, otherwise warehouse.vod_viewership. The snapshot has
+	the same columns, so a query reads the same rows from either.
+
+	:param start: First date of the window, as YYYY-MM-DD
+	:param end: Date after the last date of the window, as YYYY-MM-DD
+	"""
+	snapshot = config.viewership_snapshot
+	if snapshot is not None and snapshot['start'] <= start and end <= snapshot['end']:
+		return snapshot['relation']
+	return VIEWERSHIP_RELATION
@@ -0,0 +1,81 @@
+import config
+import os
+import threading
+import mysql.connector as mysql_con
+from mysql.connector import errors as mysql_errors
+from mysql.connector.pooling import MySQLConnectionPool
+from sqlalchemy import create_engine
+
+
+class ConnectionRegistry:
+	"""
+	Process-wide registry of SQLAlchemy engines and mysql-connector pools, keyed by target.
+
+	Each target is created once per process and reused by every DatabaseConnector, so jobs and
+	Loggerv3 writes share warm connections instead of opening a new one per query. Pool settings
+	are read from config when a target is first created. The registry is reset after a fork so
+	child processes never reuse sockets inherited from their parent.
+	"""
+
+	_engines = {}
+	_pools = {}
+	_pid = os.getpid()
+	_lock = threading.RLock()
+
+
+	@classmethod
+	def _reset_after_fork(cls):
+		if cls._pid != os.getpid():
+			for engine in cls._engines.values():
+				engine.dispose(close=False)
+			cls._engines = {}
+			cls._pools = {}
+			cls._pid = os.getpid()
+
+
+	@classmethod
+	def get_engine(cls, target, url):
+		with cls._lock:
+			cls._reset_after_fork()
+			key = (target, url)
+			if key not in cls._engines:
+				cls._engines[key] = create_engine(
+					url,
+					pool_size=config.db_pool_size,
+					max_overflow=config.db_max_overflow,
+					pool_recycle=config.db_pool_recycle,
+					pool_pre_ping=config.db_pool_pre_ping
+				)
+			return cls._engines[key]
+
+
+	@classmethod
+	def get_connection(cls, target, host, user, password, database):
+		with cls._lock:
+			cls._reset_after_fork()
+			key = (target, host, user, database)
+			if key not in cls._pools:
+				cls._pools[key] = MySQLConnectionPool(
+					pool_name=target,
+					pool_size=config.mysql_pool_size,
+					pool_reset_session=True,
+					host=host,
+					user=user,
+					password=password,
+					database=database
+				)
+			pool = cls._pools[key]
+		try:
+			return pool.get_connection()
+		except mysql_errors.PoolError:
+			# Every pooled connection is checked out; fall back to a dedicated connection
+			return mysql_con.connect(host=host, user=user, password=password, database=database)
+
+
+	@classmethod
+	def dispose_all(cls):
+		with cls._lock:
+			for engine in cls._engines.values():
+				engine.dispose()
+			cls._engines = {}
+			cls._pools = {}
@@ -1,23 +1,102 @@
+import config
+import os
 import pandas as pd
-import mysql.connector as mysql_con
+import pyarrow as pa
+import pyarrow.parquet as pq
+import re
+import shutil
+import tempfile
 from base.connector import Connector
+from base.exceptions import S3ContentsException
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pandas.io import sql
-from sqlalchemy import create_engine
+from sqlalchemy import exc, text
+from time import perf_counter
+from uuid import uuid4
+from utils.components.query_cache import QueryCache
+from utils.components.query_recorder import QueryRecorder
+from utils.connectors.connection_registry import ConnectionRegistry
+from utils.connectors.s3_api_connector import S3ApiConnector
 
 
 class DatabaseConnector(Connector):
 
+	GRANTEES = ['dwuser', 'readonly', 'looker', 'admin']
+	granted_tables = set()  # Tables whose grants have been verified by this process
+	query_recorder = QueryRecorder(config.query_log_capacity)  # Shared by every connector in the process
+	redshift_slots = None  # Semaphore shared across worker processes to cap concurrent Redshift statements (see ProcessJobRunner)
+
 	def __init__(self, file_location, dry_run=False):
 		super().__init__(file_location)
+		self.file_location = file_location
 		self.queries = []
 		self.dry_run = dry_run
+		self.s3_staging_connector = None
+		self.query_cache = None
+		self.job_name = None
+		self.write_buffer = None
+		self.rows_read = 0
+		self.rows_written = 0
+		if config.query_cache_enabled is True:
+			self.enable_query_cache()
+		if config.query_log_path:
+			DatabaseConnector.query_recorder.sink_path = config.query_log_path
+
+
+	def enable_query_cache(self, directory: str = None, max_bytes: int = None):
+		directory = directory if directory else ''.join([self.file_location, 'cache/queries'])
+		max_bytes = max_bytes if max_bytes else config.query_cache_max_bytes
+		self.query_cache = QueryCache(directory, max_bytes)
+
+
+	def record_query(self, target: str, query: str, started: float, rows=None, row_count: int = None, byte_count: int = None, query_id=None, kind: str = 'read'):
+		"""
+		Records a structured event for a finished query on the shared query_recorder.
+
+		:param target: Database the query ran against, e.g. sv2 | v2_db | svod_be
+		:param query: SQL text
+		:param started: perf_counter() value taken when the query started
+		:param rows: Rows returned. When given, row_count and byte_count are derived from it
+		:param row_count: Rows returned or written, when rows is not available
+		:param byte_count: Bytes transferred, when rows is not available
+		:param query_id: Redshift query id, see get_last_query_id
+		:param kind: read | write | cache
+		"""
+		if rows is not None:
+			row_count = len(rows)
+			byte_count = self.query_recorder.estimate_bytes(rows)
+		if kind == 'write':
+			self.rows_written += row_count or 0
+		else:
+			self.rows_read += row_count or 0
+		self.query_recorder.record(self.job_name, target, query, perf_counter() - started, rows=row_count, byte_count=byte_count, query_id=query_id, kind=kind)
+
+
+	@contextmanager
+	def redshift_slot(self):
+		"""Holds one of the shared Redshift slots for the duration of a statement, when a limit is set"""
+		if DatabaseConnector.redshift_slots is None:
+			yield
+			return
+		with DatabaseConnector.redshift_slots:
+			yield
+
+
+	def get_last_query_id(self, connection):
+		"""Redshift id of the last query run on the connection, for looking the query up in stl_query"""
+		try:
+			return connection.execute('SELECT pg_last_query_id()').scalar()
+		except exc.DBAPIError:
+			return None
 
 
 	def sv2_engine(self):
 		host = self.creds['SV2_HOST']
 		user = self.creds['SV2_USER']
 		pwd = self.creds['SV2_PASS']
-		dw_engine = create_engine(
+		dw_engine = ConnectionRegistry.get_engine(
+			'sv2',
 			'postgresql+psycopg2://{}:{}@{}:5439/dw'
 			.format(user,pwd,host)
 		)
@@ -29,7 +108,7 @@ class DatabaseConnector(Connector):
 		db = self.creds['V2_DB']
 		user = self.creds['V2_DB_USER']
 		password = self.creds['V2_DB_PASS']
-		cnx = mysql_con.connect(host=host,user=user,password=password,database=db)
+		cnx = ConnectionRegistry.get_connection('v2_db', host=host, user=user, password=password, database=db)
 		return cnx
 
 
@@ -37,7 +116,8 @@ class DatabaseConnector(Connector):
 		host = self.creds['BS_DB_HOST']
 		user = self.creds['BS_DB_USER']
 		pwd = self.creds['BS_DB_PASS']
-		db_engine = create_engine(
+		db_engine = ConnectionRegistry.get_engine(
+			'business_service',
 			'mysql://{}:{}@{}:3306/business-service'
 			.format(user,pwd,host)
 		)
@@ -49,7 +129,7 @@ class DatabaseConnector(Connector):
 		db = self.creds['BS_DB']
 		user = self.creds['BS_DB_USER']
 		pwd = self.creds['BS_DB_PASS']
-		cnx = mysql_con.connect(host=host, user=user, password=pwd, database=db)
+		cnx = ConnectionRegistry.get_connection('business_service', host=host, user=user, password=pwd, database=db)
 		return cnx
 
 
@@ -57,7 +137,8 @@ class DatabaseConnector(Connector):
 		host = self.creds['SVOD_BE_DB_HOST']
 		user = self.creds['SVOD_BE_DB_USER']
 		pwd = self.creds['SVOD_BE_DB_PASS']
-		db_engine = create_engine(
+		db_engine = ConnectionRegistry.get_engine(
+			'svod_be',
 			'mysql://{}:{}@{}:3306/rt_svod_be_production'
 			.format(user,pwd,host)
 		)
@@ -68,7 +149,7 @@ class DatabaseConnector(Connector):
 		db = self.creds['SVOD_BE_DB']
 		user = self.creds['SVOD_BE_DB_USER']
 		pwd = self.creds['SVOD_BE_DB_PASS']
-		cnx = mysql_con.connect(host=host, user=user, password=pwd, database=db)
+		cnx = ConnectionRegistry.get_connection('svod_be', host=host, user=user, password=pwd, database=db)
 		return cnx
 
 
@@ -76,7 +157,8 @@ class DatabaseConnector(Connector):
 		host = self.creds['COMMENTS_HOST']
 		user = self.creds['COMMENTS_USER']
 		pwd = self.creds['COMMENTS_PASS']
-		db_engine = create_engine(
+		db_engine = ConnectionRegistry.get_engine(
+			'comments',
 			'mysql://{}:{}@{}:3306/rt_comments_production'
 			.format(user,pwd,host)
 		)
@@ -88,7 +170,7 @@ class DatabaseConnector(Connector):
 		db = 'rt_comments_production'
 		user = self.creds['COMMENTS_USER']
 		pwd = self.creds['COMMENTS_PASS']
-		cnx = mysql_con.connect(host=host, user=user, password=pwd, database=db)
+		cnx = ConnectionRegistry.get_connection('comments', host=host, user=user, password=pwd, database=db)
 		return cnx
 
 
@@ -97,12 +179,13 @@ class DatabaseConnector(Connector):
 		db = 'community_be'
 		user = self.creds['COMMUNITY_USER']
 		pwd = self.creds['COMMUNITY_PASS']
-		cnx = mysql_con.connect(host=host, user=user, password=pwd, database=db)
+		cnx = ConnectionRegistry.get_connection('community', host=host, user=user, password=pwd, database=db)
 		return cnx
 
 
 	def query_v2_db(self, query):
 		self.queries.append(query)
+		started = perf_counter()
 		cnx = self.v2_db_connection()
 		cursor = cnx.cursor()
 		cursor.execute(query)
@@ -110,42 +193,183 @@ class DatabaseConnector(Connector):
 		for result in cursor:
 			results.append(result)
 		cnx.close()
+		self.record_query('v2_db', query, started, rows=results)
 		return results
 
 
-	def read_redshift(self, query: str):
-		if 'update' in query.lower() or 'set' in query.lower() or 'delete' in query.lower() or 'insert into' in query.lower() or 'truncate' in query.lower() or 'drop table' in query.lower():
+	def strip_sql(self, query: str):
+		"""The query without string literals, quoted identifiers and comments, which may contain any keyword"""
+		return re.sub(r"'(?:[^']|'')*'|\"[^\"]*\"|--[^\n]*|/\*.*?\*/", ' ', query, flags=re.DOTALL)
+
+
+	def check_read_only(self, query: str):
+		# Whole words only, so offset or asset_id do not match
+		if re.search(r'\b(insert|update|delete|set|truncate|drop)\b', self.strip_sql(query), flags=re.IGNORECASE):
 			raise ValueError('Query contains write logic! read_redshift method only reads from redshift')
 
+
+	def read_redshift(self, query: str):
+		self.check_read_only(query)
+		self.flush_write_buffer()
 		self.queries.append(query)
-		sv2_connection = self.sv2_engine().connect()
-		results = sv2_connection.execute(query)
-		sv2_connection.close()
+		if self.query_cache is not None:
+			return self.read_redshift_cached(query)
+		started = perf_counter()
+		with self.redshift_slot():
+			sv2_connection = self.sv2_engine().connect()
+			results = sv2_connection.execute(query).fetchall()
+			query_id = self.get_last_query_id(sv2_connection)
+			sv2_connection.close()
+		self.record_query('sv2', query, started, rows=results, query_id=query_id)
 		return results
 
 
+	def read_redshift_cached(self, query: str):
+		tables = self.query_cache.referenced_tables(query)
+		# Queries reading relations that cannot all be tracked are never cached
+		watermark = self.get_table_watermark(tables) if tables else None
+		if watermark is not None:
+			started = perf_counter()
+			rows = self.query_cache.get(query, watermark)
+			if rows is not None:
+				self.record_query('sv2', query, started, rows=rows, kind='cache')
+				return rows
+
+		started = perf_counter()
+		with self.redshift_slot():
+			sv2_connection = self.sv2_engine().connect()
+			results = sv2_connection.execute(query)
+			columns = list(results.keys())
+			rows = results.fetchall()
+			query_id = self.get_last_query_id(sv2_connection)
+			sv2_connection.close()
+		self.record_query('sv2', query, started, rows=rows, query_id=query_id)
+		if watermark is not None:
+			self.query_cache.put(query, watermark, columns, rows)
+		return rows
+
+
+	def get_table_watermark(self, tables: list):
+		"""
+		Returns a fingerprint of the given tables, or None if any of them cannot be tracked (e.g. views).
+
+		It covers each table's id, which changes when the table is recreated, its row count and its last insert
+		and last delete, since Redshift runs an UPDATE as a delete and an insert.
+		"""
+		table_list = ', '.join([f"'{table}'" for table in tables])
+		started = perf_counter()
+		watermark_query = f"""
+			SELECT
+				ti."schema" || '.' || ti."table" as table_name,
+				ti.table_id,
+				ti.tbl_rows,
+				cast(si.last_insert as varchar) as last_insert,
+				cast(sd.last_delete as varchar) as last_delete
+			FROM svv_table_info ti
+			LEFT JOIN (SELECT tbl, max(endtime) as last_insert FROM stl_insert GROUP BY 1) si ON si.tbl = ti.table_id
+			LEFT JOIN (SELECT tbl, max(endtime) as last_delete FROM stl_delete GROUP BY 1) sd ON sd.tbl = ti.table_id
+			WHERE ti."schema" || '.' || ti."table" IN ({table_list})
+			ORDER BY 1;
+		"""
+		with self.redshift_slot():
+			sv2_connection = self.sv2_engine().connect()
+			results = sv2_connection.execute(watermark_query).fetchall()
+			sv2_connection.close()
+		self.record_query('sv2', watermark_query, started, rows=results)
+		if len(results) != len(tables):
+			return None
+		return ';'.join(['|'.join([str(value) for value in result]) for result in results])
+
+
+	def read_redshift_iter(self, query: str, chunk_rows: int = 10000, as_dataframe: bool = False, as_arrow: bool = False):
+		"""
+		Streams the results of a read query through a named (server-side) cursor, so only one batch is held in memory.
+
+		:param query: Read-only SQL to run against Redshift
+		:param chunk_rows: Number of rows fetched from the server per batch
+		:param as_dataframe: Yield pandas DataFrames instead of lists of row tuples
+		:param as_arrow: Yield pyarrow Tables instead, which keep nullable integer columns as integers with nulls
+		"""
+		self.check_read_only(query)
+		self.flush_write_buffer()
+		self.queries.append(query)
+		# Only time spent waiting on the server is recorded, not the caller's work between batches
+		wall_seconds = 0
+		row_count = 0
+		byte_count = 0
+		cnx = self.sv2_engine().raw_connection()
+		try:
+			started = perf_counter()
+			cursor = cnx.cursor(name=f'hestia_{uuid4().hex}')
+			cursor.itersize = chunk_rows
+			# Naming the cursor makes psycopg2 send execute as a DECLARE and each fetchmany as a FETCH of chunk_rows rows.
+			# Redshift does the query's work at the DECLARE, so only execute holds a slot
+			with self.redshift_slot():
+				cursor.execute(query)
+			while True:
+				rows = cursor.fetchmany(chunk_rows)
+				wall_seconds += perf_counter() - started
+				if len(rows) == 0:
+					break
+				row_count += len(rows)
+				byte_count += self.query_recorder.estimate_bytes(rows)
+				if as_arrow is True:
+					yield pa.Table.from_pydict({column[0]: [row[idx] for row in rows] for idx, column in enumerate(cursor.description)})
+				elif as_dataframe is True:
+					yield pd.DataFrame(rows, columns=[column[0] for column in cursor.description])
+				else:
+					yield rows
+				started = perf_counter()
+			cursor.close()
+		finally:
+			cnx.close()
+			self.query_recorder.record(self.job_name, 'sv2', query, wall_seconds, rows=row_count, byte_count=byte_count)
+
+
 	def write_redshift(self, query: str, dry_run: bool = False):
 		if dry_run is True or self.dry_run is True:
 			return
 		else:
+			self.flush_write_buffer()
 			self.queries.append(query)
-			sv2_connection = self.sv2_engine().connect()
-			results = sv2_connection.execute(query)
-			sv2_connection.close()
+			if 'drop table' in query.lower() or 'create table' in query.lower():
+				# Recreated tables come back without their grants
+				DatabaseConnector.granted_tables.clear()
+			started = perf_counter()
+			with self.redshift_slot():
+				sv2_connection = self.sv2_engine().connect()
+				results = sv2_connection.execute(query)
+				query_id = self.get_last_query_id(sv2_connection)
+				sv2_connection.close()
+			self.record_query('sv2', query, started, row_count=self.get_written_row_count(query, results.rowcount), query_id=query_id, kind='write')
 			return results
 
 
+	def get_written_row_count(self, query: str, rowcount: int):
+		"""
+		Rows a write_redshift statement added. The rowcount of DELETE, UPDATE and TRUNCATE is not rows written, so
+		only INSERT, COPY and MERGE count. For several statements, rowcount is that of the last one
+		"""
+		statements = [statement for statement in self.strip_sql(query).split(';') if statement.strip()]
+		if len(statements) > 0 and re.match(r'\s*(insert|copy|merge)\b', statements[-1], flags=re.IGNORECASE):
+			return rowcount
+		return None
+
+
 	def query_business_service_db(self, query):
+		started = perf_counter()
 		conn = self.business_service_engine().connect()
 		trans = conn.begin()
-		results = conn.execute(query)
+		results = conn.execute(query).fetchall()
 		trans.commit()
 		conn.close()
-		return results.fetchall()
+		self.record_query('business_service', query, started, rows=results)
+		return results
 
 
 	def query_business_service_db_connection(self, query):
 		self.queries.append(query)
+		started = perf_counter()
 		cnx = self.business_service_connection()
 		cursor = cnx.cursor()
 		cursor.execute(query)
@@ -153,20 +377,24 @@ class DatabaseConnector(Connector):
 		for result in cursor:
 			results.append(result)
 		cnx.close()
+		self.record_query('business_service', query, started, rows=results)
 		return results
 
 
 	def query_svod_be_db(self, query):
+		started = perf_counter()
 		conn = self.svod_be_engine().connect()
 		trans = conn.begin()
-		results = conn.execute(query)
+		results = conn.execute(query).fetchall()
 		trans.commit()
 		conn.close()
-		return results.fetchall()
+		self.record_query('svod_be', query, started, rows=results)
+		return results
 
 
 	def query_svod_be_db_connection(self, query):
 		self.queries.append(query)
+		started = perf_counter()
 		cnx = self.svod_be_connection()
 		cursor = cnx.cursor()
 		cursor.execute(query)
@@ -174,20 +402,24 @@ class DatabaseConnector(Connector):
 		for result in cursor:
 			results.append(result)
 		cnx.close()
+		self.record_query('svod_be', query, started, rows=results)
 		return results
 
 
 	def query_comments_db(self, query):
+		started = perf_counter()
 		conn = self.comments_engine().connect()
 		trans = conn.begin()
-		results = conn.execute(query)
+		results = conn.execute(query).fetchall()
 		trans.commit()
 		conn.close()
-		return results.fetchall()
+		self.record_query('comments', query, started, rows=results)
+		return results
 
 
 	def query_comments_db_connection(self, query):
 		self.queries.append(query)
+		started = perf_counter()
 		cnx = self.comments_connection()
 		cursor = cnx.cursor()
 		cursor.execute(query)
@@ -195,11 +427,13 @@ class DatabaseConnector(Connector):
 		for result in cursor:
 			results.append(result)
 		cnx.close()
+		self.record_query('comments', query, started, rows=results)
 		return results
 
 
 	def query_community_db_connection(self, query):
 		self.queries.append(query)
+		started = perf_counter()
 		cnx = self.community_connection()
 		cursor = cnx.cursor()
 		cursor.execute(query)
@@ -207,19 +441,160 @@ class DatabaseConnector(Connector):
 		for result in cursor:
 			results.append(result)
 		cnx.close()
+		self.record_query('community', query, started, rows=results)
 		return results
 
 
+	def get_mysql_connection(self, target: str):
+		connections = {
+			'v2_db': self.v2_db_connection,
+			'business_service': self.business_service_connection,
+			'svod_be': self.svod_be_connection,
+			'comments': self.comments_connection,
+			'community': self.community_connection
+		}
+		if target not in connections:
+			raise ValueError(f'Unknown MySQL target: {target}')
+		return connections[target]()
+
+
+	def query_mysql_iter(self, target: str, query: str, chunk_rows: int = 10000, as_dataframe: bool = False):
+		"""
+		Streams the results of a query against one of the MySQL sources through an unbuffered cursor,
+		so rows are read off the socket one batch at a time instead of collected into a single list.
+
+		:param target: v2_db | business_service | svod_be | comments | community
+		:param query: SQL to run
+		:param chunk_rows: Number of rows fetched per batch
+		:param as_dataframe: Yield pandas DataFrames instead of lists of row tuples
+		"""
+		self.queries.append(query)
+		# Only time spent waiting on the server is recorded, not the caller's work between batches
+		wall_seconds = 0
+		row_count = 0
+		byte_count = 0
+		started = perf_counter()
+		cnx = self.get_mysql_connection(target)
+		cursor = cnx.cursor(buffered=False)
+		try:
+			cursor.execute(query)
+			columns = [column[0] for column in cursor.description]
+			while True:
+				rows = cursor.fetchmany(chunk_rows)
+				wall_seconds += perf_counter() - started
+				if len(rows) == 0:
+					break
+				row_count += len(rows)
+				byte_count += self.query_recorder.estimate_bytes(rows)
+				if as_dataframe is True:
+					yield pd.DataFrame(rows, columns=columns)
+				else:
+					yield rows
+				started = perf_counter()
+		finally:
+			self.query_recorder.record(self.job_name, target, query, wall_seconds, rows=row_count, byte_count=byte_count)
+			# A pooled connection cannot be reset with rows still unread, e.g. when the caller stops early
+			while cnx.unread_result and len(cursor.fetchmany(chunk_rows)) > 0:
+				pass
+			cursor.close()
+			cnx.close()
+
+
+	def query_by_keys(self, sql_template: str, keys, target: str = 'sv2', max_bound_keys: int = 1000):
+		"""
+		Runs a read query filtered to a set of keys and returns every matching row as one list.
+
+		sql_template marks where the key set goes with {keys}, e.g. "SELECT ... WHERE episode_key IN {keys}".
+		Up to max_bound_keys keys are sent as bound parameters. Larger sets are loaded into a session temp table
+		that the query joins against, so the whole set runs as a single statement.
+
+		:param sql_template: Read-only SQL containing a {keys} placeholder
+		:param keys: Iterable of key values. Duplicates are ignored
+		:param target: sv2 for Redshift, or one of the MySQL sources: v2_db | business_service | svod_be | comments | community
+		:param max_bound_keys: Largest key set sent as bound parameters
+		"""
+		self.check_read_only(sql_template)
+		keys = list(dict.fromkeys(keys))
+		if len(keys) == 0:
+			return []
+
+		self.queries.append(sql_template)
+		started = perf_counter()
+		key_table = f'query_keys_{uuid4().hex[:8]}'
+		if all(isinstance(key, int) for key in keys):
+			key_type = 'BIGINT'
+		else:
+			key_type = f'VARCHAR({max(max([len(str(key)) for key in keys]), 1)})'
+
+		if target == 'sv2':
+			self.flush_write_buffer()
+			with self.redshift_slot(), self.sv2_engine().connect() as connection:
+				if len(keys) <= max_bound_keys:
+					placeholders = ', '.join([f':key_{idx}' for idx in range(len(keys))])
+					statement = text(sql_template.replace('{keys}', f'({placeholders})'))
+					results = connection.execute(statement, {f'key_{idx}': key for idx, key in enumerate(keys)}).fetchall()
+					self.record_query(target, sql_template, started, rows=results, query_id=self.get_last_query_id(connection))
+					return results
+
+				# The connection goes back to the pool, so the key table is dropped even when the query fails
+				try:
+					connection.execute(f'CREATE TEMP TABLE {key_table} (key_value {key_type})')
+					for idx in range(0, len(keys), max_bound_keys):
+						batch = keys[idx:idx + max_bound_keys]
+						values = ', '.join([f'(:key_{i})' for i in range(len(batch))])
+						connection.execute(text(f'INSERT INTO {key_table} (key_value) VALUES {values}'), {f'key_{i}': key for i, key in enumerate(batch)})
+					results = connection.execute(sql_template.replace('{keys}', f'(SELECT key_value FROM {key_table})')).fetchall()
+					query_id = self.get_last_query_id(connection)
+				finally:
+					connection.execute(f'DROP TABLE IF EXISTS {key_table}')
+				self.record_query(target, sql_template, started, rows=results, query_id=query_id)
+				return results
+
+		cnx = self.get_mysql_connection(target)
+		cursor = cnx.cursor()
+		try:
+			if len(keys) <= max_bound_keys:
+				# mysql-connector only substitutes %s markers and sends every other % as is, so the template is not escaped
+				placeholders = ', '.join(['%s'] * len(keys))
+				cursor.execute(sql_template.replace('{keys}', f'({placeholders})'), keys)
+				results = cursor.fetchall()
+				self.record_query(target, sql_template, started, rows=results)
+				return results
+
+			try:
+				cursor.execute(f'CREATE TEMPORARY TABLE {key_table} (key_value {key_type})')
+				cursor.executemany(f'INSERT INTO {key_table} (key_value) VALUES (%s)', [(key,) for key in keys])
+				cursor.execute(sql_template.replace('{keys}', f'(SELECT key_value FROM {key_table})'))
+				results = cursor.fetchall()
+			finally:
+				cursor.execute(f'DROP TEMPORARY TABLE IF EXISTS {key_table}')
+			self.record_query(target, sql_template, started, rows=results)
+			return results
+		finally:
+			cursor.close()
+			cnx.close()
+
+
 	def update_redshift_table_permissions(self, table_name: str, schema: str = 'warehouse', dry_run: bool = False):
 		if dry_run is True or self.dry_run is True:
 			return
-		else:
-			sv2_conn = self.sv2_engine().connect()
-			sv2_conn.execute(f"grant select on table {schema}.{table_name} to dwuser")
-			sv2_conn.execute(f"grant select on table {schema}.{table_name} to readonly")
-			sv2_conn.execute(f"grant select on table {schema}.{table_name} to looker")
-			sv2_conn.execute(f"grant select on table {schema}.{table_name} to admin")
-			sv2_conn.close()
+		relation = f'{schema}.{table_name}'
+		if relation in DatabaseConnector.granted_tables:
+			return
+
+		sv2_conn = self.sv2_engine().connect()
+		try:
+			checks = ', '.join([f"has_table_privilege('{grantee}', '{relation}', 'select')" for grantee in self.GRANTEES])
+			privileges = sv2_conn.execute(f"SELECT {checks}").fetchone()
+			missing = [grantee for grantee, has_privilege in zip(self.GRANTEES, privileges) if has_privilege is not True]
+		except exc.DBAPIError:
+			# A grantee the catalog cannot resolve; grant to everyone rather than guess
+			missing = self.GRANTEES
+		if len(missing) > 0:
+			self.queries.append(f"grant select on table {relation} to {', '.join(missing)}")
+			sv2_conn.execute(f"grant select on table {relation} to {', '.join(missing)}")
+		sv2_conn.close()
+		DatabaseConnector.granted_tables.add(relation)
 
 
 	def write_to_sql(
@@ -239,15 +614,223 @@ class DatabaseConnector(Connector):
 		if dry_run is True or self.dry_run is True:
 			return
 		else:
-			return sql.to_sql(
-				dataframe,
-				name,
-				con,
-				schema=schema,
-				if_exists=if_exists,
-				index=index,
-				index_label=index_label,
-				chunksize=chunksize,
-				dtype=dtype,
-				method=method,
-			)
\ No newline at end of file
+			if if_exists == 'replace':
+				DatabaseConnector.granted_tables.discard(f'{schema}.{name}')
+			# Only plain appends to Redshift can be bulk loaded later; anything else is written now, after what is buffered
+			if self.write_buffer is not None and if_exists == 'append' and index is False and dtype is None and con is self.sv2_engine():
+				self.write_buffer.setdefault((schema if schema else 'public', name), []).append(dataframe)
+				return None
+			self.flush_write_buffer()
+			started = perf_counter()
+			with self.redshift_slot():
+				results = sql.to_sql(
+					dataframe,
+					name,
+					con,
+					schema=schema,
+					if_exists=if_exists,
+					index=index,
+					index_label=index_label,
+					chunksize=chunksize,
+					dtype=dtype,
+					method=method,
+				)
+			self.record_query('sv2', f'to_sql {schema}.{name}', started, row_count=len(dataframe), byte_count=int(dataframe.memory_usage(index=False).sum()), kind='write')
+			return results
+
+
+	def buffer_writes(self):
+		"""
+		Holds DataFrames appended to Redshift through write_to_sql until flush_write_buffer, instead of inserting them
+		right away. Any other Redshift statement run through this connector flushes the buffer first, so the job
+		reads and merges its own appends as if they had been written at once.
+		"""
+		self.write_buffer = {}
+
+
+	def flush_write_buffer(self):
+		"""Bulk loads the buffered DataFrames, one load per table"""
+		if not self.write_buffer:
+			return
+		buffered = self.write_buffer
+		self.write_buffer = {}
+		for (schema, table_name), dataframes in buffered.items():
+			self.bulk_load(pd.concat(dataframes, ignore_index=True), table_name, schema=schema)
+
+
+	def bulk_load(self, dataframe: pd.DataFrame, table_name: str, schema: str = 'warehouse', mode: str = 'append', keys: list = None, dry_run: bool = False):
+		"""
+		Loads a DataFrame into an existing Redshift table in a single transaction.
+
+		The DataFrame is staged in S3 as a gzipped CSV and loaded with one COPY. In local mode, or when no
+		IAM role is configured for COPY, rows are inserted through the existing multi-row INSERT path instead.
+
+		:param dataframe: Rows to load. Column names must match the target table's columns
+		:param table_name: Target table name
+		:param schema: Target schema
+		:param mode: append | replace | upsert. replace clears the table first, upsert merges on keys (see upsert)
+		:param keys: Key columns identifying a row; required for upsert
+		:param dry_run: Boolean. If enabled, nothing is written
+		"""
+		if mode not in ('append', 'replace', 'upsert'):
+			raise ValueError(f'Unsupported bulk_load mode: {mode}')
+		if mode == 'upsert' and not keys:
+			raise ValueError('bulk_load mode upsert requires keys')
+		if dry_run is True or self.dry_run is True:
+			return
+		self.flush_write_buffer()
+		if mode == 'upsert':
+			return self.upsert(dataframe, table_name, keys, schema=schema)
+
+		target = f'{schema}.{table_name}'
+		with self.redshift_slot(), self.sv2_engine().begin() as connection:
+			if mode == 'replace':
+				connection.execute(f'DELETE FROM {target}')
+			self.load_dataframe(connection, dataframe, target)
+
+
+	def upsert(self, dataframe: pd.DataFrame, table_name: str, keys: list, update_columns: list = None, schema: str = 'warehouse', dry_run: bool = False):
+		"""
+		Idempotently writes a DataFrame into an existing Redshift table.
+
+		Rows are bulk loaded into a session temp table shaped like the target, then merged with one MERGE in the
+		same transaction: rows matching on keys are updated, all others are inserted. When a key appears more than
+		once in the DataFrame, its last row wins.
+
+		:param dataframe: Rows to write. Column names must match the target table's columns
+		:param table_name: Target table name
+		:param keys: Key columns identifying a row
+		:param update_columns: Columns overwritten on matched rows. Defaults to every non-key column in the DataFrame
+		:param schema: Target schema
+		:param dry_run: Boolean. If enabled, nothing is written
+		"""
+		if dry_run is True or self.dry_run is True:
+			return
+		if len(dataframe) == 0:
+			return
+
+		self.flush_write_buffer()
+		dataframe = dataframe.drop_duplicates(subset=keys, keep='last')
+		if update_columns is None:
+			update_columns = [column for column in dataframe.columns if column not in keys]
+		if len(update_columns) == 0:
+			# MERGE requires a matched action; rewriting a key with itself leaves the row as is
+			update_columns = [keys[0]]
+
+		target = f'{schema}.{table_name}'
+		stage = f'stage_{table_name}_{uuid4().hex[:8]}'
+		key_match = ' AND '.join([f'{target}.{key} = {stage}.{key}' for key in keys])
+		set_clause = ', '.join([f'{column} = {stage}.{column}' for column in update_columns])
+		insert_columns = ', '.join(dataframe.columns)
+		insert_values = ', '.join([f'{stage}.{column}' for column in dataframe.columns])
+		with self.redshift_slot(), self.sv2_engine().begin() as connection:
+			connection.execute(f'CREATE TEMP TABLE {stage} (LIKE {target})')
+			self.load_dataframe(connection, dataframe, stage)
+			self.queries.append(f'merge {stage} into {target}')
+			started = perf_counter()
+			merge_results = connection.execute(f"""
+				MERGE INTO {target}
+				USING {stage}
+				ON {key_match}
+				WHEN MATCHED THEN UPDATE SET {set_clause}
+				WHEN NOT MATCHED THEN INSERT ({insert_columns}) VALUES ({insert_values});
+			""")
+			self.record_query('sv2', f'merge into {target}', started, row_count=merge_results.rowcount, query_id=self.get_last_query_id(connection), kind='write')
+			connection.execute(f'DROP TABLE {stage}')
+
+
+	def load_dataframe(self, connection, dataframe: pd.DataFrame, relation: str):
+		if len(dataframe) == 0:
+			return
+		self.queries.append(f'bulk load {len(dataframe)} rows into {relation}')
+		started = perf_counter()
+		byte_count = int(dataframe.memory_usage(index=False).sum())
+		if config.local_mode or 'SV2_IAM_ROLE' not in self.creds:
+			schema, table_name = relation.split('.') if '.' in relation else (None, relation)
+			sql.to_sql(dataframe, table_name, connection, schema=schema, if_exists='append', index=False, chunksize=5000, method='multi')
+			self.record_query('sv2', f'insert into {relation}', started, row_count=len(dataframe), byte_count=byte_count, kind='write')
+			return
+
+		s3_staging_connector = self.get_s3_staging_connector()
+		key = '/'.join([config.bulk_load_prefix, f'{relation}_{uuid4().hex}.csv.gz'])
+		file_descriptor, file_name = tempfile.mkstemp(suffix='.csv.gz')
+		os.close(file_descriptor)
+		try:
+			dataframe.to_csv(file_name, index=False, compression='gzip', na_rep='\\N')
+			s3_staging_connector.upload_file(file_name, key)
+			connection.execute(f"""
+				COPY {relation} ({', '.join(dataframe.columns)})
+				FROM 's3://{config.bulk_load_bucket}/{key}'
+				IAM_ROLE '{self.creds['SV2_IAM_ROLE']}'
+				FORMAT AS CSV
+				GZIP
+				IGNOREHEADER 1
+				NULL AS '\\N'
+				TIMEFORMAT 'auto'
+				DATEFORMAT 'auto'
+				ACCEPTINVCHARS;
+			""")
+			self.record_query('sv2', f'copy into {relation}', started, row_count=len(dataframe), byte_count=byte_count, query_id=self.get_last_query_id(connection), kind='write')
+		finally:
+			os.remove(file_name)
+			s3_staging_connector.delete_objects_from_bucket([key])
+
+
+	def get_s3_staging_connector(self):
+		if self.s3_staging_connector is None:
+			self.s3_staging_connector = S3ApiConnector(file_location=self.file_location, bucket=config.bulk_load_bucket, profile_name='roosterteeth')
+		return self.s3_staging_connector
+
+
+	def extract_bulk(self, query: str, as_arrow: bool = False, max_workers: int = 8):
+		"""
+		Reads a large result set by UNLOADing it to S3 as Parquet from every slice in parallel, then downloading the parts concurrently.
+
+		In local mode, or when no IAM role is configured for UNLOAD, the query is streamed through read_redshift_iter instead.
+
+		:param query: Read-only SQL to run against Redshift. A top-level LIMIT must be wrapped in a subquery, per UNLOAD
+		:param as_arrow: Return a pyarrow Table instead of a pandas DataFrame. Use it when rows must match read_redshift's,
+			since pandas turns nullable integer columns into float64 with NaN
+		:param max_workers: Number of concurrent part downloads
+		"""
+		self.check_read_only(query)
+		if config.local_mode or 'SV2_IAM_ROLE' not in self.creds:
+			# Built from the rows rather than through pandas, so column types match the UNLOADed Parquet
+			chunks = list(self.read_redshift_iter(query, as_arrow=True))
+			table = pa.concat_tables(chunks, promote_options='default') if len(chunks) > 0 else pa.table({})
+			return table if as_arrow is True else table.to_pandas()
+
+		self.flush_write_buffer()
+		self.queries.append(query)
+		started = perf_counter()
+		s3_staging_connector = self.get_s3_staging_connector()
+		prefix = '/'.join([config.bulk_extract_prefix, uuid4().hex, ''])
+		escaped_query = query.strip().rstrip(';').replace("'", "''")
+		with self.redshift_slot(), self.sv2_engine().begin() as connection:
+			connection.execute(f"""
+				UNLOAD ('{escaped_query}')
+				TO 's3://{config.bulk_load_bucket}/{prefix}'
+				IAM_ROLE '{self.creds['SV2_IAM_ROLE']}'
+				FORMAT PARQUET
+				PARALLEL ON;
+			""")
+			query_id = self.get_last_query_id(connection)
+
+		try:
+			keys = s3_staging_connector.get_object_list_from_bucket(prefix)
+		except S3ContentsException:
+			# UNLOAD writes no parts for an empty result set
+			self.record_query('sv2', query, started, row_count=0, byte_count=0, query_id=query_id)
+			return pa.table({}) if as_arrow is True else pd.DataFrame()
+		download_directory = tempfile.mkdtemp()
+		try:
+			file_names = [os.path.join(download_directory, str(idx)) for idx in range(len(keys))]
+			with ThreadPoolExecutor(max_workers=max_workers) as executor:
+				list(executor.map(s3_staging_connector.download_files_from_object, keys, file_names))
+			table = pa.concat_tables([pq.read_table(file_name) for file_name in file_names])
+		finally:
+			shutil.rmtree(download_directory)
+			s3_staging_connector.delete_objects_from_bucket(keys)
+		self.record_query('sv2', query, started, row_count=table.num_rows, byte_count=table.nbytes, query_id=query_id)
+
+		return table if as_arrow is True else table.to_pandas()
\ No newline at end of file
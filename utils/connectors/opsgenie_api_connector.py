@@ -22,6 +22,27 @@ class OpsGenieAPIConnector(ApiConnector):
         }
 
 
+    def build_aggregated_alert(self, alerts, max_details=10):
+        first_log_line, first_job_name = alerts[0]
+        job_names = sorted(set([job_name for _, job_name in alerts]))
+        details = {
+            "alert_count": str(len(alerts)),
+            "jobs": ", ".join(job_names)
+        }
+        for idx, (log_line, job_name) in enumerate(alerts[:max_details]):
+            details[f"alert_{idx + 1}"] = json.dumps(dict(log_line, job_name=job_name), default=str)
+        return {
+            "message": f'{len(alerts)} alerts from {len(job_names)} job(s), first {first_job_name}: {first_log_line["message"]}'[:130],
+            "details": details
+        }
+
+
     def alert(self, log_line, job_name):
         data = self.build_alert(log_line, job_name)
         self.response = requests.post(url=self.url, headers=self.headers, data=json.dumps(data))
+
+
+    def alert_many(self, alerts):
+        """Sends a burst of (log_line, job_name) alerts as one alert"""
+        data = self.build_aggregated_alert(alerts)
+        self.response = requests.post(url=self.url, headers=self.headers, data=json.dumps(data))
@@ -0,0 +1,186 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from base.exceptions import MissingFixtureException
+
+
+class RecordReplayConnector:
+
+	# Calls with side effects. Replayed as no-ops and kept in self.writes instead
+	WRITE_METHODS = {
+		'write_to_sql', 'write_redshift', 'update_redshift_table_permissions', 'bulk_load', 'upsert', 'flush_write_buffer',
+		'buffer_writes', 'put_object', 'upload_file', 'download_files_from_object', 'make_request_no_response'
+	}
+
+	def __init__(self, fixture_directory, connector=None, mode='replay', scale=1):
+		"""
+		Stands in for a DatabaseConnector, S3ApiConnector or API connector, so jobs can run without live services.
+
+		In record mode every call is passed through to connector and its result is saved under fixture_directory:
+		DataFrames, Arrow tables and query rows as Parquet, anything else (API payloads, S3 listings) pickled.
+		Streamed results (read_redshift_iter, query_mysql_iter) are saved with their chunk boundaries. In replay
+		mode the same call returns the saved result and connector is not needed. Calls are matched on method name
+		and arguments, so a replayed job must issue the queries it issued when recorded.
+
+		:param fixture_directory: Directory of the fixture files and their index.json
+		:param connector: The live connector. Required to record
+		:param mode: record | replay
+		:param scale: Replay tabular results with their rows repeated scale times
+		"""
+		if mode not in ('record', 'replay'):
+			raise ValueError(f'Unsupported mode: {mode}')
+		if mode == 'record' and connector is None:
+			raise ValueError('A connector is required to record fixtures')
+		self.fixture_directory = fixture_directory
+		self.connector = connector
+		self.mode = mode
+		self.scale = scale
+		self.dry_run = True if mode == 'replay' else getattr(connector, 'dry_run', False)
+		self.job_name = None
+		self.rows_read = 0
+		self.rows_written = 0
+		self.writes = []
+		self.lock = threading.Lock()
+		os.makedirs(self.fixture_directory, exist_ok=True)
+		self.index_path = os.path.join(self.fixture_directory, 'index.json')
+		self.index = {}
+		if os.path.isfile(self.index_path):
+			with open(self.index_path, 'r') as f:
+				self.index = json.load(f)
+
+
+	def __getattr__(self, name):
+		# Only reached for names not set on the instance, i.e. the wrapped connector's methods
+		if name.startswith('_') or 'mode' not in self.__dict__:
+			raise AttributeError(name)
+		if self.mode == 'record' and not callable(getattr(self.connector, name)):
+			return getattr(self.connector, name)
+
+		def call(*args, **kwargs):
+			return self.call(name, args, kwargs)
+		return call
+
+
+	def get_fixture_key(self, method, args, kwargs):
+		signature = json.dumps([method, [repr(arg) for arg in args], sorted([(key, repr(value)) for key, value in kwargs.items()])])
+		return hashlib.md5(signature.encode('utf-8')).hexdigest()
+
+
+	def call(self, method, args, kwargs):
+		if method in self.WRITE_METHODS:
+			rows = len(args[0]) if len(args) > 0 and isinstance(args[0], pd.DataFrame) else None
+			self.writes.append({'method': method, 'args': args, 'kwargs': kwargs, 'rows': rows})
+			self.rows_written += rows or 0
+			return getattr(self.connector, method)(*args, **kwargs) if self.mode == 'record' else None
+		if method.endswith('_engine') or method.endswith('_connection'):
+			# Passed along to write_to_sql and friends. Never queried directly by a replayed job
+			return getattr(self.connector, method)(*args, **kwargs) if self.mode == 'record' else None
+
+		fixture_key = self.get_fixture_key(method, args, kwargs)
+		if self.mode == 'record':
+			result = getattr(self.connector, method)(*args, **kwargs)
+			if inspect.isgenerator(result):
+				result = list(result)
+				self.save(method, fixture_key, result, args, chunked=True)
+				return iter(self.load(fixture_key))
+			self.save(method, fixture_key, result, args)
+			return result
+		if fixture_key not in self.index:
+			raise MissingFixtureException(method, fixture_key)
+		result = self.load(fixture_key)
+		return iter(result) if self.index[fixture_key]['chunks'] is not None else result
+
+
+	def record(self, method, args, result, kwargs=None, chunked=False):
+		"""
+		Saves result as the fixture for method(*args, **kwargs) without calling a live connector, e.g. for synthetic data.
+
+		:param chunked: result is the list of chunks a streaming method such as read_redshift_iter yields
+		"""
+		self.save(method, self.get_fixture_key(method, tuple(args), kwargs if kwargs else {}), result, args, chunked=chunked)
+
+
+	def save(self, method, fixture_key, result, args, chunked=False):
+		chunks = [len(chunk) for chunk in result] if chunked else None
+		data = self.concat_chunks(result) if chunked else result
+		path = os.path.join(self.fixture_directory, fixture_key)
+		table = self.to_arrow(data)
+		if table is not None:
+			pq.write_table(table, f'{path}.parquet')
+			data_format = 'dataframe' if isinstance(data, pd.DataFrame) else ('arrow' if isinstance(data, pa.Table) else 'rows')
+		else:
+			with open(f'{path}.pkl', 'wb') as f:
+				pickle.dump(result, f)
+			data_format = 'pickle'
+		with self.lock:
+			self.index[fixture_key] = {
+				'method': method,
+				'call': repr(args)[:200],
+				'format': data_format,
+				'chunks': chunks,
+				'chunk_type': type(result[0]).__name__ if chunked and len(result) > 0 else None
+			}
+			with open(self.index_path, 'w') as f:
+				json.dump(self.index, f, indent=1, sort_keys=True)
+
+
+	def concat_chunks(self, chunks):
+		if len(chunks) > 0 and all([isinstance(chunk, pd.DataFrame) for chunk in chunks]):
+			return pd.concat(chunks, ignore_index=True)
+		if all([isinstance(chunk, list) for chunk in chunks]):
+			return [row for chunk in chunks for row in chunk]
+		return chunks
+
+
+	def to_arrow(self, data):
+		"""Arrow table of a DataFrame, Arrow table or non-empty list of rows, or None if it is not tabular"""
+		try:
+			if isinstance(data, pd.DataFrame):
+				return pa.Table.from_pandas(data, preserve_index=False)
+			if isinstance(data, pa.Table):
+				return data
+			if isinstance(data, list) and len(data) > 0 and all([isinstance(row, (tuple, list)) or hasattr(row, '_fields') for row in data]):
+				columns = list(getattr(data[0], '_fields', [str(idx) for idx in range(len(data[0]))]))
+				return pa.table({column: pa.array([row[idx] for row in data]) for idx, column in enumerate(columns)})
+		except (pa.ArrowException, TypeError, ValueError, IndexError):
+			# Mixed or nested values Arrow cannot type. Pickled instead
+			return None
+		return None
+
+
+	def load(self, fixture_key):
+		entry = self.index[fixture_key]
+		path = os.path.join(self.fixture_directory, fixture_key)
+		if entry['format'] == 'pickle':
+			with open(f'{path}.pkl', 'rb') as f:
+				return pickle.load(f)
+
+		table = pq.read_table(f'{path}.parquet')
+		if self.scale > 1:
+			table = pa.concat_tables([table] * self.scale)
+		self.rows_read += table.num_rows
+		if entry['format'] == 'dataframe':
+			data = table.to_pandas()
+		elif entry['format'] == 'arrow':
+			data = table
+		else:
+			data = list(zip(*[column.to_pylist() for column in table.columns]))
+		if entry['chunks'] is None:
+			return data
+		return self.split_chunks(data, [size * self.scale for size in entry['chunks']], entry['chunk_type'])
+
+
+	def split_chunks(self, data, sizes, chunk_type):
+		chunks = []
+		start = 0
+		for size in sizes:
+			chunk = data.iloc[start:start + size].reset_index(drop=True) if chunk_type == 'DataFrame' else data[start:start + size]
+			chunks.append(chunk)
+			start += size
+		return chunks